@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.monitoring'
+
+    def ready(self):
+        from apps.monitoring import signals  # noqa: F401
@@ -0,0 +1,286 @@
+"""
+Prometheus metrics shared by all processes.
+
+Counters and histograms are defined at import time. Every process (gunicorn
+workers, the parse worker, management commands) adds its observations to
+in-memory deltas, which are flushed into the `MetricSample` table at most
+every `METRICS_FLUSH_INTERVAL` seconds. `/metrics`, served by any worker,
+therefore reports the totals of all of them, without an external service.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+
+from apps.monitoring.models import MetricSample
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class MetricsRegistry:
+    """
+    Metrics of the application and the deltas not flushed yet.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self._pending = defaultdict(float)
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def register(self, metric: 'Metric') -> None:
+        if metric.name in self.metrics:
+            raise ValueError(f'Metric {metric.name!r} is already registered')
+        self.metrics[metric.name] = metric
+
+    def add(self, samples: Iterable[tuple[str, str, float]]) -> None:
+        """
+        Add values to samples.
+
+        Args:
+            samples (Iterable[tuple[str, str, float]]): Sample name, labels in
+                exposition format and the value to add.
+        """
+        if not settings.METRICS_ENABLED:
+            return
+        with self._lock:
+            for name, labels, amount in samples:
+                self._pending[name, labels] += amount
+
+    def flush(self) -> None:
+        """
+        Add the pending deltas of this process to the stored totals.
+
+        Raises:
+            DatabaseError: If the totals cannot be updated; the deltas are
+                kept for the next flush.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(float)
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        try:
+            _add_to_samples(pending)
+        except DatabaseError:
+            with self._lock:
+                for key, amount in pending.items():
+                    self._pending[key] += amount
+            raise
+
+    def maybe_flush(self, force: bool = False) -> None:
+        """
+        Flush if `METRICS_FLUSH_INTERVAL` has passed since the last flush.
+
+        Skipped inside a transaction, which could be rolled back; errors are
+        logged, not raised.
+
+        Args:
+            force (bool, optional): Flush whatever the interval. Default: False.
+        """
+        if not force and not self.is_flush_due():
+            return
+        if connection.in_atomic_block:
+            return
+        try:
+            self.flush()
+        except DatabaseError:
+            logger.exception('Could not flush metrics')
+
+    def is_flush_due(self) -> bool:
+        """
+        Whether `METRICS_FLUSH_INTERVAL` has passed since the last flush.
+        """
+        elapsed = time.monotonic() - self._last_flush
+        return elapsed >= settings.METRICS_FLUSH_INTERVAL
+
+    def render(self) -> str:
+        """
+        Render the totals of every registered metric in the Prometheus text
+        exposition format, after flushing this process.
+        """
+        self.flush()
+        samples = defaultdict(dict)
+        for name, labels, value in MetricSample.objects.values_list(
+            'name', 'labels', 'value'
+        ):
+            samples[name][labels] = value
+
+        lines = []
+        for name in sorted(self.metrics):
+            lines.extend(self.metrics[name].expose(samples))
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+
+class Metric:
+    """
+    Base of the metric types.
+
+    Attributes:
+        name (str): Metric name.
+        documentation (str): Help text.
+        labelnames (tuple[str, ...]): Names of the labels every observation
+            must be given.
+    """
+
+    type = 'untyped'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        registry: MetricsRegistry = REGISTRY,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry
+        registry.register(self)
+
+    def expose(self, samples: dict[str, dict[str, float]]) -> list[str]:
+        """
+        Render the metric from the stored samples.
+        """
+        documentation = self.documentation.replace('\\', r'\\').replace('\n', r'\n')
+        return [
+            f'# HELP {self.name} {documentation}',
+            f'# TYPE {self.name} {self.type}',
+        ]
+
+    def _labels(self, labels: dict) -> str:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}')
+        return _format_labels((name, labels[name]) for name in self.labelnames)
+
+
+class Counter(Metric):
+    """
+    A total that only goes up, e.g. requests or parsed items.
+    """
+
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """
+        Increase the counter of the given label values.
+        """
+        if amount < 0:
+            raise ValueError('Counters can only be increased')
+        if amount:
+            self.registry.add([(self.name, self._labels(labels), amount)])
+
+    def expose(self, samples):
+        lines = super().expose(samples)
+        values = samples.get(self.name) or ({} if self.labelnames else {'': 0})
+        lines.extend(
+            f'{self.name}{labels} {_format_value(value)}'
+            for labels, value in sorted(values.items())
+        )
+        return lines
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values, e.g. latencies, in cumulative buckets.
+
+    Attributes:
+        buckets (tuple[float, ...]): Upper bounds of the buckets, ending with
+            infinity.
+    """
+
+    type = 'histogram'
+
+    def __init__(self, *args, buckets: Iterable[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = (*sorted(float(bound) for bound in buckets), math.inf)
+
+    def observe(self, value: float, **labels) -> None:
+        """
+        Record a value for the given label values.
+        """
+        series = self._labels(labels)
+        self.registry.add(
+            [
+                *(
+                    (f'{self.name}_bucket', _bucket_labels(series, bound), 1)
+                    for bound in self.buckets
+                    if value <= bound
+                ),
+                (f'{self.name}_sum', series, value),
+                (f'{self.name}_count', series, 1),
+            ]
+        )
+
+    def expose(self, samples):
+        lines = super().expose(samples)
+        counts = samples.get(f'{self.name}_count') or {}
+        buckets = samples.get(f'{self.name}_bucket') or {}
+        sums = samples.get(f'{self.name}_sum') or {}
+
+        def sample(suffix, labels, values):
+            return (
+                f'{self.name}_{suffix}{labels} {_format_value(values.get(labels, 0))}'
+            )
+
+        for series in sorted(counts) or ([] if self.labelnames else ['']):
+            lines.extend(
+                sample('bucket', _bucket_labels(series, bound), buckets)
+                for bound in self.buckets
+            )
+            lines.append(sample('sum', series, sums))
+            lines.append(sample('count', series, counts))
+        return lines
+
+
+def _format_labels(pairs: Iterable[tuple[str, str]]) -> str:
+    pairs = list(pairs)
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _bucket_labels(series: str, bound: float) -> str:
+    """
+    Add the `le` label of a histogram bucket to the labels of a series.
+    """
+    le = _format_labels([('le', '+Inf' if bound == math.inf else repr(bound))])
+    return f'{series[:-1]},{le[1:]}' if series else le
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _add_to_samples(pending: dict[tuple[str, str], float]) -> None:
+    table = connection.ops.quote_name(MetricSample._meta.db_table)
+    # Rows are always locked in the same order, so concurrent flushes of
+    # several processes cannot deadlock.
+    rows = sorted(pending.items())
+    values = ', '.join(['(%s, %s, %s)'] * len(rows))
+    params = [
+        param for (name, labels), amount in rows for param in (name, labels, amount)
+    ]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (name, labels, value) VALUES {values} '
+            'ON CONFLICT (name, labels) DO UPDATE '
+            f'SET value = {table}.value + EXCLUDED.value',
+            params,
+        )
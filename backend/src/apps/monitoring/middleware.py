@@ -0,0 +1,183 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from apps.monitoring.metrics import REGISTRY, Counter, Histogram
+from apps.monitoring.timing import get_current_timing, track_request
+
+logger = logging.getLogger('apps.monitoring.requests')
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Time spent handling requests, by view.',
+    ['view', 'method'],
+)
+REQUESTS = Counter(
+    'http_requests_total',
+    'Handled requests, by view and status code.',
+    ['view', 'method', 'status'],
+)
+DB_QUERIES = Counter(
+    'db_queries_total',
+    'Database queries executed while handling requests, by view.',
+    ['view'],
+)
+DB_QUERY_DURATION = Counter(
+    'db_query_duration_seconds_total',
+    'Time spent in database queries while handling requests, by view.',
+    ['view'],
+)
+
+
+class MetricsMiddleware:
+    """
+    Record the latency, status and database queries of every request in the
+    Prometheus metrics, labelled by view class (`none` for unresolved URLs).
+
+    Enabled with the `METRICS_ENABLED` setting.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with track_request() as timing:
+            response = self.get_response(request)
+        self.record(request, response, timing, time.perf_counter() - started)
+        REGISTRY.maybe_flush()
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with track_request() as timing:
+            response = await self.get_response(request)
+        self.record(request, response, timing, time.perf_counter() - started)
+        # Only hop to a thread for the database when a flush is due.
+        if REGISTRY.is_flush_due():
+            await sync_to_async(REGISTRY.maybe_flush)()
+        return response
+
+    def record(self, request, response, timing, duration: float) -> None:
+        view = _view_name(request) or 'none'
+        REQUEST_DURATION.observe(duration, view=view, method=request.method)
+        REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        DB_QUERIES.inc(timing.db_queries, view=view)
+        DB_QUERY_DURATION.inc(timing.db_time, view=view)
+
+
+class RequestTimingMiddleware:
+    """
+    Measure where the time of every request goes.
+
+    Records the number of database queries, the time spent in them, in
+    serialization (`timed('serialize')` sections), in rendering and in total,
+    and the response size. The timings are added to the response as a
+    `Server-Timing` header and logged as one `key=value` line per request.
+    Queries slower than `SLOW_QUERY_MS` are logged with their SQL.
+
+    Enabled with the `REQUEST_TIMING` setting.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_query_threshold = settings.SLOW_QUERY_MS / 1000
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with track_request(self.slow_query_threshold) as timing:
+            response = self.get_response(request)
+        return self.report(request, response, timing, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with track_request(self.slow_query_threshold) as timing:
+            response = await self.get_response(request)
+        return self.report(request, response, timing, time.perf_counter() - started)
+
+    def report(self, request, response, timing, total: float):
+        # Streamed content is produced after the response leaves the
+        # middleware, so neither its queries nor its size are known here.
+        size = None if response.streaming else len(response.content)
+        response['Server-Timing'] = _server_timing(timing, total)
+
+        view = _view_name(request)
+        for sql, duration in timing.slow_queries:
+            logger.warning(
+                'slow query view=%s duration_ms=%.1f sql=%s',
+                view,
+                duration * 1000,
+                sql,
+            )
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'view': view,
+            'status': response.status_code,
+            'duration_ms': round(total * 1000, 1),
+            'db_queries': timing.db_queries,
+            'db_ms': round(timing.db_time * 1000, 1),
+            **{
+                f'{section}_ms': round(duration * 1000, 1)
+                for section, duration in timing.sections.items()
+            },
+            'size': size,
+        }
+        logger.info(
+            ' '.join(f'{name}=%s' for name in fields),
+            *fields.values(),
+            extra={'timing': fields},
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook.
+        timing = get_current_timing()
+        started = time.perf_counter()
+
+        def rendered(response):
+            timing.add('render', time.perf_counter() - started)
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+def _server_timing(timing, total: float) -> str:
+    metrics = [
+        f'db;dur={timing.db_time * 1000:.1f};desc="{timing.db_queries} queries"',
+        *(
+            f'{section};dur={duration * 1000:.1f}'
+            for section, duration in timing.sections.items()
+        ),
+        f'total;dur={total * 1000:.1f}',
+    ]
+    return ', '.join(metrics)
+
+
+def _view_name(request) -> str | None:
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    view = getattr(match.func, 'view_class', match.func)
+    return view.__name__
@@ -0,0 +1,28 @@
+from django.db import models
+
+
+class MetricSample(models.Model):
+    """
+    Total of one metric sample, summed over all processes.
+
+    Attributes:
+        name (str): Sample name, e.g. `http_requests_total` or
+            `http_request_duration_seconds_bucket`.
+        labels (str): Label set in exposition format, e.g. `{view="X"}`.
+            Empty for samples without labels.
+        value (float): Sum of the values flushed by every process.
+    """
+
+    name = models.CharField(max_length=200)
+    labels = models.TextField(blank=True, default='')
+    value = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name', 'labels'], name='unique_metric_sample'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name}{self.labels} {self.value}'
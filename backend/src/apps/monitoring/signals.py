@@ -0,0 +1,15 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from apps.monitoring.timing import measure_query
+
+
+@receiver(connection_created)
+def install_execute_wrapper(sender, connection, **kwargs):
+    """
+    Measure the queries of every new connection for the tracked requests.
+    """
+    if measure_query not in connection.execute_wrappers:
+        # First, because `execute_wrapper` blocks remove the last wrapper
+        # when they end, and a connection may be opened inside one.
+        connection.execute_wrappers.insert(0, measure_query)
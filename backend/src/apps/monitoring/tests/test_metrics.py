@@ -0,0 +1,139 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.monitoring.metrics import REGISTRY, Counter, Histogram, MetricsRegistry
+from apps.monitoring.models import MetricSample
+from apps.products.services import WildberriesParser
+from apps.products.tests.factories import ProductFactory
+
+
+def scrape(text):
+    """
+    Map the sample lines of an exposition to their values.
+    """
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            sample, value = line.rsplit(' ', 1)
+            samples[sample] = float(value)
+    return samples
+
+
+class MetricsRegistryTests(TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.requests = Counter(
+            'requests_total', 'Requests.', ['view'], registry=self.registry
+        )
+        self.latency = Histogram(
+            'latency_seconds', 'Latency.', buckets=(0.1, 1), registry=self.registry
+        )
+
+    def test_exposition(self):
+        self.requests.inc(view='List')
+        self.requests.inc(2, view='Say "hi"\n')
+        self.latency.observe(0.05)
+        self.latency.observe(0.5)
+
+        self.assertEqual(
+            self.registry.render(),
+            '# HELP latency_seconds Latency.\n'
+            '# TYPE latency_seconds histogram\n'
+            'latency_seconds_bucket{le="0.1"} 1\n'
+            'latency_seconds_bucket{le="1.0"} 2\n'
+            'latency_seconds_bucket{le="+Inf"} 2\n'
+            'latency_seconds_sum 0.55\n'
+            'latency_seconds_count 2\n'
+            '# HELP requests_total Requests.\n'
+            '# TYPE requests_total counter\n'
+            'requests_total{view="List"} 1\n'
+            'requests_total{view="Say \\"hi\\"\\n"} 2\n',
+        )
+
+    def test_flushes_add_up(self):
+        self.requests.inc(view='List')
+        self.registry.flush()
+        # Another process flushing the same sample.
+        other = MetricsRegistry()
+        other.add([('requests_total', '{view="List"}', 2)])
+        other.flush()
+
+        self.assertEqual(
+            scrape(self.registry.render())['requests_total{view="List"}'], 3
+        )
+        self.assertEqual(MetricSample.objects.count(), 1)
+
+    def test_empty_metrics(self):
+        samples = scrape(self.registry.render())
+        self.assertEqual(samples['latency_seconds_count'], 0)
+        self.assertNotIn('requests_total', samples)
+
+    def test_labels_are_checked(self):
+        with self.assertRaises(ValueError):
+            self.requests.inc(status='200')
+        with self.assertRaises(ValueError):
+            self.requests.inc(-1, view='List')
+
+    def test_maybe_flush_skips_transactions(self):
+        self.requests.inc(view='List')
+        # Test cases run in a transaction.
+        self.registry.maybe_flush(force=True)
+        self.assertFalse(MetricSample.objects.exists())
+
+
+@override_settings(METRICS_TOKEN='secret')
+class MetricsViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        ProductFactory.create_batch(2)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer secret')
+
+    def test_request_metrics(self):
+        before = scrape(self.client.get(reverse('metrics')).content.decode())
+        self.client.get(reverse('product-list-create'))
+        response = self.client.get(reverse('metrics'))
+        after = scrape(response.content.decode())
+
+        self.assertEqual(
+            response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8'
+        )
+        count = (
+            'http_request_duration_seconds_count'
+            '{view="ProductsListAPIView",method="GET"}'
+        )
+        self.assertEqual(after[count] - before.get(count, 0), 1)
+        queries = 'db_queries_total{view="ProductsListAPIView"}'
+        self.assertGreater(after[queries] - before.get(queries, 0), 0)
+
+    def test_crawler_metrics(self):
+        parser = WildberriesParser()
+        self.addCleanup(parser.close)
+        before = scrape(REGISTRY.render())
+        parser.parse({'id': 1})
+        with self.assertLogs('apps.products.services', 'WARNING'):
+            parser.parse(None)
+        parser.save_batch([parser.parse({'id': 2})])
+        after = scrape(REGISTRY.render())
+
+        def delta(sample):
+            return after[sample] - before.get(sample, 0)
+
+        self.assertEqual(delta('wb_items_parsed_total'), 2)
+        self.assertEqual(delta('wb_parse_failures_total'), 1)
+        self.assertEqual(delta('wb_products_saved_total{result="created"}'), 1)
+
+    def test_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer other')
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        self.client.credentials()
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_without_token_only_in_debug(self):
+        self.client.credentials()
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
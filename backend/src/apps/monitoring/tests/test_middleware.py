@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.monitoring.timing import timed, track_request
+from apps.products.models import Product
+from apps.products.tests.factories import ProductFactory
+
+
+@override_settings(REQUEST_TIMING=True, SLOW_QUERY_MS=100)
+class RequestTimingMiddlewareTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        ProductFactory.create_batch(3)
+
+    def test_server_timing_header(self):
+        with self.assertLogs('apps.monitoring.requests', 'INFO') as logs:
+            response = self.client.get(reverse('product-list-create'))
+
+        metrics = dict(
+            metric.split(';', 1)[0:2]
+            for metric in response['Server-Timing'].split(', ')
+        )
+        self.assertEqual(set(metrics), {'db', 'serialize', 'render', 'total'})
+        self.assertIn('desc="', metrics['db'])
+        self.assertNotIn('slow query', '\n'.join(logs.output))
+
+        (record,) = logs.records
+        timing = record.timing
+        self.assertEqual(timing['view'], 'ProductsListAPIView')
+        self.assertEqual(timing['status'], 200)
+        self.assertGreater(timing['db_queries'], 0)
+        self.assertEqual(timing['size'], len(response.content))
+        self.assertIn('view=ProductsListAPIView', record.getMessage())
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_slow_queries_are_logged_with_sql(self):
+        with self.assertLogs('apps.monitoring.requests', 'WARNING') as logs:
+            self.client.get(reverse('product-list-create'))
+        # A database cache logs its own queries too.
+        self.assertTrue(any(Product._meta.db_table in output for output in logs.output))
+
+    async def test_counts_queries_under_asgi(self):
+        # Under ASGI, queries run in executor threads, which have connections
+        # of their own.
+        for name in ('product-list-create', 'async-product-list'):
+            with (
+                self.subTest(view=name),
+                self.assertLogs('apps.monitoring.requests', 'INFO') as logs,
+            ):
+                response = await self.async_client.get(reverse(name))
+                self.assertGreater(logs.records[-1].timing['db_queries'], 0)
+                self.assertNotIn('desc="0 queries"', response['Server-Timing'])
+
+    @override_settings(REQUEST_TIMING=False)
+    def test_disabled(self):
+        response = self.client.get(reverse('product-list-create'))
+        self.assertNotIn('Server-Timing', response)
+
+
+class TimingTests(APITestCase):
+    def test_counts_queries_and_sections(self):
+        with track_request() as timing:
+            list(Product.objects.all())
+            with timed('serialize'):
+                pass
+        self.assertEqual(timing.db_queries, 1)
+        self.assertIn('serialize', timing.sections)
+        self.assertEqual(timing.slow_queries, [])
+
+    def test_timed_outside_request(self):
+        with timed('serialize'):
+            pass
@@ -0,0 +1,127 @@
+"""
+Per-request timings: database queries and named sections of the response
+cycle (serialization, rendering).
+
+Every database connection gets an execute wrapper when it is opened
+(see `signals`), so queries are measured whether `DEBUG` is on or
+not. The wrapper finds the requests being tracked (`track_request`) in a
+context variable rather than on the connection: under ASGI, queries run in
+executor threads, each with connections of its own, and the context is
+copied into those threads. Code that wants its own section in the report
+wraps it in `timed`, which does nothing outside a tracked request.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+# Nested `track_request` blocks (one per middleware) all see every query.
+_current_timings: ContextVar[tuple['RequestTiming', ...]] = ContextVar(
+    'request_timings', default=()
+)
+
+
+@dataclass
+class RequestTiming:
+    """
+    Timings collected during one request.
+
+    Attributes:
+        slow_query_threshold (float | None): Queries taking at least this
+            many seconds are kept in `slow_queries`. None keeps none.
+        db_queries (int): Number of executed queries.
+        db_time (float): Total time spent in queries, in seconds.
+        sections (dict[str, float]): Time spent in every `timed` section, in
+            seconds.
+        slow_queries (list[tuple[str, float]]): SQL and duration of the slow
+            queries.
+    """
+
+    slow_query_threshold: float | None = None
+    db_queries: int = 0
+    db_time: float = 0.0
+    sections: dict[str, float] = field(default_factory=dict)
+    slow_queries: list[tuple[str, float]] = field(default_factory=list)
+
+    def record(self, sql: str, duration: float) -> None:
+        """
+        Count a query that took `duration` seconds.
+        """
+        self.db_queries += 1
+        self.db_time += duration
+        if (
+            self.slow_query_threshold is not None
+            and duration >= self.slow_query_threshold
+        ):
+            self.slow_queries.append((sql, duration))
+
+    def add(self, section: str, duration: float) -> None:
+        """
+        Add `duration` seconds to a section.
+        """
+        self.sections[section] = self.sections.get(section, 0.0) + duration
+
+
+def get_current_timing() -> RequestTiming | None:
+    """
+    Get the timings of the request being tracked, if any.
+    """
+    timings = _current_timings.get()
+    return timings[-1] if timings else None
+
+
+def measure_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper adding every query to the tracked requests.
+    """
+    timings = _current_timings.get()
+    if not timings:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        for timing in timings:
+            timing.record(sql, duration)
+
+
+@contextmanager
+def track_request(slow_query_threshold: float | None = None) -> Iterator[RequestTiming]:
+    """
+    Collect the timings of the code run inside the block.
+
+    Args:
+        slow_query_threshold (float, optional): See
+            `RequestTiming.slow_query_threshold`.
+
+    Yields:
+        RequestTiming: The timings, filled in as the block runs.
+    """
+    timing = RequestTiming(slow_query_threshold=slow_query_threshold)
+    token = _current_timings.set((*_current_timings.get(), timing))
+    try:
+        yield timing
+    finally:
+        _current_timings.reset(token)
+
+
+@contextmanager
+def timed(section: str) -> Iterator[None]:
+    """
+    Add the time spent in the block to a section of the tracked request.
+
+    Args:
+        section (str): Section name, e.g. `serialize`.
+    """
+    timing = get_current_timing()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(section, time.perf_counter() - started)
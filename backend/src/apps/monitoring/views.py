@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from apps.monitoring.metrics import CONTENT_TYPE, REGISTRY
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Serve the metrics of all processes in the Prometheus text format.
+
+    Outside of DEBUG, the metrics are only served with a token, as they
+    expose the API's views and timings.
+    """
+    token = settings.METRICS_TOKEN
+    if not settings.METRICS_ENABLED or not (token or settings.DEBUG):
+        raise Http404
+    authorization = request.headers.get('Authorization', '')
+    if token and not constant_time_compare(authorization, f'Bearer {token}'):
+        return HttpResponse(status=401, headers={'WWW-Authenticate': 'Bearer'})
+    return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)
@@ -1,11 +1,11 @@
 from django import forms
 from django.contrib import admin, messages
-from django.shortcuts import redirect
+from django.shortcuts import get_object_or_404, redirect
 from django.template.response import TemplateResponse
 from django.urls import path
 
-from apps.products.models import Product
-from apps.products.services import WildberriesParser
+from apps.products.changelist import EstimatedCountPaginator, RangeListFilter
+from apps.products.models import ParseJob, Product, QuerySummary
 
 
 class ParseWBForm(forms.Form):
@@ -19,21 +19,45 @@ class ParseWBForm(forms.Form):
     )
 
 
+class PriceRangeFilter(RangeListFilter):
+    title = 'price'
+    parameter_name = 'price'
+
+
+class RatingRangeFilter(RangeListFilter):
+    title = 'rating'
+    parameter_name = 'rating'
+    edges = (3, 4, 4.5, 4.8)
+
+
+class ReviewsRangeFilter(RangeListFilter):
+    title = 'reviews count'
+    parameter_name = 'reviews_count'
+
+
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
     list_display = (
         'name',
+        'wb_id',
         'price',
         'discounted_price',
         'rating',
         'reviews_count',
+        'search_query',
         'created_at',
     )
     search_fields = ('name',)
-    list_filter = ('rating', 'price', 'reviews_count')
+    list_filter = (RatingRangeFilter, PriceRangeFilter, ReviewsRangeFilter)
+    # Both counts are exact COUNT(*) queries by default, which take seconds
+    # on millions of products.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     change_list_template = 'admin/products_changelist.html'
 
+    PARSE_STATUS_REFRESH_INTERVAL = 2
+
     def get_urls(self):
         urls = super().get_urls()
         custom_urls = [
@@ -42,6 +66,11 @@ class ProductAdmin(admin.ModelAdmin):
                 self.admin_site.admin_view(self.parse_wb_view),
                 name='parse-wb-products',
             ),
+            path(
+                'parse_wb/<int:job_id>/',
+                self.admin_site.admin_view(self.parse_wb_status_view),
+                name='parse-wb-status',
+            ),
         ]
         return custom_urls + urls
 
@@ -49,33 +78,77 @@ class ProductAdmin(admin.ModelAdmin):
         if request.method == 'POST':
             form = ParseWBForm(request.POST)
             if form.is_valid():
-                query = form.cleaned_data['query']
-                pages = form.cleaned_data['pages']
-                limit = form.cleaned_data['limit']
-                parser = WildberriesParser()
-                total_saved = 0
-                for page in range(1, pages + 1):
-                    try:
-                        products = parser.fetch(query, page=page)
-                    except Exception:
-                        continue
-                    if not products:
-                        break
-                    for item in products:
-                        product_data = parser.parse(item)
-                        created = parser.save(product_data)
-                        if created:
-                            total_saved += 1
-                        if limit and total_saved >= limit:
-                            break
-                    if limit and total_saved >= limit:
-                        break
+                job = ParseJob.objects.create(
+                    query=form.cleaned_data['query'],
+                    pages=form.cleaned_data['pages'],
+                    limit=form.cleaned_data['limit'],
+                )
                 self.message_user(
                     request,
-                    f'Parsed and saved {total_saved} new products.',
+                    f'Queued parsing of "{job.query}". '
+                    'It will run in the background worker.',
                     messages.SUCCESS,
                 )
-                return redirect('..')
+                return redirect('admin:parse-wb-status', job_id=job.id)
         else:
             form = ParseWBForm()
         return TemplateResponse(request, 'admin/parse_wb_form.html', {'form': form})
+
+    def parse_wb_status_view(self, request, job_id):
+        job = get_object_or_404(ParseJob, id=job_id)
+        context = {
+            **self.admin_site.each_context(request),
+            'job': job,
+            'refresh_interval': self.PARSE_STATUS_REFRESH_INTERVAL,
+        }
+        return TemplateResponse(request, 'admin/parse_wb_status.html', context)
+
+
+@admin.register(ParseJob)
+class ParseJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'query',
+        'status',
+        'pages_done',
+        'pages',
+        'products_created',
+        'products_updated',
+        'created_at',
+        'finished_at',
+    )
+    list_filter = ('status',)
+    search_fields = ('query',)
+    readonly_fields = (
+        'status',
+        'pages_done',
+        'products_parsed',
+        'products_created',
+        'products_updated',
+        'error',
+        'attempts',
+        'created_at',
+        'started_at',
+        'heartbeat_at',
+        'finished_at',
+    )
+
+
+@admin.register(QuerySummary)
+class QuerySummaryAdmin(admin.ModelAdmin):
+    list_display = (
+        'query',
+        'product_count',
+        'price_min',
+        'price_avg',
+        'price_max',
+        'rating_avg',
+        'discount_avg',
+        'updated_at',
+    )
+    search_fields = ('query',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
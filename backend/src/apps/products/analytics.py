@@ -0,0 +1,325 @@
+"""
+Aggregate analytics over filtered products.
+
+Everything is computed in Postgres, so responses stay small no matter how
+many products match: histograms use `width_bucket`, percentiles use
+`percentile_cont` and the rating × reviews matrix is a single GROUP BY.
+"""
+
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import (
+    Aggregate,
+    Avg,
+    Count,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    Func,
+    IntegerField,
+    Max,
+    Min,
+    Q,
+    QuerySet,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Cast, Greatest, Least
+
+PRICE_FIELDS = ('price', 'discounted_price')
+DEFAULT_BINS = 10
+MAX_BINS = 50
+DEFAULT_PERCENTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+MAX_RATING = 5
+RATING_MATRIX_BINS = 5
+REVIEWS_THRESHOLDS = (0, 1, 10, 100, 1000, 10000)
+
+
+class WidthBucket(Func):
+    """
+    `width_bucket(operand, low, high, count)` or
+    `width_bucket(operand, thresholds)`.
+    """
+
+    function = 'width_bucket'
+    output_field = IntegerField()
+
+
+class PercentileCont(Aggregate):
+    """
+    `percentile_cont(fractions) WITHIN GROUP (ORDER BY expression)`, which
+    returns one interpolated value per fraction.
+    """
+
+    function = 'percentile_cont'
+    template = (
+        '%(function)s(%(fractions)s::double precision[]) '
+        'WITHIN GROUP (ORDER BY %(expressions)s)'
+    )
+
+    def __init__(self, expression, fractions, **extra):
+        super().__init__(expression, output_field=ArrayField(FloatField()), **extra)
+        self.fractions = list(fractions)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = super().as_sql(
+            compiler, connection, fractions='%s', **extra_context
+        )
+        return sql, (self.fractions, *params)
+
+
+def discount_percent():
+    """
+    Discount depth of a product in percent of its full price.
+    """
+    return ExpressionWrapper(
+        (F('price') - F('discounted_price')) * 100.0 / F('price'),
+        output_field=FloatField(),
+    )
+
+
+def get_summary(products: QuerySet) -> dict:
+    """
+    Get headline numbers of the products: count, average rating, total
+    reviews and average discount.
+
+    Args:
+        products (QuerySet): Products to aggregate.
+
+    Returns:
+        dict: `count`, `avg_rating`, `total_reviews` and `avg_discount`.
+    """
+    summary = products.order_by().aggregate(**_summary_aggregates())
+    summary['total_reviews'] = summary['total_reviews'] or 0
+    return summary
+
+
+async def aget_summary(products: QuerySet) -> dict:
+    """
+    Async version of `get_summary`.
+    """
+    summary = await products.order_by().aaggregate(**_summary_aggregates())
+    summary['total_reviews'] = summary['total_reviews'] or 0
+    return summary
+
+
+def _summary_aggregates() -> dict:
+    return {
+        'count': Count('id'),
+        'avg_rating': Avg('rating'),
+        'total_reviews': Sum('reviews_count'),
+        'avg_discount': Avg(discount_percent(), filter=Q(price__gt=0)),
+    }
+
+
+def get_histogram(
+    products: QuerySet,
+    field: str,
+    bins: int = DEFAULT_BINS,
+    low=None,
+    high=None,
+) -> list[dict]:
+    """
+    Count products in `bins` equal-width buckets of `field`.
+
+    Args:
+        products (QuerySet): Products to aggregate.
+        field (str): Numeric field to bucket.
+        bins (int): Number of buckets.
+        low: Lower edge of the first bucket. Defaults to the minimum value.
+        high: Upper edge of the last bucket (inclusive). Defaults to the
+            maximum value.
+
+    Returns:
+        list[dict]: One `{'min', 'max', 'count'}` item per bucket, empty
+            buckets included. Empty if no product matches.
+    """
+    products = products.order_by()
+    if low is None or high is None:
+        bounds = products.aggregate(low=Min(field), high=Max(field))
+        if bounds['low'] is None:
+            return []
+        low = bounds['low'] if low is None else low
+        high = bounds['high'] if high is None else high
+    low, high = float(low), float(high)
+
+    if low >= high:
+        count = products.filter(**{f'{field}__gte': low, f'{field}__lte': high})
+        return [{'min': low, 'max': high, 'count': count.count()}]
+
+    # Values equal to `high` fall into the overflow bucket `bins + 1`;
+    # clamp them into the last bucket so the upper edge is inclusive.
+    bucket = Least(
+        WidthBucket(F(field), Value(low), Value(high), Value(bins)), Value(bins)
+    )
+    counts = dict(
+        products.filter(**{f'{field}__gte': low, f'{field}__lte': high})
+        .annotate(bucket=bucket)
+        .values('bucket')
+        .annotate(count=Count('id'))
+        .values_list('bucket', 'count')
+    )
+
+    width = (high - low) / bins
+    return [
+        {
+            'min': round(low + width * i, 2),
+            'max': round(low + width * (i + 1), 2),
+            'count': counts.get(i + 1, 0),
+        }
+        for i in range(bins)
+    ]
+
+
+def get_percentiles(
+    products: QuerySet, field: str, fractions=DEFAULT_PERCENTILES
+) -> list[dict]:
+    """
+    Get interpolated percentiles of `field`.
+
+    Args:
+        products (QuerySet): Products to aggregate.
+        field (str): Numeric field.
+        fractions (Iterable[float]): Percentiles as fractions between 0 and 1.
+
+    Returns:
+        list[dict]: One `{'percentile', 'value'}` item per fraction; values
+            are None if no product matches.
+    """
+    fractions = list(fractions)
+    aggregate = products.order_by().aggregate(values=PercentileCont(field, fractions))
+    values = aggregate['values'] or [None] * len(fractions)
+    return [
+        {'percentile': fraction, 'value': value}
+        for fraction, value in zip(fractions, values, strict=True)
+    ]
+
+
+def get_discounts(products: QuerySet) -> dict:
+    """
+    Get discount depth statistics, overall and per rating rounded to 0.1.
+
+    Args:
+        products (QuerySet): Products to aggregate.
+
+    Returns:
+        dict: `avg_discount`, `max_discount` and `discounted_share` (share of
+            products sold below the full price), plus `by_rating` items with
+            `rating`, `avg_discount` and `count`.
+    """
+    products = products.order_by().filter(price__gt=0)
+    stats = products.aggregate(
+        count=Count('id'),
+        discounted=Count('id', filter=Q(discounted_price__lt=F('price'))),
+        avg_discount=Avg(discount_percent()),
+        max_discount=Max(discount_percent()),
+    )
+    count = stats.pop('count')
+    discounted = stats.pop('discounted')
+    stats['discounted_share'] = discounted / count if count else None
+
+    by_rating = (
+        products.annotate(
+            rating_bucket=Cast('rating', DecimalField(max_digits=3, decimal_places=1))
+        )
+        .values('rating_bucket')
+        .annotate(avg_discount=Avg(discount_percent()), count=Count('id'))
+        .order_by('rating_bucket')
+    )
+    stats['by_rating'] = [
+        {
+            'rating': float(row['rating_bucket']),
+            'avg_discount': row['avg_discount'],
+            'count': row['count'],
+        }
+        for row in by_rating
+    ]
+    return stats
+
+
+def get_rating_reviews_matrix(products: QuerySet) -> dict:
+    """
+    Count products per rating bucket and reviews count bucket.
+
+    Ratings are split into `RATING_MATRIX_BINS` equal-width buckets between
+    0 and `MAX_RATING`; reviews counts into the log-scale buckets given by
+    `REVIEWS_THRESHOLDS` (0, 1-9, 10-99, ...).
+
+    Args:
+        products (QuerySet): Products to aggregate.
+
+    Returns:
+        dict: `rating_buckets` and `reviews_buckets` edges and `counts`, a
+            matrix with one row per rating bucket and one column per reviews
+            bucket.
+    """
+    rating_bucket = Greatest(
+        Least(
+            WidthBucket(
+                F('rating'),
+                Value(0.0),
+                Value(float(MAX_RATING)),
+                Value(RATING_MATRIX_BINS),
+            ),
+            Value(RATING_MATRIX_BINS),
+        ),
+        Value(1),
+    )
+    reviews_bucket = WidthBucket(
+        F('reviews_count'),
+        Value(list(REVIEWS_THRESHOLDS), output_field=ArrayField(IntegerField())),
+    )
+    cells = (
+        products.order_by()
+        .annotate(rating_bucket=rating_bucket, reviews_bucket=reviews_bucket)
+        .values('rating_bucket', 'reviews_bucket')
+        .annotate(count=Count('id'))
+    )
+
+    counts = [[0] * len(REVIEWS_THRESHOLDS) for _ in range(RATING_MATRIX_BINS)]
+    for cell in cells:
+        counts[cell['rating_bucket'] - 1][cell['reviews_bucket'] - 1] += cell['count']
+
+    width = MAX_RATING / RATING_MATRIX_BINS
+    return {
+        'rating_buckets': [
+            {'min': width * i, 'max': width * (i + 1)}
+            for i in range(RATING_MATRIX_BINS)
+        ],
+        'reviews_buckets': [
+            {'min': low, 'max': high - 1 if high is not None else None}
+            for low, high in zip(
+                REVIEWS_THRESHOLDS, (*REVIEWS_THRESHOLDS[1:], None), strict=True
+            )
+        ],
+        'counts': counts,
+    }
+
+
+def get_analytics(
+    products: QuerySet,
+    field: str = 'discounted_price',
+    bins: int = DEFAULT_BINS,
+    percentiles=DEFAULT_PERCENTILES,
+) -> dict:
+    """
+    Get everything the dashboard shows in one go.
+
+    Args:
+        products (QuerySet): Products to aggregate.
+        field (str): Price field of the price histogram and percentiles.
+        bins (int): Number of histogram buckets.
+        percentiles (Iterable[float]): Price percentiles to compute.
+
+    Returns:
+        dict: `summary`, `price_histogram`, `rating_histogram`,
+            `price_percentiles`, `discounts` and `rating_reviews`.
+    """
+    return {
+        'summary': get_summary(products),
+        'price_histogram': get_histogram(products, field, bins),
+        'rating_histogram': get_histogram(products, 'rating', bins, 0, MAX_RATING),
+        'price_percentiles': get_percentiles(products, field, percentiles),
+        'discounts': get_discounts(products),
+        'rating_reviews': get_rating_reviews_matrix(products),
+    }
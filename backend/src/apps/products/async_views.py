@@ -0,0 +1,103 @@
+"""
+Async variants of the products endpoints, for ASGI servers.
+
+The views query the database with the async ORM and share the filters,
+pagination, serializers and response cache of the DRF views in `views.py`,
+so their responses are the same. While a request waits on the database or
+on a slow client, the worker's event loop serves other requests instead of
+holding a thread.
+
+DRF views cannot be async, so these are plain Django views that wrap the
+request in a DRF `Request` and render DRF `Response`s with the JSON
+renderer of the API.
+"""
+
+from django.http import Http404
+from django.views import View
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from apps.monitoring.timing import timed
+from apps.products.analytics import aget_summary
+from apps.products.cache import cache_products_response
+from apps.products.pagination import get_paginator
+from apps.products.serializers import (
+    AnalyticsSummarySerializer,
+    ProductRowSerializer,
+    ProductSerializer,
+    get_product_rows,
+    parse_product_fields,
+)
+from apps.products.services import aget_product_by_id, get_products_with_filters
+
+
+class AsyncAPIView(View):
+    """
+    Base of the async views.
+
+    Handlers are `async def` methods that get a DRF `Request` and return a
+    DRF `Response`, like the handlers of an `APIView`. API exceptions and
+    `Http404` become JSON error responses, as DRF's exception handler makes
+    them.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(request)
+        try:
+            response = await super().dispatch(request, *args, **kwargs)
+        except (APIException, Http404) as exc:
+            response = exception_handler(exc, {'view': self, 'request': request})
+        return self.finalize_response(response)
+
+    def finalize_response(self, response):
+        if not isinstance(response, Response):
+            return response
+        # The first default renderer is the JSON one.
+        response.accepted_renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+        response.accepted_media_type = response.accepted_renderer.media_type
+        response.renderer_context = {'view': self, 'response': response}
+        with timed('render'):
+            return response.render()
+
+
+class ProductsListAsyncView(AsyncAPIView):
+    """
+    Async variant of `ProductsListAPIView`.
+    """
+
+    @cache_products_response
+    async def get(self, request: Request):
+        fields = parse_product_fields(request.query_params.get('fields'))
+        products = get_products_with_filters(request.query_params)
+        products = get_product_rows(products, fields)
+        paginator = get_paginator(request.query_params.get('pagination'))
+        page = await paginator.apaginate_queryset(products, request, view=self)
+        with timed('serialize'):
+            data = ProductRowSerializer(page, many=True, fields=fields).data
+        return paginator.get_paginated_response(data)
+
+
+class ProductsDetailAsyncView(AsyncAPIView):
+    """
+    Async variant of `ProductsDetailAPIView`.
+    """
+
+    @cache_products_response
+    async def get(self, _: Request, id: int):
+        product = await aget_product_by_id(id)
+        return Response(ProductSerializer(product).data)
+
+
+class AnalyticsSummaryAsyncView(AsyncAPIView):
+    """
+    Async variant of `AnalyticsSummaryAPIView`.
+    """
+
+    @cache_products_response
+    async def get(self, request: Request):
+        products = get_products_with_filters(request.query_params)
+        summary = await aget_summary(products)
+        return Response(AnalyticsSummarySerializer(summary).data)
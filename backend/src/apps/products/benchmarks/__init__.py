@@ -0,0 +1,90 @@
+"""
+Micro-benchmarks for the products read and write paths.
+
+Benchmarks run against a throwaway database created next to the configured
+one (like the test runner does), so they never touch real data.
+"""
+
+import random
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import NamedTuple
+
+from django.db import connection
+from django.utils import timezone
+from faker import Faker
+
+from apps.products.models import Product
+
+
+class BenchmarkResult(NamedTuple):
+    name: str
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'rows': self.rows,
+            'seconds': round(self.seconds, 6),
+            'rows_per_sec': round(self.rows_per_sec, 1),
+        }
+
+
+@contextmanager
+def benchmark_database() -> Iterator[None]:
+    """
+    Create an empty, migrated database for the duration of the block.
+    """
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def best_of(func: Callable[[], object], repeat: int) -> float:
+    """
+    Run `func` `repeat` times and return the fastest run in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def seed_products(count: int, batch_size: int = 5000, start: int = 0) -> None:
+    """
+    Insert `count` products built by `ProductFactory`.
+
+    The factory's random values are seeded from `start`, so the same calls
+    always insert the same products and benchmarks of different commits run
+    on the same data.
+
+    Args:
+        count (int): Number of products to insert.
+        batch_size (int, optional): Products per INSERT. Default: 5000.
+        start (int, optional): Number of products seeded before; the new
+            products get article ids from `start + 1`. Default: 0.
+    """
+    # factory_boy is a dependency, but the factories live with the tests.
+    from apps.products.tests.factories import ProductFactory
+
+    random.seed(start)
+    Faker.seed(start)
+    now = timezone.now()
+    for offset in range(0, count, batch_size):
+        products = ProductFactory.build_batch(min(batch_size, count - offset))
+        for i, product in enumerate(products, start=start + offset + 1):
+            product.wb_id = i
+            product.created_at = now - timedelta(minutes=i)
+        Product.objects.bulk_create(products)
@@ -0,0 +1,155 @@
+"""
+Latency and throughput of the products API.
+
+Requests go through the whole Django stack (middleware, views, rendering)
+with the test client, in process: there is no web server or network in the
+numbers, so they measure what one gunicorn worker spends per request.
+"""
+
+import random
+import statistics
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from urllib.parse import urlencode
+
+from django.test import Client
+from django.urls import reverse
+
+from apps.products.models import Product
+from apps.products.services import ORDERING_FIELDS
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+@dataclass
+class LatencyResult:
+    """
+    Latencies of the requests of one scenario.
+
+    Attributes:
+        name (str): Scenario name.
+        latencies (list[float]): Request latencies in seconds.
+    """
+
+    name: str
+    latencies: list[float]
+
+    @property
+    def requests_per_sec(self) -> float:
+        total = sum(self.latencies)
+        return len(self.latencies) / total if total else 0.0
+
+    def percentile(self, percent: int) -> float:
+        if len(self.latencies) < 2:
+            return self.latencies[0]
+        cut_points = statistics.quantiles(self.latencies, n=100, method='inclusive')
+        return cut_points[percent - 1]
+
+    def as_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'requests': len(self.latencies),
+            **{
+                f'p{percent}_ms': round(self.percentile(percent) * 1000, 3)
+                for percent in PERCENTILES
+            },
+            'mean_ms': round(statistics.fmean(self.latencies) * 1000, 3),
+            'max_ms': round(max(self.latencies) * 1000, 3),
+            'requests_per_sec': round(self.requests_per_sec, 1),
+        }
+
+
+def list_scenarios() -> dict[str, dict]:
+    """
+    Query parameters of the `/products/` scenarios: every filter alone, all
+    of them together, a name search, a sparse fieldset and every ordering.
+
+    Filter values cut the `ProductFactory` distributions (prices 100-10000,
+    ratings 1-5, 0-1000 reviews) at selective and unselective points.
+    """
+    product = Product.objects.order_by('id').first()
+    scenarios = {
+        'default': {},
+        'min_price': {'min_price': 5000},
+        'max_price': {'max_price': 500},
+        'price_range': {'min_price': 1000, 'max_price': 1100},
+        'min_rating': {'min_rating': 4.9},
+        'min_reviews': {'min_reviews': 500},
+        'all_filters': {
+            'min_price': 1000,
+            'max_price': 5000,
+            'min_rating': 4,
+            'min_reviews': 100,
+        },
+        'search': {'search': product.name if product else 'product'},
+        'cursor': {'pagination': 'cursor'},
+        'fields': {'fields': 'id,price,rating'},
+    }
+    for ordering in ORDERING_FIELDS:
+        scenarios[f'ordering={ordering}'] = {'ordering': ordering}
+    return scenarios
+
+
+def measure(
+    client: Client, name: str, urls: Sequence[str], requests: int, warmup: int
+) -> LatencyResult:
+    """
+    Request `urls` in turn and time every response.
+
+    Args:
+        client (Client): Client to send the requests with.
+        name (str): Scenario name.
+        urls (Sequence[str]): URLs to cycle through.
+        requests (int): Number of timed requests.
+        warmup (int): Number of untimed requests sent first.
+
+    Raises:
+        AssertionError: If a response is not successful.
+    """
+    latencies = []
+    for i in range(warmup + requests):
+        url = urls[i % len(urls)]
+        started = time.perf_counter()
+        response = client.get(url)
+        latency = time.perf_counter() - started
+        if response.status_code != 200:
+            raise AssertionError(f'GET {url} returned {response.status_code}')
+        if i >= warmup:
+            latencies.append(latency)
+    return LatencyResult(name, latencies)
+
+
+def benchmark_api(requests: int = 200, warmup: int = 20) -> list[LatencyResult]:
+    """
+    Time `/products/` under every scenario of `list_scenarios` and
+    `/products/<id>/` for random products.
+
+    Args:
+        requests (int): Number of timed requests per scenario.
+        warmup (int): Number of untimed requests per scenario.
+
+    Returns:
+        list[LatencyResult]: One result per scenario.
+    """
+    client = Client()
+    list_url = reverse('product-list-create')
+    results = [
+        measure(
+            client,
+            f'products_list[{name}]',
+            [f'{list_url}?{urlencode(params)}' if params else list_url],
+            requests,
+            warmup,
+        )
+        for name, params in list_scenarios().items()
+    ]
+
+    ids = list(Product.objects.values_list('id', flat=True)[:100000])
+    rng = random.Random(len(ids))
+    detail_urls = [
+        reverse('product-detail', args=[product_id])
+        for product_id in rng.sample(ids, min(len(ids), warmup + requests))
+    ]
+    results.append(measure(client, 'products_detail', detail_urls, requests, warmup))
+    return results
@@ -0,0 +1,126 @@
+"""
+Throughput of parsing and saving Wildberries search results.
+
+Payloads are recorded responses (dump files, see `apps.products.dumps`) or
+generated items shaped like them. They are read into memory before timing,
+so only `WildberriesParser.parse` and the writes are measured.
+"""
+
+import random
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+from apps.products.benchmarks import BenchmarkResult
+from apps.products.dumps import copy_products, iter_dump_pages
+from apps.products.models import Product
+from apps.products.services import (
+    DEFAULT_CHUNK_SIZE,
+    CrawlProgress,
+    WildberriesParser,
+    chunked,
+    iter_parsed,
+)
+
+BENCHMARK_QUERY = 'benchmark'
+# Generated items get article ids far above the seeded products.
+GENERATED_WB_ID_START = 10**9
+
+
+def generate_pages(items: int, per_page: int = 100) -> list[list[dict]]:
+    """
+    Generate search result pages with `items` items in the Wildberries
+    response format, the same ones for the same arguments.
+    """
+    rng = random.Random(items)
+    generated = []
+    for i in range(items):
+        basic = rng.randint(10000, 1000000)
+        generated.append(
+            {
+                'id': GENERATED_WB_ID_START + i,
+                'name': f'Benchmark product {i}',
+                'brand': 'Benchmark',
+                'reviewRating': round(rng.uniform(1, 5), 1),
+                'feedbacks': rng.randint(0, 5000),
+                'sizes': [
+                    {
+                        'name': '',
+                        'price': {
+                            'basic': basic,
+                            'product': basic,
+                            'total': int(basic * rng.uniform(0.5, 1)),
+                        },
+                    }
+                ],
+            }
+        )
+    return [generated[start : start + per_page] for start in range(0, items, per_page)]
+
+
+def read_pages(paths: Iterable[str | Path]) -> list[list[dict]]:
+    """
+    Read the pages of recorded responses.
+
+    Raises:
+        ValueError: If a dump file cannot be read.
+    """
+    progress = CrawlProgress()
+    pages = list(iter_dump_pages(paths, progress))
+    if progress.errors:
+        raise ValueError('; '.join(progress.errors))
+    return pages
+
+
+def benchmark_ingestion(
+    pages: list[list[dict]], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> list[BenchmarkResult]:
+    """
+    Time parsing the pages alone, then parsing and saving them with
+    `WildberriesParser.save_batch` (like the crawler) and with
+    `copy_products` (like `load_wb_dump`), once creating the products and
+    once updating them.
+
+    The products are deleted again after each writer.
+
+    Args:
+        pages (list[list[dict]]): Raw items, page by page.
+        chunk_size (int): Products per write. Default: 500.
+
+    Returns:
+        list[BenchmarkResult]: Results of every step; rows are raw items.
+    """
+    items = sum(map(len, pages))
+    parser = WildberriesParser()
+    wb_ids = {item.get('id') for page in pages for item in page}
+
+    def parse():
+        return list(iter_parsed(parser, pages, CrawlProgress()))
+
+    def save_batches():
+        for chunk in chunked(iter_parsed(parser, pages, CrawlProgress()), chunk_size):
+            parser.save_batch(chunk, search_query=BENCHMARK_QUERY)
+
+    def copy():
+        for chunk in chunked(iter_parsed(parser, pages, CrawlProgress()), chunk_size):
+            copy_products(chunk, search_query=BENCHMARK_QUERY)
+
+    results = [BenchmarkResult('parse', items, _timed(parse))]
+    try:
+        for name, save in (('save_batch', save_batches), ('copy', copy)):
+            results.append(
+                BenchmarkResult(f'parse+{name}[create]', items, _timed(save))
+            )
+            results.append(
+                BenchmarkResult(f'parse+{name}[update]', items, _timed(save))
+            )
+            Product.objects.filter(wb_id__in=wb_ids).delete()
+    finally:
+        parser.close()
+    return results
+
+
+def _timed(func) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
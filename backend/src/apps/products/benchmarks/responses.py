@@ -0,0 +1,115 @@
+"""
+CPU time and size of `/products/` responses per JSON renderer and content
+coding.
+
+CPU time is process time (`time.process_time`), so waiting on the database
+is not in it: it is what rendering and compressing cost a worker, which the
+latencies of `benchmarks.api` mix with query time.
+"""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from urllib.parse import urlencode
+
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from apps.products.pagination import MAX_PAGE_SIZE
+from config.middleware import COMPRESSORS, ENCODINGS
+from config.renderers import ORJSON_AVAILABLE, ORJSONRenderer
+
+IDENTITY = 'identity'
+
+
+@dataclass
+class ResponseResult:
+    """
+    Cost of one kind of response.
+
+    Attributes:
+        name (str): Scenario name.
+        cpu_seconds (float): CPU time per response, in seconds.
+        size (int): Response body size in bytes, as sent over the wire.
+    """
+
+    name: str
+    cpu_seconds: float
+    size: int
+
+    def as_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'cpu_ms': round(self.cpu_seconds * 1000, 3),
+            'bytes': self.size,
+        }
+
+
+def cpu_time(func: Callable[[], object], repeat: int) -> float:
+    """
+    Run `func` `repeat` times and return the mean CPU time of a run.
+    """
+    started = time.process_time()
+    for _ in range(repeat):
+        func()
+    return (time.process_time() - started) / repeat
+
+
+def benchmark_responses(
+    requests: int = 200, page_size: int = MAX_PAGE_SIZE
+) -> list[ResponseResult]:
+    """
+    Measure one page of `/products/` (`page_size` products) as rendered by
+    `JSONRenderer` and `ORJSONRenderer`, sent as is and in every supported
+    coding; then whole requests through the middleware (the configured
+    renderer and `CompressionMiddleware`) for every coding.
+
+    Args:
+        requests (int): Number of timed renders or requests per scenario.
+        page_size (int): Number of products in the page.
+
+    Returns:
+        list[ResponseResult]: `render[<renderer>+<coding>]` results, then
+            `request[<coding>]` results.
+    """
+    url = f'{reverse("product-list-create")}?{urlencode({"page_size": page_size})}'
+    renderers = {'json': JSONRenderer()}
+    if ORJSON_AVAILABLE:
+        renderers['orjson'] = ORJSONRenderer()
+    encoders = {IDENTITY: lambda content: content, **COMPRESSORS}
+    encodings = (IDENTITY, *ENCODINGS)
+
+    data = Client().get(url).data
+    results = []
+    for renderer_name, renderer in renderers.items():
+        for encoding in encodings:
+
+            def respond(renderer=renderer, encoding=encoding):
+                return encoders[encoding](renderer.render(data))
+
+            results.append(
+                ResponseResult(
+                    f'render[{renderer_name}+{encoding}]',
+                    cpu_time(respond, requests),
+                    len(respond()),
+                )
+            )
+
+    with override_settings(RESPONSE_COMPRESSION=True):
+        client = Client()
+        for encoding in encodings:
+            headers = {'Accept-Encoding': encoding}
+
+            def request(headers=headers):
+                return client.get(url, headers=headers)
+
+            results.append(
+                ResponseResult(
+                    f'request[{encoding}]',
+                    cpu_time(request, requests),
+                    len(request().content),
+                )
+            )
+    return results
@@ -0,0 +1,50 @@
+from rest_framework.renderers import JSONRenderer
+
+from apps.products.benchmarks import BenchmarkResult, best_of
+from apps.products.models import Product
+from apps.products.serializers import ProductRowSerializer, ProductSerializer
+
+
+def render_with_model_serializer(limit: int) -> bytes:
+    products = Product.objects.order_by('id')[:limit]
+    return JSONRenderer().render(ProductSerializer(products, many=True).data)
+
+
+def render_with_row_serializer(limit: int) -> bytes:
+    rows = Product.objects.order_by('id').values_list(
+        *ProductRowSerializer.fields(), named=True
+    )[:limit]
+    return JSONRenderer().render(ProductRowSerializer(rows, many=True).data)
+
+
+def benchmark_serialization(rows: int, repeat: int = 5) -> list[BenchmarkResult]:
+    """
+    Time fetching and rendering `rows` products with both list serializers.
+
+    Args:
+        rows (int): Number of products to render; they must already exist.
+        repeat (int): Number of runs; the fastest one is reported.
+
+    Returns:
+        list[BenchmarkResult]: Results of the model and row serializers.
+
+    Raises:
+        AssertionError: If the two serializers render different JSON.
+    """
+    if render_with_model_serializer(rows) != render_with_row_serializer(rows):
+        raise AssertionError(
+            'ProductRowSerializer output differs from ProductSerializer'
+        )
+
+    return [
+        BenchmarkResult(
+            'ProductSerializer',
+            rows,
+            best_of(lambda: render_with_model_serializer(rows), repeat),
+        ),
+        BenchmarkResult(
+            'ProductRowSerializer',
+            rows,
+            best_of(lambda: render_with_row_serializer(rows), repeat),
+        ),
+    ]
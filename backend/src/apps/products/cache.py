@@ -0,0 +1,140 @@
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+PRODUCTS_VERSION_KEY = 'products:version'
+PRODUCTS_KEY_PREFIX = 'products:response'
+
+
+def get_products_version() -> str:
+    """
+    Get the current version of the products data.
+
+    The version is the timestamp of the last write, so it doubles as the
+    Last-Modified date of every cached products response.
+
+    Returns:
+        str: The current version.
+    """
+    version = cache.get(PRODUCTS_VERSION_KEY)
+    if version is None:
+        cache.add(PRODUCTS_VERSION_KEY, _new_version(), timeout=None)
+        version = cache.get(PRODUCTS_VERSION_KEY) or _new_version()
+    return version
+
+
+async def aget_products_version() -> str:
+    """
+    Async version of `get_products_version`.
+    """
+    version = await cache.aget(PRODUCTS_VERSION_KEY)
+    if version is None:
+        await cache.aadd(PRODUCTS_VERSION_KEY, _new_version(), timeout=None)
+        version = await cache.aget(PRODUCTS_VERSION_KEY) or _new_version()
+    return version
+
+
+def invalidate_products_cache() -> None:
+    """
+    Bump the products version, so every cached products response is stale.
+    """
+    cache.set(PRODUCTS_VERSION_KEY, _new_version(), timeout=None)
+
+
+def get_cache_key(request: Request, version: str) -> str:
+    """
+    Build a cache key from the request path and normalized query parameters.
+
+    Parameter order does not matter, so `?a=1&b=2` and `?b=2&a=1` share one
+    cache entry.
+    """
+    params = sorted(
+        (key, sorted(values)) for key, values in request.query_params.lists()
+    )
+    normalized = repr((request.get_host(), request.path, params))
+    digest = hashlib.md5(normalized.encode(), usedforsecurity=False).hexdigest()
+    return f'{PRODUCTS_KEY_PREFIX}:{version}:{digest}'
+
+
+def cache_products_response(view_method):
+    """
+    Cache the data of successful products responses and serve conditional
+    requests.
+
+    Entries are keyed on the products version, so a write makes them
+    unreachable without having to delete them. Responses carry an ETag and
+    a Last-Modified date; requests that send the ETag back get a 304 while
+    the data has not changed. `If-Modified-Since` alone is not trusted, as
+    the date has a one-second resolution and writes can land within the
+    second a response was sent.
+
+    Works on sync and async view methods alike.
+    """
+    if iscoroutinefunction(view_method):
+
+        @wraps(view_method)
+        async def async_wrapper(self, request, *args, **kwargs):
+            version = await aget_products_version()
+            key = get_cache_key(request, version)
+            not_modified = _get_not_modified_response(request, key, version)
+            if not_modified is not None:
+                return not_modified
+
+            data = await cache.aget(key)
+            if data is None:
+                response = await view_method(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                await cache.aset(key, response.data)
+            else:
+                response = Response(data, status=status.HTTP_200_OK)
+            return _add_validators(response, key, version)
+
+        return async_wrapper
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        version = get_products_version()
+        key = get_cache_key(request, version)
+        not_modified = _get_not_modified_response(request, key, version)
+        if not_modified is not None:
+            return not_modified
+
+        data = cache.get(key)
+        if data is None:
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cache.set(key, response.data)
+        else:
+            response = Response(data, status=status.HTTP_200_OK)
+        return _add_validators(response, key, version)
+
+    return wrapper
+
+
+def _get_etag(key: str, version: str) -> str:
+    return f'W/"{key.rsplit(":", 2)[-1]}-{version}"'
+
+
+def _get_not_modified_response(request, key: str, version: str):
+    return get_conditional_response(request, etag=_get_etag(key, version))
+
+
+def _add_validators(response: Response, key: str, version: str) -> Response:
+    response['ETag'] = _get_etag(key, version)
+    response['Last-Modified'] = http_date(int(float(version)))
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def _new_version() -> str:
+    return f'{time.time():.6f}'
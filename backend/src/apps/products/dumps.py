@@ -0,0 +1,278 @@
+"""
+Bulk loading of recorded Wildberries search responses.
+
+A dump is a directory tree of `.json`, `.ndjson` or `.jsonl` files
+(optionally gzipped). A JSON file holds one search response page; an NDJSON
+file holds one page per line. Bare item lists and single items are accepted
+too.
+
+Items are parsed with `WildberriesParser.parse`, streamed into a temporary
+staging table with `COPY` and merged into the products table with a single
+INSERT ... ON CONFLICT per batch, which also appends the price history
+snapshots.
+"""
+
+import csv
+import gzip
+import io
+import json
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.monitoring.metrics import REGISTRY
+from apps.products import metrics
+from apps.products.cache import invalidate_products_cache
+from apps.products.models import Product, ProductSnapshot
+from apps.products.services import (
+    CrawlProgress,
+    WildberriesParser,
+    chunked,
+    iter_parsed,
+    refresh_query_summaries,
+)
+
+DUMP_SUFFIXES = ('.json', '.ndjson', '.jsonl')
+DEFAULT_LOAD_BATCH_SIZE = 50000
+STAGING_TABLE = 'products_product_staging'
+STAGING_FIELDS = (
+    'wb_id',
+    'name',
+    'price',
+    'discounted_price',
+    'rating',
+    'reviews_count',
+)
+
+
+def load_wb_dump(
+    paths: Iterable[str | Path],
+    *,
+    parser: WildberriesParser | None = None,
+    search_query: str | None = None,
+    batch_size: int = DEFAULT_LOAD_BATCH_SIZE,
+    progress: CrawlProgress | None = None,
+) -> Iterator[CrawlProgress]:
+    """
+    Stream dump files through read -> parse -> batch -> COPY and merge.
+
+    Like `run_parse_pipeline`, only one batch of parsed products is held in
+    memory. Files that cannot be read are reported in `progress.errors` and
+    skipped.
+
+    Args:
+        paths (Iterable[str | Path]): Dump files and directories.
+        parser (WildberriesParser, optional): Parser of the raw items.
+            Default: a new one (no requests are made).
+        search_query (str, optional): Search query to store on the products.
+            If omitted, the stored queries are kept.
+        batch_size (int, optional): Products per COPY and merge. Default: 50000.
+        progress (CrawlProgress, optional): Totals to update, to read the
+            errors even when nothing is loaded (and nothing yielded).
+            Default: new ones.
+
+    Yields:
+        CrawlProgress: The running totals after each loaded batch; pages are
+            dump pages (files or NDJSON lines).
+    """
+    parser = parser or WildberriesParser()
+    progress = progress or CrawlProgress()
+    pages = iter_dump_pages(paths, progress)
+    for chunk in chunked(iter_parsed(parser, pages, progress), batch_size):
+        created, updated = copy_products(chunk, search_query=search_query)
+        progress.created += created
+        progress.updated += updated
+        REGISTRY.maybe_flush()
+        yield progress
+    REGISTRY.maybe_flush(force=True)
+
+
+def iter_dump_files(paths: Iterable[str | Path]) -> Iterator[Path]:
+    """
+    Yield the dump files among `paths`, walking directories recursively in
+    name order.
+    """
+    for path in map(Path, paths):
+        if path.is_dir():
+            files = (file for file in sorted(path.rglob('*')) if file.is_file())
+            yield from (file for file in files if _dump_suffix(file) in DUMP_SUFFIXES)
+        else:
+            yield path
+
+
+def iter_dump_pages(
+    paths: Iterable[str | Path], progress: CrawlProgress
+) -> Iterator[list]:
+    """
+    Read stage: yield the raw items of every dump page.
+    """
+    for path in iter_dump_files(paths):
+        try:
+            for page in _read_dump_file(path):
+                progress.pages_done += 1
+                yield list(_page_items(page))
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            progress.pages_failed += 1
+            progress.errors.append(f'{path}: {e}')
+
+
+def copy_products(
+    products_data: Iterable[dict], search_query: str | None = None
+) -> tuple[int, int]:
+    """
+    Upsert parsed products through a `COPY` into a staging table.
+
+    Does the same as `WildberriesParser.save_batch`, but the rows are sent
+    in one COPY stream instead of as query parameters, and the upsert and
+    the snapshots are a single statement. The summaries of every search
+    query the products belonged to are refreshed, as their prices change.
+
+    Args:
+        products_data (Iterable[dict]): Parsed products with an article id.
+            If an article occurs twice, the last occurrence wins.
+        search_query (str, optional): Search query to store on the products.
+
+    Returns:
+        tuple[int, int]: Number of created and updated products.
+    """
+    by_wb_id = {product_data['wb_id']: product_data for product_data in products_data}
+    if not by_wb_id:
+        return 0, 0
+
+    rows = (
+        [product_data[name] for name in STAGING_FIELDS]
+        for product_data in by_wb_id.values()
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(_create_staging_sql())
+        cursor.execute(f'TRUNCATE {_qn(STAGING_TABLE)}')
+        _copy_rows(cursor, STAGING_TABLE, STAGING_FIELDS, rows)
+
+        cursor.execute(_previous_queries_sql())
+        queries = {query for (query,) in cursor.fetchall()}
+
+        now = timezone.now()
+        cursor.execute(
+            _merge_sql(update_search_query=search_query is not None),
+            [search_query, now, now],
+        )
+        created, updated = cursor.fetchone()
+
+        if search_query is not None:
+            queries.add(search_query)
+        if queries:
+            refresh_query_summaries(queries)
+        transaction.on_commit(invalidate_products_cache)
+    metrics.record_saved(created, updated)
+    return created, updated
+
+
+def _dump_suffix(path: Path) -> str:
+    suffixes = path.suffixes
+    if suffixes and suffixes[-1] == '.gz':
+        suffixes = suffixes[:-1]
+    return suffixes[-1] if suffixes else ''
+
+
+def _read_dump_file(path: Path) -> Iterator:
+    opener = gzip.open if path.suffix == '.gz' else open
+    with opener(path, 'rt', encoding='utf-8') as file:
+        if _dump_suffix(path) == '.json':
+            yield json.load(file)
+            return
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _page_items(document) -> Iterator[dict]:
+    """
+    Yield the items of a search response, a list of items or a single item.
+    """
+    if isinstance(document, list):
+        for item in document:
+            yield from _page_items(item)
+    elif isinstance(document, dict):
+        if isinstance(document.get('data'), dict):
+            yield from document['data'].get('products') or []
+        elif 'products' in document:
+            yield from document['products'] or []
+        else:
+            yield document
+
+
+def _copy_rows(cursor, table: str, columns: Iterable[str], rows: Iterable) -> None:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    sql = (
+        f'COPY {_qn(table)} ({", ".join(map(_qn, columns))}) '
+        'FROM STDIN WITH (FORMAT csv)'
+    )
+    raw_cursor = cursor.cursor
+    if hasattr(raw_cursor, 'copy_expert'):
+        # psycopg2
+        buffer.seek(0)
+        raw_cursor.copy_expert(sql, buffer)
+    else:
+        # psycopg 3
+        with raw_cursor.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+
+
+def _create_staging_sql() -> str:
+    columns = ', '.join(
+        f'{_qn(name)} {Product._meta.get_field(name).db_type(connection)}'
+        for name in STAGING_FIELDS
+    )
+    return f'CREATE TEMPORARY TABLE IF NOT EXISTS {_qn(STAGING_TABLE)} ({columns})'
+
+
+def _previous_queries_sql() -> str:
+    return (
+        f'SELECT DISTINCT p.{_qn("search_query")} '
+        f'FROM {_qn(Product._meta.db_table)} p '
+        f'JOIN {_qn(STAGING_TABLE)} s ON s.{_qn("wb_id")} = p.{_qn("wb_id")} '
+        f'WHERE p.{_qn("search_query")} IS NOT NULL'
+    )
+
+
+def _merge_sql(update_search_query: bool) -> str:
+    """
+    Upsert the staged rows and snapshot them in one statement.
+
+    Parameters: search query, creation time, snapshot time. Returns one row
+    with the number of created and updated products.
+    """
+    product_table = _qn(Product._meta.db_table)
+    snapshot_table = _qn(ProductSnapshot._meta.db_table)
+    tracked = [_qn(name) for name in ProductSnapshot.TRACKED_FIELDS]
+    staged = ', '.join(map(_qn, STAGING_FIELDS))
+
+    update_fields = list(WildberriesParser.UPSERT_FIELDS)
+    if update_search_query:
+        update_fields.append('search_query')
+    updates = ', '.join(f'{_qn(name)} = EXCLUDED.{_qn(name)}' for name in update_fields)
+
+    # `xmax = 0` holds for rows inserted by this statement and not for rows
+    # updated by ON CONFLICT.
+    return f"""
+        WITH upserted AS (
+            INSERT INTO {product_table}
+                ({staged}, {_qn('search_query')}, {_qn('created_at')})
+            SELECT {staged}, %s, %s FROM {_qn(STAGING_TABLE)}
+            ON CONFLICT ({_qn('wb_id')}) DO UPDATE SET {updates}
+            RETURNING {_qn('id')}, xmax = 0 AS created, {', '.join(tracked)}
+        ), snapshots AS (
+            INSERT INTO {snapshot_table}
+                ({_qn('product_id')}, {_qn('captured_at')}, {', '.join(tracked)})
+            SELECT {_qn('id')}, %s, {', '.join(tracked)} FROM upserted
+        )
+        SELECT count(*) FILTER (WHERE created), count(*) FILTER (WHERE NOT created)
+        FROM upserted
+    """
+
+
+def _qn(name: str) -> str:
+    return connection.ops.quote_name(name)
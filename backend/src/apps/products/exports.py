@@ -0,0 +1,246 @@
+"""
+Streaming exports of filtered products.
+
+Rows are read through a server-side cursor (`QuerySet.iterator`) and encoded
+one chunk at a time, so memory use stays flat no matter how many products
+are exported.
+
+Parquet exports need the optional `pyarrow` package.
+"""
+
+import csv
+import json
+from collections.abc import Iterator
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models, transaction
+from django.db.models import QuerySet
+
+from apps.products.models import ProductSnapshot
+from apps.products.serializers import ProductRowSerializer
+from apps.products.services import chunked
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'parquet': 'application/vnd.apache.parquet',
+}
+EXPORT_FORMATS = tuple(EXPORT_CONTENT_TYPES)
+DEFAULT_EXPORT_FORMAT = 'csv'
+EXPORT_CHUNK_SIZE = 2000
+# Every chunk becomes one Parquet row group; readers prefer them large.
+PARQUET_ROW_GROUP_SIZE = 50000
+PARQUET_AVAILABLE = pa is not None
+
+
+def export_products(
+    products: QuerySet,
+    file_format: str = DEFAULT_EXPORT_FORMAT,
+    chunk_size: int | None = None,
+) -> Iterator[str] | Iterator[bytes]:
+    """
+    Encode products as CSV, NDJSON or Parquet, lazily.
+
+    CSV and NDJSON values are formatted like in the API responses (decimals
+    as strings, ISO 8601 datetimes). Parquet columns keep the database types
+    (see `export_parquet`).
+
+    Args:
+        products (QuerySet): Products to export, in export order.
+        file_format (str): `csv` (with a header row), `ndjson` (one JSON
+            object per line) or `parquet`.
+        chunk_size (int | None): Number of rows fetched from the database
+            cursor and encoded per yielded piece. Defaults to
+            `EXPORT_CHUNK_SIZE` for text formats and `PARQUET_ROW_GROUP_SIZE`
+            for Parquet.
+
+    Returns:
+        Iterator[str] | Iterator[bytes]: Pieces of the file; text formats
+            yield whole lines, Parquet yields bytes.
+
+    Raises:
+        ValueError: If the format is not supported.
+        ImproperlyConfigured: If Parquet is requested without pyarrow.
+    """
+    if file_format == 'csv':
+        return _export_csv(products, chunk_size or EXPORT_CHUNK_SIZE)
+    if file_format == 'ndjson':
+        return _export_ndjson(products, chunk_size or EXPORT_CHUNK_SIZE)
+    if file_format == 'parquet':
+        return export_parquet(products, chunk_size or PARQUET_ROW_GROUP_SIZE)
+    raise ValueError(
+        f'Unknown export format {file_format!r}, expected one of {EXPORT_FORMATS}'
+    )
+
+
+def export_snapshots(
+    products: QuerySet, chunk_size: int = PARQUET_ROW_GROUP_SIZE
+) -> Iterator[bytes]:
+    """
+    Encode the history snapshots of products as Parquet, lazily.
+
+    Args:
+        products (QuerySet): Products whose snapshots to export.
+        chunk_size (int): Number of rows per Parquet row group.
+
+    Returns:
+        Iterator[bytes]: Pieces of the Parquet file. Snapshots are ordered by
+            product and capture time.
+
+    Raises:
+        ImproperlyConfigured: If pyarrow is not installed.
+    """
+    snapshots = ProductSnapshot.objects.filter(
+        product__in=products.order_by().values('pk')
+    ).order_by('product_id', 'captured_at', 'id')
+    return export_parquet(snapshots, chunk_size)
+
+
+def export_parquet(
+    queryset: QuerySet, chunk_size: int = PARQUET_ROW_GROUP_SIZE
+) -> Iterator[bytes]:
+    """
+    Encode all concrete fields of a queryset's model as Parquet, lazily.
+
+    Columns are typed after the model fields: decimals keep their precision
+    and scale, datetimes become UTC microsecond timestamps and foreign keys
+    are stored as `<name>_id` integers. Every chunk of rows is written as one
+    record batch (row group) and handed out as soon as it is encoded, so
+    memory is bounded by the chunk size.
+
+    Args:
+        queryset (QuerySet): Rows to export, in export order.
+        chunk_size (int): Number of rows per row group.
+
+    Returns:
+        Iterator[bytes]: Pieces of the Parquet file.
+
+    Raises:
+        ImproperlyConfigured: If pyarrow is not installed.
+    """
+    if not PARQUET_AVAILABLE:
+        raise ImproperlyConfigured('Parquet exports require the pyarrow package.')
+    fields = queryset.model._meta.concrete_fields
+    schema = pa.schema(
+        [pa.field(field.attname, _arrow_type(field), field.null) for field in fields]
+    )
+    return _export_parquet(queryset, schema, chunk_size)
+
+
+def _export_parquet(queryset: QuerySet, schema, chunk_size: int) -> Iterator[bytes]:
+    sink = _ParquetSink()
+    rows = queryset.values_list(*schema.names).iterator(chunk_size=chunk_size)
+    # See _iter_row_chunks.
+    with transaction.atomic(), pq.ParquetWriter(sink, schema) as writer:
+        for chunk in chunked(rows, chunk_size):
+            columns = zip(*chunk, strict=True)
+            writer.write_batch(
+                pa.RecordBatch.from_arrays(
+                    [
+                        pa.array(column, type=arrow_type)
+                        for column, arrow_type in zip(
+                            columns, schema.types, strict=True
+                        )
+                    ],
+                    schema=schema,
+                )
+            )
+            yield sink.pop()
+    # The footer is written when the writer is closed.
+    yield sink.pop()
+
+
+def _arrow_type(field: models.Field):
+    if field.is_relation:
+        return _arrow_type(field.target_field)
+    if isinstance(field, models.DecimalField):
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp('us', tz='UTC')
+    if isinstance(field, models.FloatField):
+        return pa.float64()
+    if isinstance(field, models.BooleanField):
+        return pa.bool_()
+    if isinstance(field, models.IntegerField):
+        return pa.int64()
+    if isinstance(field, models.CharField | models.TextField):
+        return pa.string()
+    raise ValueError(f'No Parquet type for {type(field).__name__} {field.name!r}')
+
+
+class _ParquetSink:
+    """
+    Write-only file for `pyarrow.parquet.ParquetWriter` that buffers what is
+    written until `pop` is called.
+
+    The writer only needs `tell` to record offsets in the footer, so the
+    buffer can be emptied between row groups.
+    """
+
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def pop(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _iter_row_chunks(products: QuerySet, chunk_size: int) -> Iterator[list[dict]]:
+    serializer = ProductRowSerializer()
+    rows = products.values_list(*ProductRowSerializer.fields()).iterator(
+        chunk_size=chunk_size
+    )
+    # In autocommit mode the server-side cursor is declared WITH HOLD, which
+    # makes Postgres materialize the whole result before the first fetch.
+    with transaction.atomic():
+        for chunk in chunked(rows, chunk_size):
+            yield [serializer.to_representation(row) for row in chunk]
+
+
+class _Echo:
+    """
+    File-like object for `csv.writer` that hands back what is written.
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def _export_csv(products: QuerySet, chunk_size: int) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(ProductRowSerializer.fields())
+    for chunk in _iter_row_chunks(products, chunk_size):
+        yield ''.join(writer.writerow(row.values()) for row in chunk)
+
+
+def _export_ndjson(products: QuerySet, chunk_size: int) -> Iterator[str]:
+    for chunk in _iter_row_chunks(products, chunk_size):
+        yield ''.join(
+            json.dumps(row, ensure_ascii=False, separators=(',', ':')) + '\n'
+            for row in chunk
+        )
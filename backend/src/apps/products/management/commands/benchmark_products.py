@@ -0,0 +1,221 @@
+import json
+import platform
+import subprocess
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from apps.products.benchmarks import benchmark_database, seed_products
+from apps.products.benchmarks.api import benchmark_api
+from apps.products.benchmarks.ingestion import (
+    benchmark_ingestion,
+    generate_pages,
+    read_pages,
+)
+from apps.products.benchmarks.responses import benchmark_responses
+
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the products API, its response rendering and compression '
+        'and the parse+save path on a throwaway database seeded with '
+        'ProductFactory, and report the results as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[10000],
+            help='Table sizes to benchmark at, e.g. 10000 100000 1000000 '
+            '(default: 10000).',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Timed requests per API scenario (default: 200).',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=20,
+            help='Untimed requests sent before each scenario (default: 20).',
+        )
+        parser.add_argument(
+            '--items',
+            type=int,
+            default=20000,
+            help='Generated items for the parse+save benchmark, when no '
+            '--payloads are given (default: 20000).',
+        )
+        parser.add_argument(
+            '--payloads',
+            nargs='+',
+            metavar='PATH',
+            help='Recorded Wildberries responses (dump files or directories) '
+            'for the parse+save benchmark.',
+        )
+        parser.add_argument(
+            '--cached',
+            action='store_true',
+            help='Keep the response cache; by default every request misses it.',
+        )
+        parser.add_argument(
+            '-o',
+            '--output',
+            default='-',
+            help='JSON file to write the results to (default: stdout).',
+        )
+        parser.add_argument(
+            '--compare',
+            metavar='PATH',
+            help='Results of a previous run to compare with.',
+        )
+
+    def handle(self, *args, **options):
+        sizes = sorted(set(options['rows']))
+        if sizes[0] < 1 or options['requests'] < 1:
+            raise CommandError('--rows and --requests must be at least 1.')
+        if options['warmup'] < 0 or options['items'] < 1:
+            raise CommandError('--warmup cannot be negative, --items must be positive.')
+        baseline = self.read_baseline(options['compare'])
+        # Progress goes to stderr when the results go to stdout.
+        log = self.stderr if options['output'] == '-' else self.stdout
+
+        if options['payloads']:
+            try:
+                pages = read_pages(options['payloads'])
+            except ValueError as e:
+                raise CommandError(e) from e
+        else:
+            pages = generate_pages(options['items'])
+
+        settings = {'DEBUG': False, 'ALLOWED_HOSTS': ['*']}
+        if not options['cached']:
+            settings['CACHES'] = NO_CACHE
+
+        runs = []
+        with benchmark_database(), override_settings(**settings):
+            seeded = 0
+            for size in sizes:
+                log.write(self.style.NOTICE(f'Seeding {size - seeded} products...'))
+                seed_products(size - seeded, start=seeded)
+                seeded = size
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+
+                log.write(self.style.NOTICE(f'Benchmarking at {size} products...'))
+                api = benchmark_api(options['requests'], options['warmup'])
+                responses = benchmark_responses(options['requests'])
+                ingestion = benchmark_ingestion(pages)
+                runs.append(
+                    {
+                        'rows': size,
+                        'api': [result.as_dict() for result in api],
+                        'responses': [result.as_dict() for result in responses],
+                        'ingestion': [result.as_dict() for result in ingestion],
+                    }
+                )
+            postgres = connection.pg_version
+
+        report = {
+            'meta': self.get_meta(options, postgres),
+            'runs': runs,
+        }
+        content = json.dumps(report, indent=2) + '\n'
+        if options['output'] == '-':
+            self.stdout.write(content, ending='')
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(content)
+
+        for line in self.summarize(report, baseline):
+            log.write(line)
+
+    def get_meta(self, options, postgres: int) -> dict:
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', 'HEAD'],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'postgres': postgres,
+            'requests': options['requests'],
+            'warmup': options['warmup'],
+            'cached': options['cached'],
+            'payloads': options['payloads'] or f'generated:{options["items"]}',
+        }
+
+    def read_baseline(self, path: str | None) -> dict:
+        """
+        Map (rows, suite, name) of a previous report to its result.
+        """
+        if not path:
+            return {}
+        try:
+            with open(path, encoding='utf-8') as file:
+                report = json.load(file)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Cannot read {path}: {e}') from e
+        return {
+            (run['rows'], suite, result['name']): result
+            for run in report['runs']
+            for suite in ('api', 'responses', 'ingestion')
+            # Reports of older versions lack some suites.
+            for result in run.get(suite, [])
+        }
+
+    def summarize(self, report: dict, baseline: dict):
+        for run in report['runs']:
+            yield self.style.MIGRATE_HEADING(f'{run["rows"]} products')
+            for result in run['api']:
+                old = baseline.get((run['rows'], 'api', result['name']))
+                yield (
+                    f'  {result["name"]:<40} p50 {result["p50_ms"]:8.2f} ms '
+                    f'p99 {result["p99_ms"]:8.2f} ms '
+                    f'{result["requests_per_sec"]:9,.1f} req/s'
+                    + self.change(old and old['p50_ms'], result['p50_ms'])
+                )
+            for result in run['responses']:
+                old = baseline.get((run['rows'], 'responses', result['name']))
+                yield (
+                    f'  {result["name"]:<40} {result["cpu_ms"]:8.3f} ms CPU '
+                    f'{result["bytes"]:10,} bytes'
+                    + self.change(old and old['cpu_ms'], result['cpu_ms'])
+                )
+            for result in run['ingestion']:
+                old = baseline.get((run['rows'], 'ingestion', result['name']))
+                yield (
+                    f'  {result["name"]:<40} {result["seconds"] * 1000:10.1f} ms '
+                    f'{result["rows_per_sec"]:12,.0f} items/s'
+                    + self.change(old and old['seconds'], result['seconds'])
+                )
+
+    def change(self, old: float | None, new: float) -> str:
+        """
+        Describe the change of a duration against the baseline.
+        """
+        if not old:
+            return ''
+        ratio = new / old
+        text = f'  ({(ratio - 1) * 100:+.0f}%)'
+        if ratio > 1.1:
+            return self.style.ERROR(text)
+        if ratio < 0.9:
+            return self.style.SUCCESS(text)
+        return text
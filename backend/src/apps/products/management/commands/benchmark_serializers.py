@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.products.benchmarks import benchmark_database, seed_products
+from apps.products.benchmarks.serialization import benchmark_serialization
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare ProductSerializer with the ProductRowSerializer fast path '
+        'on a throwaway database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=10000,
+            help='Number of products to serialize (default: 10000).',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Number of runs; the fastest one is reported (default: 5).',
+        )
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        repeat = options['repeat']
+        if rows < 1 or repeat < 1:
+            raise CommandError('--rows and --repeat must be at least 1.')
+
+        self.stdout.write(self.style.NOTICE(f'Seeding {rows} products...'))
+        with benchmark_database():
+            seed_products(rows)
+            results = benchmark_serialization(rows, repeat)
+
+        baseline = results[0].rows_per_sec
+        for result in results:
+            self.stdout.write(
+                f'{result.name:<22} {result.seconds * 1000:9.1f} ms '
+                f'{result.rows_per_sec:12,.0f} rows/s '
+                f'({result.rows_per_sec / baseline:.1f}x)'
+            )
+        self.stdout.write(self.style.SUCCESS('Output is byte-identical.'))
@@ -0,0 +1,109 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from apps.products.exports import (
+    DEFAULT_EXPORT_FORMAT,
+    EXPORT_CHUNK_SIZE,
+    EXPORT_FORMATS,
+    PARQUET_AVAILABLE,
+    PARQUET_ROW_GROUP_SIZE,
+    export_products,
+    export_snapshots,
+)
+from apps.products.services import get_products_with_filters
+
+FILTER_OPTIONS = (
+    'search',
+    'min_price',
+    'max_price',
+    'min_rating',
+    'min_reviews',
+    'ordering',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream products matching the API filters to a CSV, NDJSON or Parquet '
+        'file (or stdout).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            dest='file_format',
+            choices=EXPORT_FORMATS,
+            default=DEFAULT_EXPORT_FORMAT,
+            help=f'Output format (default: {DEFAULT_EXPORT_FORMAT}).',
+        )
+        parser.add_argument(
+            '-o',
+            '--output',
+            type=str,
+            default='-',
+            help='Output file path, or - for stdout (default: -).',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            help=(
+                'Number of rows fetched from the database cursor at a time '
+                f'(default: {EXPORT_CHUNK_SIZE}, or {PARQUET_ROW_GROUP_SIZE} '
+                'rows per row group for Parquet).'
+            ),
+        )
+        parser.add_argument(
+            '--snapshots',
+            type=str,
+            metavar='PATH',
+            help='Also write the history snapshots of the products to this '
+            'Parquet file.',
+        )
+        for option in FILTER_OPTIONS:
+            parser.add_argument(
+                f'--{option.replace("_", "-")}',
+                dest=option,
+                type=str,
+                help=f'Same as the `{option}` query parameter of /products/.',
+            )
+
+    def handle(self, *args, **options):
+        file_format = options['file_format']
+        chunk_size = options['chunk_size']
+        output = options['output']
+        if chunk_size is not None and chunk_size < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+        if (file_format == 'parquet' or options['snapshots']) and not PARQUET_AVAILABLE:
+            raise CommandError('Parquet exports require the pyarrow package.')
+        if file_format == 'parquet' and output == '-':
+            raise CommandError('Parquet exports need an --output file.')
+
+        params = QueryDict(mutable=True)
+        for option in FILTER_OPTIONS:
+            if options[option] is not None:
+                params[option] = options[option]
+        products = get_products_with_filters(params)
+        pieces = export_products(products, file_format, chunk_size)
+
+        if output == '-':
+            for piece in pieces:
+                self.stdout.write(piece, ending='')
+        else:
+            self._write(output, pieces, binary=file_format == 'parquet')
+            self.stderr.write(self.style.SUCCESS(f'Exported products to {output}.'))
+
+        if options['snapshots']:
+            pieces = export_snapshots(products, chunk_size or PARQUET_ROW_GROUP_SIZE)
+            self._write(options['snapshots'], pieces, binary=True)
+            self.stderr.write(
+                self.style.SUCCESS(f'Exported snapshots to {options["snapshots"]}.')
+            )
+
+    def _write(self, path, pieces, binary):
+        if binary:
+            file = open(path, 'wb')
+        else:
+            file = open(path, 'w', encoding='utf-8', newline='')
+        with file:
+            for piece in pieces:
+                file.write(piece)
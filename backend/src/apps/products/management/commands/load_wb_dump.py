@@ -0,0 +1,75 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.products.dumps import DEFAULT_LOAD_BATCH_SIZE, load_wb_dump
+from apps.products.services import CrawlProgress
+
+
+class Command(BaseCommand):
+    help = (
+        'Load products from recorded Wildberries search responses (JSON or '
+        'NDJSON files, optionally gzipped) with COPY.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths',
+            nargs='+',
+            help='Dump files or directories (searched recursively).',
+        )
+        parser.add_argument(
+            '--query',
+            type=str,
+            default=None,
+            help='Search query to store on the products (default: keep stored).',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_LOAD_BATCH_SIZE,
+            help=f'Products per COPY and merge (default: {DEFAULT_LOAD_BATCH_SIZE}).',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        started = time.perf_counter()
+        progress = CrawlProgress()
+        reported_errors = 0
+        for _ in load_wb_dump(
+            options['paths'],
+            search_query=options['query'],
+            batch_size=batch_size,
+            progress=progress,
+        ):
+            for error in progress.errors[reported_errors:]:
+                self.stderr.write(self.style.ERROR(error))
+            reported_errors = len(progress.errors)
+
+            self.stdout.write(
+                f'{progress.pages_done} pages: {progress.parsed} parsed, '
+                f'{progress.created} created, {progress.updated} updated so far.'
+            )
+
+        if not progress.parsed:
+            # Nothing was loaded, so no errors were reported yet.
+            message = (
+                f'No products found in the dump ({progress.pages_done} pages '
+                f'read, {progress.pages_failed} failed, {progress.skipped} items '
+                'skipped).'
+            )
+            raise CommandError('\n'.join([message, *progress.errors]))
+        for error in progress.errors[reported_errors:]:
+            self.stderr.write(self.style.ERROR(error))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Total products created: {progress.created}, '
+                f'updated: {progress.updated}, skipped: {progress.skipped} '
+                f'({progress.parsed / elapsed * 60:,.0f} products/min)'
+            )
+        )
@@ -1,6 +1,10 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
-from apps.products.services import WildberriesParser
+from apps.products.services import (
+    DEFAULT_CHUNK_SIZE,
+    WildberriesParser,
+    run_parse_pipeline,
+)
 
 
 class Command(BaseCommand):
@@ -25,11 +29,50 @@ class Command(BaseCommand):
             default=100,
             help='Number of products per page (default: 100).',
         )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Number of pages fetched in parallel (default: 1).',
+        )
+        parser.add_argument(
+            '--rps',
+            type=float,
+            default=None,
+            help='Maximum requests per second to Wildberries (default: unlimited).',
+        )
+        parser.add_argument(
+            '--pool-size',
+            type=int,
+            default=None,
+            help='HTTP connection pool size (default: the concurrency, at least 10).',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Products per bulk write (default: {DEFAULT_CHUNK_SIZE}).',
+        )
+        parser.add_argument(
+            '--max-retries',
+            type=int,
+            default=3,
+            help='Retries for failed or throttled requests (default: 3).',
+        )
 
     def handle(self, *args, **options):
         query = options['query']
         pages = options['pages']
         limit = options['limit']
+        concurrency = options['concurrency']
+        rps = options['rps']
+        chunk_size = options['chunk_size']
+        pool_size = options['pool_size'] or max(concurrency, 10)
+
+        if concurrency < 1:
+            raise CommandError('--concurrency must be at least 1.')
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be at least 1.')
 
         self.stdout.write(
             self.style.NOTICE(
@@ -38,33 +81,38 @@ class Command(BaseCommand):
             )
         )
 
-        parser = WildberriesParser()
-        total_saved = 0
-        for page in range(1, pages + 1):
-            try:
-                products = parser.fetch(query, page=page, limit=limit)
-            except Exception as e:
-                self.stderr.write(self.style.ERROR(f'Failed to fetch page {page}: {e}'))
-                continue
+        reported_errors = 0
+        with WildberriesParser(
+            pool_size=pool_size, max_retries=options['max_retries']
+        ) as parser:
+            for progress in run_parse_pipeline(
+                parser,
+                query,
+                pages,
+                per_page=limit,
+                chunk_size=chunk_size,
+                concurrency=concurrency,
+                rate_limit=rps,
+            ):
+                for error in progress.errors[reported_errors:]:
+                    self.stderr.write(self.style.ERROR(error))
+                reported_errors = len(progress.errors)
 
-            if not products:
                 self.stdout.write(
-                    self.style.WARNING(f'No products found on page {page}.')
+                    f'Page {progress.pages_done}: {progress.parsed} parsed, '
+                    f'{progress.created} created, {progress.updated} updated so far.'
                 )
-                break
 
-            for item in products:
-                product_data = parser.parse(item)
-                created = parser.save(product_data)
-                if created:
-                    total_saved += 1
-
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f'Parsed and saved {len(products)} products from page {page}.'
-                )
+        stats = parser.stats
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Total products created: {progress.created}, '
+                f'updated: {progress.updated}, skipped: {progress.skipped}'
             )
-
+        )
         self.stdout.write(
-            self.style.SUCCESS(f'Total new products saved: {total_saved}')
+            f'HTTP: {stats.requests} requests, {stats.errors} failed, '
+            f'{stats.retries} retries, {stats.bytes_received / 1024:.1f} KiB, '
+            f'latency avg {stats.latency_avg * 1000:.0f} ms, '
+            f'max {stats.latency_max * 1000:.0f} ms'
         )
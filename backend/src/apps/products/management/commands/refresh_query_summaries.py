@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.products.cache import invalidate_products_cache
+from apps.products.models import Product, QuerySummary
+from apps.products.services import refresh_query_summaries
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the summaries of all search queries from the products table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--query',
+            type=str,
+            action='append',
+            help='Only refresh this search query (can be repeated).',
+        )
+
+    def handle(self, *args, **options):
+        queries = options['query']
+        if not queries:
+            queries = set(
+                Product.objects.exclude(search_query=None)
+                .values_list('search_query', flat=True)
+                .distinct()
+            )
+            # Queries whose products are all gone.
+            queries |= set(QuerySummary.objects.values_list('query', flat=True))
+
+        with transaction.atomic():
+            summaries = refresh_query_summaries(queries)
+            # The summaries are served from the products response cache.
+            transaction.on_commit(invalidate_products_cache)
+        self.stdout.write(
+            self.style.SUCCESS(f'Refreshed {len(summaries)} query summaries.')
+        )
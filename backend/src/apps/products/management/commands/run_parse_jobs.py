@@ -0,0 +1,78 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.products.services import (
+    PARSE_JOB_LEASE_TIMEOUT,
+    PARSE_JOB_MAX_ATTEMPTS,
+    claim_next_parse_job,
+    run_parse_job,
+)
+
+
+class Command(BaseCommand):
+    help = 'Run queued Wildberries parse jobs in the background.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls of an empty queue (default: 2).',
+        )
+        parser.add_argument(
+            '--lease-timeout',
+            type=float,
+            default=PARSE_JOB_LEASE_TIMEOUT,
+            help=(
+                'Seconds without progress after which a running job is '
+                f'considered lost and retried (default: {PARSE_JOB_LEASE_TIMEOUT}).'
+            ),
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=PARSE_JOB_MAX_ATTEMPTS,
+            help=(
+                'Runs of a lost job before it is failed instead of retried '
+                f'(default: {PARSE_JOB_MAX_ATTEMPTS}).'
+            ),
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run all pending jobs and exit instead of polling forever.',
+        )
+
+    def handle(self, *args, **options):
+        poll_interval = options['poll_interval']
+        once = options['once']
+
+        self.stdout.write(self.style.NOTICE('Waiting for parse jobs...'))
+        try:
+            while True:
+                job = claim_next_parse_job(
+                    options['lease_timeout'], options['max_attempts']
+                )
+                if job is None:
+                    if once:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                self.stdout.write(f'Running job #{job.id}: {job.query}')
+                job = run_parse_job(job)
+                style = (
+                    self.style.SUCCESS
+                    if job.status == job.Status.SUCCEEDED
+                    else self.style.ERROR
+                )
+                self.stdout.write(
+                    style(
+                        f'Job #{job.id} {job.get_status_display().lower()}: '
+                        f'{job.products_created} created, '
+                        f'{job.products_updated} updated.'
+                    )
+                )
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Worker stopped.'))
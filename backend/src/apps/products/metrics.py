@@ -0,0 +1,37 @@
+"""
+Prometheus metrics of the Wildberries crawler.
+"""
+
+from apps.monitoring.metrics import Counter, Histogram
+
+PAGES_FETCHED = Counter(
+    'wb_pages_fetched_total',
+    'Search result pages requested from Wildberries, by result (ok or error).',
+    ['result'],
+)
+FETCH_DURATION = Histogram(
+    'wb_fetch_duration_seconds',
+    'Latency of Wildberries search requests, retries included.',
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+ITEMS_PARSED = Counter(
+    'wb_items_parsed_total',
+    'Wildberries items parsed successfully.',
+)
+PARSE_FAILURES = Counter(
+    'wb_parse_failures_total',
+    'Wildberries items that could not be parsed.',
+)
+PRODUCTS_SAVED = Counter(
+    'wb_products_saved_total',
+    'Products written by the crawler and dump loads, by result (created or updated).',
+    ['result'],
+)
+
+
+def record_saved(created: int, updated: int) -> None:
+    """
+    Count products written by a batch.
+    """
+    PRODUCTS_SAVED.inc(created, result='created')
+    PRODUCTS_SAVED.inc(updated, result='updated')
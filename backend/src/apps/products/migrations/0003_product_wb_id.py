@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-18 05:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_product_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='wb_id',
+            field=models.PositiveBigIntegerField(blank=True, help_text='Wildberries article id (nm id)', null=True, unique=True),
+        ),
+    ]
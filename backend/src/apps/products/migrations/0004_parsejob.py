@@ -0,0 +1,35 @@
+# Generated by Django 5.2.2 on 2026-10-18 05:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_wb_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParseJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=255)),
+                ('pages', models.PositiveIntegerField(default=1)),
+                ('limit', models.PositiveIntegerField(blank=True, help_text='Maximum number of products to parse', null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('pages_done', models.PositiveIntegerField(default=0)),
+                ('products_parsed', models.PositiveIntegerField(default=0)),
+                ('products_created', models.PositiveIntegerField(default=0)),
+                ('products_updated', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ('-created_at',),
+                'indexes': [models.Index(fields=['status', 'created_at'], name='parsejob_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.2 on 2026-10-18 06:10
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_parsejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('captured_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('discounted_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('rating', models.FloatField()),
+                ('reviews_count', models.PositiveIntegerField()),
+                ('product', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='products.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', 'captured_at'], name='snapshot_product_time_idx'), django.contrib.postgres.indexes.BrinIndex(fields=['captured_at'], name='snapshot_captured_brin_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.2 on 2026-10-18 06:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_productsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuerySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=255, unique=True)),
+                ('product_count', models.PositiveIntegerField(default=0)),
+                ('price_min', models.DecimalField(decimal_places=2, max_digits=12, null=True)),
+                ('price_max', models.DecimalField(decimal_places=2, max_digits=12, null=True)),
+                ('price_avg', models.DecimalField(decimal_places=2, max_digits=12, null=True)),
+                ('discounted_price_avg', models.DecimalField(decimal_places=2, max_digits=12, null=True)),
+                ('rating_avg', models.FloatField(null=True)),
+                ('rating_distribution', models.JSONField(default=list, help_text='Product counts per rating bucket: [0, 1), [1, 2), ..., [4, 5]')),
+                ('reviews_total', models.PositiveBigIntegerField(default=0)),
+                ('discount_avg', models.FloatField(help_text='Average discount in percent of the price', null=True)),
+                ('discount_max', models.FloatField(null=True)),
+                ('discounted_count', models.PositiveIntegerField(default=0, help_text='Products sold below the full price')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'query summaries',
+                'ordering': ['query'],
+            },
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='search_query',
+            field=models.CharField(blank=True, db_index=True, help_text='Search query of the crawl that last saved the product', max_length=255, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.2 on 2026-10-18 07:05
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # See 0002_product_indexes: concurrent index builds need a non-atomic
+    # migration.
+    atomic = False
+
+    dependencies = [
+        ('products', '0006_querysummary'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('name', config='russian'), name='product_name_search_idx'),
+        ),
+    ]
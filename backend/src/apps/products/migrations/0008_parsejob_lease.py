@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_product_name_search_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parsejob',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='parsejob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
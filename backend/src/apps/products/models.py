@@ -1,10 +1,196 @@
+from django.contrib.postgres.indexes import BrinIndex, GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
 from django.db import models
+from django.db.models.functions import Upper
+from django.utils import timezone
 
 
 class Product(models.Model):
+    wb_id = models.PositiveBigIntegerField(
+        unique=True,
+        null=True,
+        blank=True,
+        help_text='Wildberries article id (nm id)',
+    )
     name = models.CharField(max_length=512)
     price = models.DecimalField(max_digits=12, decimal_places=2)
     discounted_price = models.DecimalField(max_digits=12, decimal_places=2)
     rating = models.FloatField()
     reviews_count = models.PositiveIntegerField()
+    search_query = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text='Search query of the crawl that last saved the product',
+    )
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Range filters and orderings of get_products_with_filters.
+            # The trailing id matches the tie-breaker of cursor pagination.
+            models.Index(fields=['price', 'id'], name='product_price_id_idx'),
+            models.Index(fields=['rating', 'id'], name='product_rating_id_idx'),
+            models.Index(fields=['reviews_count', 'id'], name='product_reviews_id_idx'),
+            models.Index(fields=['name', 'id'], name='product_name_id_idx'),
+            models.Index(
+                fields=['-created_at', '-id'], name='product_created_at_id_idx'
+            ),
+            # Admin search uses `UPPER(name) LIKE UPPER('%...%')` (icontains).
+            # Also serves the trigram similarity half of the `search` filter.
+            GinIndex(
+                OpClass(Upper('name'), name='gin_trgm_ops'),
+                name='product_name_trgm_idx',
+            ),
+            # Full-text half of the `search` filter.
+            GinIndex(
+                SearchVector('name', config='russian'),
+                name='product_name_search_idx',
+            ),
+        ]
+
+
+class ProductSnapshot(models.Model):
+    """
+    Price, rating and review count of a product at the time of a crawl.
+
+    Rows are only ever appended: every crawl that saves a product also
+    records a snapshot of it.
+    """
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='snapshots',
+        db_index=False,
+    )
+    captured_at = models.DateTimeField(default=timezone.now)
+    price = models.DecimalField(max_digits=12, decimal_places=2)
+    discounted_price = models.DecimalField(max_digits=12, decimal_places=2)
+    rating = models.FloatField()
+    reviews_count = models.PositiveIntegerField()
+
+    TRACKED_FIELDS = ('price', 'discounted_price', 'rating', 'reviews_count')
+
+    class Meta:
+        indexes = [
+            # Series of one product (also serves the foreign key).
+            models.Index(
+                fields=['product', 'captured_at'], name='snapshot_product_time_idx'
+            ),
+            # Snapshots are appended in time order, so a BRIN index covers
+            # time-range scans across all products at a fraction of the size.
+            BrinIndex(fields=['captured_at'], name='snapshot_captured_brin_idx'),
+        ]
+
+    @classmethod
+    def from_product(cls, product: Product, captured_at=None) -> 'ProductSnapshot':
+        """
+        Build an unsaved snapshot of the tracked fields of `product`.
+        """
+        return cls(
+            product_id=product.pk,
+            captured_at=captured_at or timezone.now(),
+            **{name: getattr(product, name) for name in cls.TRACKED_FIELDS},
+        )
+
+
+class QuerySummary(models.Model):
+    """
+    Precomputed aggregates of the products found by one search query.
+
+    Refreshed by every crawl batch that touches the query, so reading the
+    summary of a query is a single-row lookup.
+    """
+
+    RATING_BUCKETS = 5
+
+    query = models.CharField(max_length=255, unique=True)
+    product_count = models.PositiveIntegerField(default=0)
+    price_min = models.DecimalField(max_digits=12, decimal_places=2, null=True)
+    price_max = models.DecimalField(max_digits=12, decimal_places=2, null=True)
+    price_avg = models.DecimalField(max_digits=12, decimal_places=2, null=True)
+    discounted_price_avg = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True
+    )
+    rating_avg = models.FloatField(null=True)
+    rating_distribution = models.JSONField(
+        default=list,
+        help_text='Product counts per rating bucket: [0, 1), [1, 2), ..., [4, 5]',
+    )
+    reviews_total = models.PositiveBigIntegerField(default=0)
+    discount_avg = models.FloatField(
+        null=True, help_text='Average discount in percent of the price'
+    )
+    discount_max = models.FloatField(null=True)
+    discounted_count = models.PositiveIntegerField(
+        default=0, help_text='Products sold below the full price'
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'query summaries'
+        ordering = ['query']
+
+    def __str__(self):
+        return self.query
+
+
+class ParseJob(models.Model):
+    """
+    A Wildberries crawl queued from the admin and run by the
+    `run_parse_jobs` worker.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        SUCCEEDED = 'succeeded', 'Succeeded'
+        FAILED = 'failed', 'Failed'
+
+    query = models.CharField(max_length=255)
+    pages = models.PositiveIntegerField(default=1)
+    limit = models.PositiveIntegerField(
+        null=True, blank=True, help_text='Maximum number of products to parse'
+    )
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.PENDING
+    )
+    pages_done = models.PositiveIntegerField(default=0)
+    products_parsed = models.PositiveIntegerField(default=0)
+    products_created = models.PositiveIntegerField(default=0)
+    products_updated = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Renewed by the worker with every saved chunk; a running job whose
+    # heartbeat is too old has lost its worker.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ('-created_at',)
+        indexes = [
+            # The worker polls for the oldest pending job.
+            models.Index(fields=['status', 'created_at'], name='parsejob_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.query} ({self.get_status_display()})'
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.Status.SUCCEEDED, self.Status.FAILED)
+
+    @property
+    def progress(self) -> int:
+        """
+        Crawl progress in percent.
+        """
+        if self.status == self.Status.SUCCEEDED:
+            return 100
+        if not self.pages:
+            return 0
+        return min(100, self.pages_done * 100 // self.pages)
@@ -0,0 +1,322 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    LimitOffsetPagination,
+    PageNumberPagination,
+)
+from rest_framework.utils.urls import replace_query_param
+
+from apps.products.models import Product
+
+MAX_PAGE_SIZE = 100
+
+
+class ProductPageNumberPagination(PageNumberPagination):
+    """
+    Page-number pagination: `?page=2&page_size=50`.
+    """
+
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Same as `paginate_queryset`, with the count and the page fetched by
+        the async ORM.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg) from exc
+        self.page.object_list = [row async for row in self.page.object_list]
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        return list(self.page)
+
+
+class ProductLimitOffsetPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination: `?limit=50&offset=100`.
+    """
+
+    max_limit = MAX_PAGE_SIZE
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Same as `paginate_queryset`, with the count and the page fetched by
+        the async ORM.
+        """
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [row async for row in queryset[self.offset : self.offset + self.limit]]
+
+
+class ProductCursorPagination(CursorPagination):
+    """
+    Keyset pagination with an opaque cursor: `?cursor=<token>&page_size=50`.
+
+    Unlike the stock DRF cursor pagination, the ordering is taken from the
+    queryset (so every ordering allowed by `get_products_with_filters` works),
+    ties are broken on `id`, and the cursor stores the full sort key of the
+    boundary row. Every page is a `WHERE <sort key> > <cursor> LIMIT n` query,
+    so fetching page N costs the same as fetching the first page.
+    """
+
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Same as `paginate_queryset`, with the page fetched by the async ORM.
+        """
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page([row async for row in queryset])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Get the query of the requested page: the rows after the cursor, plus
+        one to find out whether there is a following page.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.annotations = queryset.query.annotations
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = self.cursor is not None and self.cursor.reverse
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self.cursor is not None:
+            queryset = queryset.filter(
+                _keyset_filter(self.ordering, self.cursor.position, reverse)
+            )
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, results: list) -> list:
+        """
+        Keep the rows of the page fetched with `get_page_queryset` and work
+        out the links to the neighbouring pages.
+        """
+        reverse = self.cursor is not None and self.cursor.reverse
+        has_following_page = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+
+        if reverse:
+            self.has_next = True
+            self.has_previous = has_following_page
+        else:
+            self.has_next = has_following_page
+            self.has_previous = self.cursor is not None
+        if not self.page:
+            self.has_next = self.has_previous = False
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Take the ordering from the queryset and append an `id` tie-breaker
+        in the direction of the leading field.
+        """
+        ordering = []
+        seen = set()
+        for field in queryset.query.order_by or self.ordering:
+            if not isinstance(field, str):
+                continue
+            name = field.lstrip('-')
+            if name == 'pk':
+                field, name = field.replace('pk', 'id'), 'id'
+            if name in seen:
+                continue
+            seen.add(name)
+            ordering.append(field)
+
+        if not ordering:
+            ordering = list(self.ordering)
+        if 'id' not in seen:
+            ordering.append('-id' if ordering[0].startswith('-') else 'id')
+        return tuple(ordering)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self._get_position_from_instance(self.page[-1], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self._get_position_from_instance(self.page[0], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def decode_cursor(self, request):
+        """
+        Decode the cursor token and check that it was issued for the
+        current ordering.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            ordering = tuple(payload['o'])
+            values = payload['p']
+            reverse = bool(payload.get('r', False))
+            if ordering != self.ordering or len(values) != len(ordering):
+                raise ValueError
+            position = tuple(
+                _ordering_field(field, self.annotations).to_python(value)
+                for field, value in zip(ordering, values, strict=True)
+            )
+        except (
+            TypeError,
+            ValueError,
+            KeyError,
+            FieldDoesNotExist,
+            ValidationError,
+        ) as e:
+            raise NotFound(self.invalid_cursor_message) from e
+
+        return Cursor(offset=0, reverse=reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        payload = {
+            'o': self.ordering,
+            'p': [_encode_value(value) for value in cursor.position],
+        }
+        if cursor.reverse:
+            payload['r'] = 1
+        encoded = urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode()
+        ).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _get_position_from_instance(self, instance, ordering):
+        names = [field.lstrip('-') for field in ordering]
+        if isinstance(instance, dict):
+            return tuple(instance[name] for name in names)
+        return tuple(getattr(instance, name) for name in names)
+
+
+PAGINATION_CLASSES = {
+    'page': ProductPageNumberPagination,
+    'offset': ProductLimitOffsetPagination,
+    'cursor': ProductCursorPagination,
+}
+DEFAULT_PAGINATION_MODE = 'page'
+
+
+def get_paginator(mode: str | None):
+    """
+    Get a paginator instance for the requested pagination mode.
+
+    Args:
+        mode (str | None): One of `page`, `offset` or `cursor`.
+            Unknown or missing modes fall back to page-number pagination.
+
+    Returns:
+        BasePagination: A fresh paginator instance.
+    """
+    pagination_class = PAGINATION_CLASSES.get(mode or DEFAULT_PAGINATION_MODE)
+    if pagination_class is None:
+        pagination_class = PAGINATION_CLASSES[DEFAULT_PAGINATION_MODE]
+    return pagination_class()
+
+
+def _reverse_ordering(ordering: tuple) -> tuple:
+    return tuple(
+        field[1:] if field.startswith('-') else f'-{field}' for field in ordering
+    )
+
+
+def _ordering_field(field: str, annotations: dict):
+    name = field.lstrip('-')
+    if name in annotations:
+        return annotations[name].output_field
+    return Product._meta.get_field(name)
+
+
+def _encode_value(value):
+    if isinstance(value, int | float | str) or value is None:
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _keyset_filter(ordering: tuple, position: tuple, reverse: bool) -> Q:
+    """
+    Build the "rows after `position`" condition for a multi-column sort key.
+
+    The expanded form `(a > x) OR (a = x AND b > y) OR ...` works for mixed
+    sort directions. The leading `a >= x` bound is redundant but lets
+    Postgres start the index scan at the cursor instead of filtering every
+    row before it.
+    """
+    conditions = []
+    equal = Q()
+    for field, value in zip(ordering, position, strict=True):
+        name = field.lstrip('-')
+        descending = field.startswith('-') != reverse
+        lookup = 'lt' if descending else 'gt'
+        conditions.append(equal & Q(**{f'{name}__{lookup}': value}))
+        equal &= Q(**{name: value})
+
+    leading = ordering[0]
+    name = leading.lstrip('-')
+    lookup = 'lte' if leading.startswith('-') != reverse else 'gte'
+    return Q(**{f'{name}__{lookup}': position[0]}) & reduce(or_, conditions)
@@ -1,9 +1,343 @@
-from rest_framework import serializers
+from collections.abc import Sequence
+from datetime import datetime
+from decimal import Decimal
 
-from apps.products.models import Product
+from django.conf import settings
+from django.db.models import QuerySet
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from apps.products.analytics import DEFAULT_BINS, MAX_BINS, PRICE_FIELDS
+from apps.products.models import Product, QuerySummary
+from apps.products.services import HISTORY_BUCKETS
 
 
 class ProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = '__all__'
+
+
+class ProductRowSerializer(serializers.BaseSerializer):
+    """
+    Read-only fast path of `ProductSerializer` for list responses.
+
+    Serializes rows fetched with `values_list(*ProductRowSerializer.fields(),
+    named=True)` instead of model instances, so no `Product` objects are built
+    and the per-field DRF machinery (attribute lookup, `SkipField` handling,
+    timezone lookups) is skipped. Field names, order and value formatting come
+    from `ProductSerializer`, so the rendered JSON is byte-identical. Columns
+    after the model fields (such as annotations) are ignored.
+
+    A sparse fieldset is serialized with `fields=`: the rows then start with
+    those fields (see `get_product_rows`).
+    """
+
+    def __init__(self, *args, fields: Sequence[str] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Built per serializer, because datetimes are rendered in the
+        # timezone that is active for the current request.
+        self._converters = tuple(
+            (name, _get_converter(field))
+            for name, field in ProductSerializer().fields.items()
+            if fields is None or name in fields
+        )
+
+    @classmethod
+    def fields(cls) -> tuple[str, ...]:
+        """
+        Get the model fields to fetch, in `ProductSerializer` output order.
+        """
+        return tuple(ProductSerializer().fields)
+
+    def to_representation(self, instance):
+        return {
+            name: None if value is None else convert(value)
+            # Not strict: rows may carry extra trailing columns.
+            for (name, convert), value in zip(self._converters, instance, strict=False)
+        }
+
+
+def parse_product_fields(value: str | None) -> tuple[str, ...]:
+    """
+    Parse the `fields` query parameter of the products list.
+
+    Args:
+        value (str | None): Comma-separated field names, e.g. `id,price`.
+
+    Returns:
+        tuple[str, ...]: The requested fields in `ProductSerializer` output
+            order; all of them if `value` is empty.
+
+    Raises:
+        ValidationError: If a field is unknown.
+    """
+    all_fields = ProductRowSerializer.fields()
+    requested = {name.strip() for name in (value or '').split(',') if name.strip()}
+    if not requested:
+        return all_fields
+    unknown = requested.difference(all_fields)
+    if unknown:
+        raise serializers.ValidationError(
+            {
+                'fields': [
+                    f'Unknown fields: {", ".join(sorted(unknown))}. '
+                    f'Expected some of: {", ".join(all_fields)}.'
+                ]
+            }
+        )
+    return tuple(name for name in all_fields if name in requested)
+
+
+def get_product_rows(
+    products: QuerySet, fields: Sequence[str] | None = None
+) -> QuerySet:
+    """
+    Fetch only the columns that `ProductRowSerializer(fields=fields)` and
+    the paginators need.
+
+    The rows start with `fields` (all product fields by default), followed
+    by the ordering columns and annotations (such as the search rank) that
+    cursor pagination reads from the boundary rows of a page.
+
+    Args:
+        products (QuerySet): Filtered and ordered products.
+        fields (Sequence[str] | None): Fields to serialize.
+
+    Returns:
+        QuerySet: Named tuples of the columns.
+    """
+    fields = tuple(fields or ProductRowSerializer.fields())
+    annotations = tuple(products.query.annotations)
+    extra = []
+    for field in (*products.query.order_by, 'id'):
+        if not isinstance(field, str):
+            continue
+        name = field.lstrip('-')
+        name = 'id' if name == 'pk' else name
+        if name not in fields and name not in annotations and name not in extra:
+            extra.append(name)
+    return products.values_list(*fields, *extra, *annotations, named=True)
+
+
+def _get_converter(field: serializers.Field):
+    """
+    Get a function that turns a database value into the representation
+    `field` would produce for it.
+
+    Values that already have the right type are passed through; everything
+    else goes through `field.to_representation`.
+    """
+    if isinstance(field, serializers.DecimalField):
+        return _get_decimal_converter(field)
+    if isinstance(field, serializers.DateTimeField):
+        return _get_datetime_converter(field)
+    if (
+        isinstance(field, serializers.IntegerField | serializers.FloatField)
+        or type(field) is serializers.CharField
+    ):
+        return _identity
+    return field.to_representation
+
+
+def _get_datetime_converter(field: serializers.DateTimeField):
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if (
+        not isinstance(output_format, str)
+        or output_format.lower() != ISO_8601
+        or hasattr(field, 'timezone')
+        or not settings.USE_TZ
+    ):
+        return field.to_representation
+
+    current_timezone = timezone.get_current_timezone()
+
+    def convert(value):
+        if isinstance(value, datetime) and timezone.is_aware(value):
+            value = value.astimezone(current_timezone).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return field.to_representation(value)
+
+    return convert
+
+
+def _get_decimal_converter(field: serializers.DecimalField):
+    coerce_to_string = getattr(
+        field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING
+    )
+    if not coerce_to_string or field.localize or field.normalize_output:
+        return field.to_representation
+
+    exponent = -field.decimal_places
+
+    def convert(value):
+        # Database values already have the column scale, so quantizing them
+        # is a no-op and the string form can be produced directly.
+        if isinstance(value, Decimal) and value.as_tuple().exponent == exponent:
+            return f'{value:f}'
+        return field.to_representation(value)
+
+    return convert
+
+
+def _identity(value):
+    return value
+
+
+class QuerySummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = QuerySummary
+        exclude = ('id',)
+
+
+class PaginatedProductSerializer(serializers.Serializer):
+    """
+    Shape of a paginated products list response (used for API docs).
+    """
+
+    count = serializers.IntegerField(
+        required=False, help_text='Total count (page and offset modes only)'
+    )
+    next = serializers.URLField(allow_null=True)
+    previous = serializers.URLField(allow_null=True)
+    results = ProductSerializer(many=True)
+
+
+class ProductHistoryQuerySerializer(serializers.Serializer):
+    """
+    Query parameters of the product history endpoint.
+    """
+
+    bucket = serializers.ChoiceField(choices=HISTORY_BUCKETS, default='day')
+    date_from = serializers.DateTimeField(required=False)
+    date_to = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        date_from = attrs.get('date_from')
+        date_to = attrs.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            raise serializers.ValidationError(
+                {'date_to': 'date_to must not be earlier than date_from.'}
+            )
+        return attrs
+
+
+class ProductHistoryPointSerializer(serializers.Serializer):
+    """
+    One bucket of a product price and rating series.
+    """
+
+    bucket = serializers.DateTimeField()
+    price_min = serializers.DecimalField(max_digits=12, decimal_places=2)
+    price_max = serializers.DecimalField(max_digits=12, decimal_places=2)
+    price_avg = serializers.DecimalField(max_digits=12, decimal_places=2)
+    discounted_price_avg = serializers.DecimalField(max_digits=12, decimal_places=2)
+    rating_avg = serializers.FloatField()
+    reviews_count = serializers.IntegerField(help_text='Maximum in the bucket')
+    samples = serializers.IntegerField(help_text='Number of snapshots in the bucket')
+
+
+class ProductHistorySerializer(serializers.Serializer):
+    """
+    Shape of a product history response.
+    """
+
+    product_id = serializers.IntegerField()
+    bucket = serializers.ChoiceField(choices=HISTORY_BUCKETS)
+    results = ProductHistoryPointSerializer(many=True)
+
+
+class AnalyticsQuerySerializer(serializers.Serializer):
+    """
+    Query parameters of the analytics endpoints (besides the product filters).
+    """
+
+    field = serializers.ChoiceField(
+        choices=PRICE_FIELDS,
+        default='discounted_price',
+        help_text='Price field of the price histogram and percentiles',
+    )
+    bins = serializers.IntegerField(
+        min_value=1,
+        max_value=MAX_BINS,
+        default=DEFAULT_BINS,
+        help_text='Number of histogram buckets',
+    )
+    percentiles = serializers.CharField(
+        required=False,
+        help_text='Comma-separated percentiles between 0 and 1, e.g. 0.1,0.5,0.9',
+    )
+
+    def validate_percentiles(self, value):
+        try:
+            fractions = [float(item) for item in value.split(',') if item.strip()]
+        except ValueError as e:
+            raise serializers.ValidationError('Percentiles must be numbers.') from e
+        if not fractions or any(not 0 <= fraction <= 1 for fraction in fractions):
+            raise serializers.ValidationError('Percentiles must be between 0 and 1.')
+        return fractions
+
+
+class HistogramBinSerializer(serializers.Serializer):
+    min = serializers.FloatField()
+    max = serializers.FloatField()
+    count = serializers.IntegerField()
+
+
+class PercentileSerializer(serializers.Serializer):
+    percentile = serializers.FloatField()
+    value = serializers.FloatField(allow_null=True)
+
+
+class AnalyticsSummarySerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+    avg_rating = serializers.FloatField(allow_null=True)
+    total_reviews = serializers.IntegerField()
+    avg_discount = serializers.FloatField(
+        allow_null=True, help_text='Average discount in percent of the price'
+    )
+
+
+class RatingDiscountSerializer(serializers.Serializer):
+    rating = serializers.FloatField()
+    avg_discount = serializers.FloatField()
+    count = serializers.IntegerField()
+
+
+class DiscountStatsSerializer(serializers.Serializer):
+    avg_discount = serializers.FloatField(
+        allow_null=True, help_text='Average discount in percent of the price'
+    )
+    max_discount = serializers.FloatField(allow_null=True)
+    discounted_share = serializers.FloatField(
+        allow_null=True, help_text='Share of products sold below the full price'
+    )
+    by_rating = RatingDiscountSerializer(many=True)
+
+
+class BucketRangeSerializer(serializers.Serializer):
+    min = serializers.FloatField()
+    max = serializers.FloatField(allow_null=True)
+
+
+class RatingReviewsMatrixSerializer(serializers.Serializer):
+    rating_buckets = BucketRangeSerializer(many=True)
+    reviews_buckets = BucketRangeSerializer(many=True)
+    counts = serializers.ListField(
+        child=serializers.ListField(child=serializers.IntegerField()),
+        help_text='One row per rating bucket, one column per reviews bucket',
+    )
+
+
+class AnalyticsSerializer(serializers.Serializer):
+    """
+    Shape of the combined analytics response.
+    """
+
+    summary = AnalyticsSummarySerializer()
+    price_histogram = HistogramBinSerializer(many=True)
+    rating_histogram = HistogramBinSerializer(many=True)
+    price_percentiles = PercentileSerializer(many=True)
+    discounts = DiscountStatsSerializer()
+    rating_reviews = RatingReviewsMatrixSerializer()
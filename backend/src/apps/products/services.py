@@ -1,9 +1,61 @@
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from itertools import islice
+from typing import NamedTuple
+
 import requests
-from django.db.models import QuerySet
-from django.shortcuts import get_object_or_404
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import transaction
+from django.db.models import (
+    Avg,
+    Count,
+    F,
+    FloatField,
+    Max,
+    Min,
+    Q,
+    QuerySet,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Cast, Concat, Trunc, Upper
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
 from rest_framework.request import QueryDict
+from urllib3.util.retry import Retry
+
+from apps.monitoring.metrics import REGISTRY
+from apps.products import metrics
+from apps.products.analytics import discount_percent
+from apps.products.cache import invalidate_products_cache
+from apps.products.models import ParseJob, Product, ProductSnapshot, QuerySummary
+
+logger = logging.getLogger(__name__)
+
 
-from apps.products.models import Product
+ORDERING_FIELDS = (
+    'price',
+    '-price',
+    'rating',
+    '-rating',
+    'reviews_count',
+    '-reviews_count',
+    'name',
+    '-name',
+)
 
 
 def get_products_with_filters(params: QueryDict) -> QuerySet:
@@ -17,15 +69,23 @@ def get_products_with_filters(params: QueryDict) -> QuerySet:
             - max_price: Maximum product price
             - min_rating: Minimum product rating
             - min_reviews: Minimum number of product reviews
+            - search: Text to look for in product names (see `search_products`)
             Supported ordering:
             - ordering: Comma-separated list of fields to order by.
               Allowed: price, -price, rating, -rating, reviews_count,
-              -reviews_count, name, -name
+              -reviews_count, name, -name. Search results are ordered by
+              relevance unless an ordering is given.
 
     Returns:
         QuerySet: Filtered and ordered product objects.
     """
     products = Product.objects.all()
+    default_ordering = ('-created_at',)
+    search = (params.get('search') or '').strip()
+    if search:
+        products = search_products(products, search)
+        default_ordering = ('-search_rank',)
+
     min_price = params.get('min_price')
     max_price = params.get('max_price')
     min_rating = params.get('min_rating')
@@ -41,27 +101,57 @@ def get_products_with_filters(params: QueryDict) -> QuerySet:
         products = products.filter(reviews_count__gte=min_reviews)
 
     ordering = params.get('ordering')
-    allowed_fields = {
-        'price',
-        '-price',
-        'rating',
-        '-rating',
-        'reviews_count',
-        '-reviews_count',
-        'name',
-        '-name',
-    }
     if ordering:
-        fields = [field for field in ordering.split(',') if field in allowed_fields]
+        fields = [field for field in ordering.split(',') if field in ORDERING_FIELDS]
         if fields:
             products = products.order_by(*fields)
         else:
-            products = products.order_by('-created_at')
+            products = products.order_by(*default_ordering)
     else:
-        products = products.order_by('-created_at')
+        products = products.order_by(*default_ordering)
     return products
 
 
+SEARCH_CONFIG = 'russian'
+
+
+def search_products(products: QuerySet, search: str) -> QuerySet:
+    """
+    Find products whose name matches `search` and annotate their relevance.
+
+    A product matches if its name matches the search as a Russian full-text
+    query (stemmed, so "телефоны" finds "телефон") or contains a word similar
+    to it by trigrams (which survives typos and partial words). Both
+    conditions are served by GIN indexes and are OR-ed in a single query.
+
+    Args:
+        products (QuerySet): Products to search in.
+        search (str): The search text, in web search syntax
+            (`"exact phrase"`, `-excluded`, `or`).
+
+    Returns:
+        QuerySet: Matching products annotated with `search_rank`: the
+            full-text rank plus the trigram word similarity.
+    """
+    query = SearchQuery(search, config=SEARCH_CONFIG, search_type='websearch')
+    # Same expressions as the product_name_search_idx and
+    # product_name_trgm_idx indexes, so that both are used.
+    vector = SearchVector('name', config=SEARCH_CONFIG)
+    upper_name = Upper('name')
+    upper_search = Value(search.upper())
+
+    return products.filter(
+        Q(name__search=query) | Q(TrigramWordSimilar(upper_name, upper_search))
+    ).annotate(
+        # ts_rank and word_similarity return `real`; cast the sum to double
+        # precision so that it round-trips through cursor pagination exactly.
+        search_rank=Cast(
+            SearchRank(vector, query) + TrigramWordSimilarity(upper_search, upper_name),
+            output_field=FloatField(),
+        )
+    )
+
+
 def get_product_by_id(product_id: int) -> Product:
     """
     Get a single product by its ID.
@@ -78,14 +168,242 @@ def get_product_by_id(product_id: int) -> Product:
     return get_object_or_404(Product, id=product_id)
 
 
+async def aget_product_by_id(product_id: int) -> Product:
+    """
+    Async version of `get_product_by_id`.
+    """
+    return await aget_object_or_404(Product, id=product_id)
+
+
+HISTORY_BUCKETS = ('hour', 'day', 'week', 'month')
+
+
+def get_product_history(
+    product: Product,
+    bucket: str = 'day',
+    date_from=None,
+    date_to=None,
+) -> QuerySet:
+    """
+    Get the price and rating series of a product, downsampled into buckets.
+
+    Snapshots are grouped by `captured_at` truncated to the bucket size in the
+    current timezone and aggregated in the database, so the number of points
+    depends on the time range rather than on the number of crawls.
+
+    Args:
+        product (Product): The product to get the series of.
+        bucket (str): Bucket size, one of `HISTORY_BUCKETS`.
+        date_from (datetime | None): Only include snapshots taken at or after
+            this time.
+        date_to (datetime | None): Only include snapshots taken at or before
+            this time.
+
+    Returns:
+        QuerySet: Dicts with `bucket`, `price_min`, `price_max`, `price_avg`,
+            `discounted_price_avg`, `rating_avg`, `reviews_count` (the maximum
+            in the bucket) and `samples`, ordered by bucket.
+    """
+    if bucket not in HISTORY_BUCKETS:
+        raise ValueError(f'Unknown history bucket: {bucket}')
+
+    snapshots = ProductSnapshot.objects.filter(product=product)
+    if date_from is not None:
+        snapshots = snapshots.filter(captured_at__gte=date_from)
+    if date_to is not None:
+        snapshots = snapshots.filter(captured_at__lte=date_to)
+
+    return (
+        snapshots.annotate(bucket=Trunc('captured_at', bucket))
+        .values('bucket')
+        .annotate(
+            price_min=Min('price'),
+            price_max=Max('price'),
+            price_avg=Avg('price'),
+            discounted_price_avg=Avg('discounted_price'),
+            rating_avg=Avg('rating'),
+            reviews_count=Max('reviews_count'),
+            samples=Count('id'),
+        )
+        .order_by('bucket')
+    )
+
+
+def refresh_query_summaries(queries: Iterable[str]) -> list[QuerySummary]:
+    """
+    Recompute the summaries of the given search queries.
+
+    Each query costs one aggregate over its own products (found through the
+    `search_query` index) plus one upsert, so refreshing after a crawl batch
+    does not depend on the size of the catalog. Summaries of queries without
+    products are deleted.
+
+    Args:
+        queries (Iterable[str]): Search queries to refresh.
+
+    Returns:
+        list[QuerySummary]: The refreshed summaries.
+    """
+    bucket_count = QuerySummary.RATING_BUCKETS
+    rating_buckets = {
+        f'rating_{i}': Count(
+            'id',
+            filter=Q(rating__gte=i)
+            & (Q(rating__lt=i + 1) if i < bucket_count - 1 else Q()),
+        )
+        for i in range(bucket_count)
+    }
+
+    summaries = []
+    for query in sorted(set(queries)):
+        stats = Product.objects.filter(search_query=query).aggregate(
+            product_count=Count('id'),
+            price_min=Min('price'),
+            price_max=Max('price'),
+            price_avg=Avg('price'),
+            discounted_price_avg=Avg('discounted_price'),
+            rating_avg=Avg('rating'),
+            reviews_total=Sum('reviews_count'),
+            discount_avg=Avg(discount_percent(), filter=Q(price__gt=0)),
+            discount_max=Max(discount_percent(), filter=Q(price__gt=0)),
+            discounted_count=Count('id', filter=Q(discounted_price__lt=F('price'))),
+            **rating_buckets,
+        )
+        if not stats['product_count']:
+            QuerySummary.objects.filter(query=query).delete()
+            continue
+
+        stats['rating_distribution'] = [stats.pop(name) for name in rating_buckets]
+        stats['reviews_total'] = stats['reviews_total'] or 0
+        summary, _ = QuerySummary.objects.update_or_create(query=query, defaults=stats)
+        summaries.append(summary)
+    return summaries
+
+
+def get_query_summaries() -> QuerySet:
+    """
+    Get the summaries of all search queries, ordered by query.
+    """
+    return QuerySummary.objects.all()
+
+
+def get_query_summary(query: str) -> QuerySummary:
+    """
+    Get the summary of a single search query.
+
+    Raises:
+        Http404: If there is no summary for the query.
+    """
+    return get_object_or_404(QuerySummary, query=query)
+
+
+class PageResult(NamedTuple):
+    """
+    Result of fetching a single search results page.
+
+    Attributes:
+        page (int): The page number.
+        products (list): Raw product dictionaries (empty if the fetch failed).
+        error (Exception | None): The error raised while fetching, if any.
+    """
+
+    page: int
+    products: list
+    error: Exception | None = None
+
+
+class RateLimiter:
+    """
+    A thread-safe limiter that spaces calls at least `1 / rate` seconds apart.
+
+    Attributes:
+        rate (float | None): Maximum number of calls per second.
+            None or a non-positive value disables limiting.
+    """
+
+    def __init__(self, rate: float | None = None):
+        self.rate = rate
+        self._interval = 1 / rate if rate and rate > 0 else 0
+        self._next_call = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """
+        Block until the next call is allowed.
+        """
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_call - now
+            self._next_call = max(now, self._next_call) + self._interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+@dataclass
+class CrawlStats:
+    """
+    Thread-safe HTTP counters collected during a crawl.
+
+    Attributes:
+        requests (int): Number of completed fetches.
+        errors (int): Number of fetches that failed after all retries.
+        retries (int): Number of retried requests.
+        bytes_received (int): Total size of response bodies.
+        latency_total (float): Sum of fetch latencies in seconds.
+        latency_max (float): Slowest fetch latency in seconds.
+    """
+
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    bytes_received: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def record(self, latency, size=0, retries=0, error=False) -> None:
+        with self._lock:
+            self.requests += 1
+            self.errors += int(error)
+            self.retries += retries
+            self.bytes_received += size
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+
+    @property
+    def latency_avg(self) -> float:
+        return self.latency_total / self.requests if self.requests else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'bytes_received': self.bytes_received,
+            'latency_avg': round(self.latency_avg, 4),
+            'latency_max': round(self.latency_max, 4),
+        }
+
+
 class WildberriesParser:
     """
     A class for fetching, parsing, and saving product data from Wildberries.
 
+    Requests go through a pooled `requests.Session`, so keep-alive TLS
+    connections are reused across pages. Connection errors and 429/5xx
+    responses are retried with exponential backoff, honoring `Retry-After`.
+    HTTP counters for the crawl are collected in `stats`.
+
     Attributes:
         API_VERSION (str): The API version for Wildberries product search.
         API_URL (str): The API endpoint for Wildberries product search.
         HEADERS (dict): HTTP headers for making requests to Wildberries API.
+        UPSERT_FIELDS (list): Fields refreshed when a known product is saved again.
+        RETRY_STATUSES (tuple): Response statuses that are retried.
     """
 
     API_VERSION = 'v13'
@@ -93,6 +411,64 @@ class WildberriesParser:
     HEADERS = {
         'User-Agent': 'Mozilla/5.0 (compatible; wb-analytics-bot/1.0)',
     }
+    UPSERT_FIELDS = [
+        'name',
+        'price',
+        'discounted_price',
+        'rating',
+        'reviews_count',
+    ]
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        pool_size=10,
+        max_retries=3,
+        backoff_factor=0.5,
+        backoff_max=30,
+        timeout=10,
+    ):
+        """
+        Args:
+            pool_size (int, optional): Maximum number of kept-alive connections.
+                Should be at least the fetch concurrency. Default: 10.
+            max_retries (int, optional): Retries per request. Default: 3.
+            backoff_factor (float, optional): Base of the exponential backoff
+                between retries, in seconds. Default: 0.5.
+            backoff_max (float, optional): Upper bound of a backoff delay,
+                in seconds. Default: 30.
+            timeout (float, optional): Timeout of a single request. Default: 10.
+        """
+        self.timeout = timeout
+        self.stats = CrawlStats()
+        self.session = requests.Session()
+        self.session.headers.update(self.HEADERS)
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            backoff_max=backoff_max,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=frozenset({'GET'}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close pooled connections.
+        """
+        self.session.close()
 
     def fetch(self, query, page=1, limit=100) -> list:
         """
@@ -118,13 +494,97 @@ class WildberriesParser:
             'sort': 'popular',
             'limit': limit,
         }
-        response = requests.get(
-            self.API_URL, params=params, headers=self.HEADERS, timeout=10
+        started = time.perf_counter()
+        response = None
+        try:
+            response = self.session.get(
+                self.API_URL, params=params, timeout=self.timeout
+            )
+            response.raise_for_status()
+        except requests.RequestException:
+            latency = time.perf_counter() - started
+            self.stats.record(
+                latency, retries=self._count_retries(response), error=True
+            )
+            metrics.FETCH_DURATION.observe(latency)
+            metrics.PAGES_FETCHED.inc(result='error')
+            raise
+
+        latency = time.perf_counter() - started
+        self.stats.record(
+            latency,
+            size=len(response.content),
+            retries=self._count_retries(response),
         )
-        response.raise_for_status()
+        metrics.FETCH_DURATION.observe(latency)
+        metrics.PAGES_FETCHED.inc(result='ok')
         data = response.json()
         return data.get('data', {}).get('products', [])
 
+    def fetch_pages(
+        self,
+        query,
+        pages,
+        limit=100,
+        concurrency=1,
+        rate_limit=None,
+    ) -> Iterator[PageResult]:
+        """
+        Fetch several search result pages, optionally in parallel.
+
+        At most `concurrency` requests are in flight at any time, and results
+        are yielded strictly in page order, so callers can stop at the first
+        empty page. Closing the iterator early cancels pages that have not
+        been requested yet.
+
+        Args:
+            query (str): The search term to look for products.
+            pages (int): Number of pages to fetch, starting from page 1.
+            limit (int, optional): Products per page. Default: 100.
+            concurrency (int, optional): Number of parallel requests. Default: 1.
+            rate_limit (float, optional): Maximum requests per second across
+                all workers. Default: unlimited.
+
+        Yields:
+            PageResult: The products (or the error) of each page, in order.
+        """
+        limiter = RateLimiter(rate_limit)
+
+        def fetch_page(page):
+            limiter.wait()
+            return self.fetch(query, page=page, limit=limit)
+
+        page_numbers = iter(range(1, pages + 1))
+        executor = ThreadPoolExecutor(
+            max_workers=max(concurrency, 1), thread_name_prefix='wb-fetch'
+        )
+        pending = deque()
+        try:
+            for page in page_numbers:
+                pending.append((page, executor.submit(fetch_page, page)))
+                if len(pending) >= concurrency:
+                    break
+
+            while pending:
+                page, future = pending.popleft()
+                try:
+                    result = PageResult(page, future.result())
+                except Exception as e:
+                    result = PageResult(page, [], e)
+
+                next_page = next(page_numbers, None)
+                if next_page is not None:
+                    pending.append((next_page, executor.submit(fetch_page, next_page)))
+
+                yield result
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _count_retries(response) -> int:
+        retries = getattr(getattr(response, 'raw', None), 'retries', None)
+        return len(retries.history) if retries else 0
+
     def parse(self, item) -> dict | None:
         """
         Parse product data from a Wildberries item dictionary.
@@ -134,7 +594,7 @@ class WildberriesParser:
 
         Returns:
             dict: Parsed product data with standardized fields.
-            None: If parsing fails.
+            None: If parsing fails; the failure is logged and counted.
         """
         try:
             name = item.get('name') or item.get('title') or 'Unknown'
@@ -151,21 +611,33 @@ class WildberriesParser:
 
             rating = float(item.get('reviewRating') or 0)
             reviews_count = int(item.get('feedbacks') or 0)
-
-            return {
-                'name': name,
-                'price': price,
-                'discounted_price': discounted_price,
-                'rating': rating,
-                'reviews_count': reviews_count,
-            }
+            wb_id = int(item['id']) if item.get('id') else None
         except Exception:
+            metrics.PARSE_FAILURES.inc()
+            item_id = item.get('id') if isinstance(item, dict) else None
+            logger.warning(
+                'Could not parse Wildberries item %s', item_id, exc_info=True
+            )
             return None
 
+        metrics.ITEMS_PARSED.inc()
+        return {
+            'wb_id': wb_id,
+            'name': name,
+            'price': price,
+            'discounted_price': discounted_price,
+            'rating': rating,
+            'reviews_count': reviews_count,
+        }
+
     def save(self, product_data) -> bool:
         """
         Save product data to the database.
 
+        Products with a Wildberries article id are upserted by that id, so a
+        price change updates the existing row instead of adding a new one.
+        The saved values are also appended to the price history.
+
         Args:
             product_data (dict): Product data to save.
 
@@ -176,7 +648,342 @@ class WildberriesParser:
             return False
 
         try:
-            _, created = Product.objects.update_or_create(**product_data)
-            return created
+            with transaction.atomic():
+                wb_id = product_data.get('wb_id')
+                if wb_id is None:
+                    product, created = Product.objects.update_or_create(**product_data)
+                else:
+                    defaults = {k: v for k, v in product_data.items() if k != 'wb_id'}
+                    product, created = Product.objects.update_or_create(
+                        wb_id=wb_id, defaults=defaults
+                    )
+                ProductSnapshot.from_product(product).save()
         except Exception:
             return False
+        metrics.record_saved(int(created), int(not created))
+        return created
+
+    def save_batch(
+        self, products_data, search_query: str | None = None
+    ) -> tuple[int, int]:
+        """
+        Upsert a batch of parsed products in a single INSERT ... ON CONFLICT
+        and append a snapshot of each of them to the price history.
+
+        Products are matched by their Wildberries article id. Items that
+        failed to parse or have no article id are skipped; if the same
+        article occurs twice in a batch, the last occurrence wins.
+
+        Args:
+            products_data (Iterable[dict | None]): Parsed product data.
+            search_query (str, optional): Search query the products were found
+                by. If given, it is stored on the products and the summaries
+                of the queries touched by the batch are refreshed.
+
+        Returns:
+            tuple[int, int]: Number of created and updated products.
+        """
+        by_wb_id = {}
+        for product_data in products_data:
+            if product_data and product_data.get('wb_id') is not None:
+                by_wb_id[product_data['wb_id']] = product_data
+        if not by_wb_id:
+            return 0, 0
+
+        update_fields = self.UPSERT_FIELDS
+        if search_query is not None:
+            update_fields = [*update_fields, 'search_query']
+
+        with transaction.atomic():
+            existing = dict(
+                Product.objects.filter(wb_id__in=by_wb_id).values_list(
+                    'wb_id', 'search_query'
+                )
+            )
+            products = Product.objects.bulk_create(
+                [
+                    Product(**product_data, search_query=search_query)
+                    for product_data in by_wb_id.values()
+                ],
+                update_conflicts=True,
+                unique_fields=['wb_id'],
+                update_fields=update_fields,
+            )
+            captured_at = timezone.now()
+            ProductSnapshot.objects.bulk_create(
+                [
+                    ProductSnapshot.from_product(product, captured_at)
+                    for product in products
+                ]
+            )
+            if search_query is not None:
+                # Products found by another query before have moved to this one.
+                refresh_query_summaries({search_query, *existing.values()} - {None})
+            # bulk_create does not send post_save, so the cached responses are
+            # invalidated here rather than by the model signals.
+            transaction.on_commit(invalidate_products_cache)
+
+        updated = len(existing)
+        created = len(by_wb_id) - updated
+        metrics.record_saved(created, updated)
+        return created, updated
+
+
+DEFAULT_CHUNK_SIZE = 500
+# A running job is taken back from its worker after this many seconds without
+# a saved chunk, so it must be well above the time to crawl one chunk.
+PARSE_JOB_LEASE_TIMEOUT = 15 * 60
+PARSE_JOB_MAX_ATTEMPTS = 3
+
+
+@dataclass
+class CrawlProgress:
+    """
+    Running totals of a parse pipeline run.
+
+    Attributes:
+        pages_done (int): Last page number taken from the fetch stage.
+        pages_failed (int): Pages that could not be fetched.
+        parsed (int): Items successfully parsed.
+        skipped (int): Items that could not be parsed or had no article id.
+        created (int): Products created.
+        updated (int): Products updated.
+        errors (list[str]): Fetch error messages, in page order.
+    """
+
+    pages_done: int = 0
+    pages_failed: int = 0
+    parsed: int = 0
+    skipped: int = 0
+    created: int = 0
+    updated: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+def iter_pages(
+    parser: WildberriesParser,
+    query: str,
+    pages: int,
+    progress: CrawlProgress,
+    **fetch_options,
+) -> Iterator[list]:
+    """
+    Fetch stage: yield raw product lists page by page, stopping at the first
+    empty page. Failed pages are recorded in `progress` and skipped.
+    """
+    results = parser.fetch_pages(query, pages, **fetch_options)
+    try:
+        for page, products, error in results:
+            progress.pages_done = page
+            if error is not None:
+                progress.pages_failed += 1
+                progress.errors.append(f'Failed to fetch page {page}: {error}')
+                continue
+            if not products:
+                break
+            yield products
+    finally:
+        results.close()
+
+
+def iter_parsed(
+    parser: WildberriesParser,
+    pages: Iterable[list],
+    progress: CrawlProgress,
+) -> Iterator[dict]:
+    """
+    Parse stage: yield parsed products one by one, dropping items that fail
+    to parse. Raw page lists are released as soon as they are consumed.
+    """
+    for products in pages:
+        for item in products:
+            product_data = parser.parse(item)
+            if product_data is None or product_data.get('wb_id') is None:
+                progress.skipped += 1
+                continue
+            progress.parsed += 1
+            yield product_data
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    """
+    Batch stage: group an iterable into lists of at most `size` items.
+    """
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def run_parse_pipeline(
+    parser: WildberriesParser,
+    query: str,
+    pages: int,
+    *,
+    per_page: int = 100,
+    max_products: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    concurrency: int = 1,
+    rate_limit: float | None = None,
+) -> Iterator[CrawlProgress]:
+    """
+    Stream a crawl through fetch -> parse -> batch -> bulk write.
+
+    Products are saved with `query` as their search query, so the summary of
+    the query is refreshed after every chunk.
+
+    Every stage is a generator pulling from the previous one, so only the
+    pages in flight (at most `concurrency`) and one chunk of parsed products
+    are held in memory, whatever the size of the crawl. A slow writer
+    naturally throttles fetching.
+
+    Args:
+        parser (WildberriesParser): Parser used to fetch, parse and save.
+        query (str): The search term to look for products.
+        pages (int): Maximum number of pages to fetch.
+        per_page (int, optional): Products requested per page. Default: 100.
+        max_products (int, optional): Stop after this many parsed products.
+        chunk_size (int, optional): Products per bulk write. Default: 500.
+        concurrency (int, optional): Pages fetched in parallel. Default: 1.
+        rate_limit (float, optional): Maximum requests per second.
+
+    Yields:
+        CrawlProgress: The running totals after each written chunk.
+    """
+    progress = CrawlProgress()
+    fetched = iter_pages(
+        parser,
+        query,
+        pages,
+        progress,
+        limit=per_page,
+        concurrency=concurrency,
+        rate_limit=rate_limit,
+    )
+    products = iter_parsed(parser, fetched, progress)
+    if max_products:
+        products = islice(products, max_products)
+
+    reported_pages = None
+    try:
+        for chunk in chunked(products, chunk_size):
+            created, updated = parser.save_batch(chunk, search_query=query)
+            progress.created += created
+            progress.updated += updated
+            reported_pages = progress.pages_done
+            REGISTRY.maybe_flush()
+            yield progress
+    finally:
+        fetched.close()
+        REGISTRY.maybe_flush(force=True)
+    if reported_pages != progress.pages_done:
+        yield progress
+
+
+def claim_next_parse_job(
+    lease_timeout: float = PARSE_JOB_LEASE_TIMEOUT,
+    max_attempts: int = PARSE_JOB_MAX_ATTEMPTS,
+) -> ParseJob | None:
+    """
+    Atomically take the oldest pending parse job and mark it as running.
+
+    Rows locked by other workers are skipped, so several workers can poll
+    the same queue without picking up the same job. Running jobs whose
+    worker died (no heartbeat for `lease_timeout`) are requeued first, or
+    failed once they have been tried `max_attempts` times, as a job that
+    kills its worker would kill the next ones too.
+
+    Args:
+        lease_timeout (float, optional): Seconds without a heartbeat after
+            which a running job is taken back. Default: 900.
+        max_attempts (int, optional): Runs of a job before it is failed
+            instead of requeued. Default: 3.
+
+    Returns:
+        ParseJob: The claimed job.
+        None: If there are no pending jobs.
+    """
+    with transaction.atomic():
+        expires = timezone.now() - timedelta(seconds=lease_timeout)
+        expired = ParseJob.objects.filter(
+            Q(heartbeat_at__lt=expires) | Q(heartbeat_at=None, started_at__lt=expires),
+            status=ParseJob.Status.RUNNING,
+        )
+        expired.filter(attempts__gte=max_attempts).update(
+            status=ParseJob.Status.FAILED,
+            error=Concat('error', Value('The worker running the job stopped.\n')),
+            finished_at=timezone.now(),
+        )
+        expired.update(status=ParseJob.Status.PENDING)
+
+        job = (
+            ParseJob.objects.select_for_update(skip_locked=True)
+            .filter(status=ParseJob.Status.PENDING)
+            .order_by('created_at')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = ParseJob.Status.RUNNING
+        job.attempts += 1
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.save(update_fields=['status', 'attempts', 'started_at', 'heartbeat_at'])
+    return job
+
+
+def run_parse_job(
+    job: ParseJob,
+    parser: WildberriesParser | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ParseJob:
+    """
+    Run a claimed parse job through the parse pipeline, saving its progress
+    after every written chunk.
+
+    Args:
+        job (ParseJob): The job to run.
+        parser (WildberriesParser, optional): Parser to use. Default: a new one.
+        chunk_size (int, optional): Products per bulk write. Default: 500.
+
+    Returns:
+        ParseJob: The finished job with its final status and counters.
+    """
+    parser = parser or WildberriesParser()
+    progress_fields = [
+        'heartbeat_at',
+        'pages_done',
+        'error',
+        'products_parsed',
+        'products_created',
+        'products_updated',
+    ]
+    progress = None
+    try:
+        for progress in run_parse_pipeline(
+            parser,
+            job.query,
+            job.pages,
+            max_products=job.limit,
+            chunk_size=chunk_size,
+        ):
+            _update_job_progress(job, progress)
+            job.heartbeat_at = timezone.now()
+            job.save(update_fields=progress_fields)
+    except Exception as e:
+        job.status = ParseJob.Status.FAILED
+        job.error += f'{type(e).__name__}: {e}\n'
+    else:
+        job.status = ParseJob.Status.SUCCEEDED
+    finally:
+        parser.close()
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at'])
+    return job
+
+
+def _update_job_progress(job: ParseJob, progress: CrawlProgress) -> None:
+    job.pages_done = progress.pages_done
+    job.products_parsed = progress.parsed
+    job.products_created = progress.created
+    job.products_updated = progress.updated
+    job.error = ''.join(f'{error}\n' for error in progress.errors)
@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.products.cache import invalidate_products_cache
+from apps.products.models import Product
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_products_cache_on_change(sender, **kwargs):
+    """
+    Drop cached products responses once a product change is committed.
+    """
+    transaction.on_commit(invalidate_products_cache)
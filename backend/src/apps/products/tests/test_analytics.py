@@ -0,0 +1,218 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.products.analytics import (
+    get_discounts,
+    get_histogram,
+    get_percentiles,
+    get_rating_reviews_matrix,
+    get_summary,
+)
+from apps.products.models import Product, QuerySummary
+from apps.products.tests.factories import ProductFactory
+
+
+class AnalyticsServiceTests(TestCase):
+    def setUp(self):
+        for price, discounted_price, rating, reviews_count in (
+            (100, 50, 4.0, 0),
+            (200, 200, 4.04, 5),
+            (300, 150, 5.0, 50),
+            (400, 300, 1.0, 5000),
+        ):
+            ProductFactory(
+                price=price,
+                discounted_price=discounted_price,
+                rating=rating,
+                reviews_count=reviews_count,
+            )
+        self.products = Product.objects.all()
+
+    def test_summary(self):
+        summary = get_summary(self.products)
+        self.assertEqual(summary['count'], 4)
+        self.assertAlmostEqual(summary['avg_rating'], 3.51)
+        self.assertEqual(summary['total_reviews'], 5055)
+        self.assertAlmostEqual(summary['avg_discount'], 31.25)
+
+    def test_histogram(self):
+        histogram = get_histogram(self.products, 'price', bins=3)
+        self.assertEqual(
+            histogram,
+            [
+                {'min': 100, 'max': 200, 'count': 1},
+                {'min': 200, 'max': 300, 'count': 1},
+                {'min': 300, 'max': 400, 'count': 2},
+            ],
+        )
+
+    def test_histogram_with_fixed_range(self):
+        histogram = get_histogram(self.products, 'rating', 5, 0, 5)
+        self.assertEqual([item['count'] for item in histogram], [0, 1, 0, 0, 3])
+
+    def test_histogram_of_single_value_and_no_products(self):
+        self.assertEqual(
+            get_histogram(self.products.filter(price=100), 'price'),
+            [{'min': 100, 'max': 100, 'count': 1}],
+        )
+        self.assertEqual(get_histogram(self.products.none(), 'price'), [])
+
+    def test_percentiles(self):
+        percentiles = get_percentiles(self.products, 'price', [0, 0.5, 1])
+        self.assertEqual(
+            percentiles,
+            [
+                {'percentile': 0, 'value': 100},
+                {'percentile': 0.5, 'value': 250},
+                {'percentile': 1, 'value': 400},
+            ],
+        )
+        self.assertEqual(
+            get_percentiles(self.products.none(), 'price', [0.5]),
+            [{'percentile': 0.5, 'value': None}],
+        )
+
+    def test_discounts(self):
+        discounts = get_discounts(self.products)
+        self.assertAlmostEqual(discounts['avg_discount'], 31.25)
+        self.assertAlmostEqual(discounts['max_discount'], 50)
+        self.assertEqual(discounts['discounted_share'], 0.75)
+        self.assertEqual(
+            [(item['rating'], item['count']) for item in discounts['by_rating']],
+            [(1.0, 1), (4.0, 2), (5.0, 1)],
+        )
+
+    def test_rating_reviews_matrix(self):
+        matrix = get_rating_reviews_matrix(self.products)
+        self.assertEqual(len(matrix['rating_buckets']), 5)
+        self.assertEqual(matrix['reviews_buckets'][1], {'min': 1, 'max': 9})
+        self.assertEqual(matrix['reviews_buckets'][-1], {'min': 10000, 'max': None})
+        self.assertEqual(
+            matrix['counts'],
+            [
+                [0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 1, 0],
+                [0, 0, 0, 0, 0, 0],
+                [0, 0, 0, 0, 0, 0],
+                [1, 1, 1, 0, 0, 0],
+            ],
+        )
+
+
+class AnalyticsAPIViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        ProductFactory(price=100, discounted_price=50, rating=4.5)
+        ProductFactory(price=1000, discounted_price=900, rating=3.0)
+
+    def test_analytics(self):
+        response = self.client.get(reverse('analytics'), {'bins': 4})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['summary']['count'], 2)
+        self.assertEqual(len(response.data['price_histogram']), 4)
+        self.assertEqual(len(response.data['rating_histogram']), 4)
+        self.assertEqual(len(response.data['price_percentiles']), 5)
+        self.assertIn('by_rating', response.data['discounts'])
+        self.assertIn('counts', response.data['rating_reviews'])
+
+    def test_analytics_uses_product_filters(self):
+        response = self.client.get(reverse('analytics-summary'), {'min_price': 500})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+
+        response = self.client.get(
+            reverse('analytics-price-histogram'),
+            {'min_rating': 4, 'field': 'price', 'bins': 2},
+        )
+        self.assertEqual(response.data, [{'min': 100, 'max': 100, 'count': 1}])
+
+    def test_analytics_endpoints(self):
+        for name in (
+            'analytics-summary',
+            'analytics-price-histogram',
+            'analytics-rating-histogram',
+            'analytics-price-percentiles',
+            'analytics-discounts',
+            'analytics-rating-reviews',
+        ):
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_price_percentiles(self):
+        response = self.client.get(
+            reverse('analytics-price-percentiles'),
+            {'percentiles': '0.5', 'field': 'price'},
+        )
+        self.assertEqual(response.data, [{'percentile': 0.5, 'value': 550.0}])
+
+    def test_analytics_invalid_params(self):
+        for params in (
+            {'bins': 0},
+            {'bins': 1000},
+            {'field': 'rating'},
+            {'percentiles': '0.5,2'},
+            {'percentiles': 'median'},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('analytics'), params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class QuerySummaryAPIViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        ProductFactory.create_batch(2, search_query='phones')
+        ProductFactory(search_query='laptops')
+        ProductFactory(search_query=None)
+        call_command('refresh_query_summaries', stdout=StringIO())
+
+    def test_list_query_summaries(self):
+        response = self.client.get(reverse('analytics-query-summaries'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(item['query'], item['product_count']) for item in response.data],
+            [('laptops', 1), ('phones', 2)],
+        )
+
+    def test_retrieve_query_summary(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('analytics-query-summary', args=['phones'])
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Count only the summary queries: a database cache adds its own.
+        sql = [query['sql'] for query in queries]
+        self.assertEqual(sum('products_querysummary' in text for text in sql), 1)
+        self.assertEqual(response.data['product_count'], 2)
+        self.assertEqual(sum(response.data['rating_distribution']), 2)
+
+        response = self.client.get(reverse('analytics-query-summary', args=['tv']))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_refresh_command_invalidates_cached_responses(self):
+        url = reverse('analytics-query-summaries')
+        etag = self.client.get(url)['ETag']
+
+        Product.objects.filter(search_query='laptops').update(search_query='tv')
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('refresh_query_summaries', stdout=StringIO())
+
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['query'] for item in response.data], ['phones', 'tv'])
+
+    def test_refresh_command_drops_stale_summaries(self):
+        Product.objects.filter(search_query='laptops').delete()
+        call_command('refresh_query_summaries', stdout=StringIO())
+        self.assertEqual(
+            list(QuerySummary.objects.values_list('query', flat=True)), ['phones']
+        )
@@ -0,0 +1,117 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from apps.products.models import Product
+from apps.products.tests.factories import ProductFactory
+
+
+class AsyncViewsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for i in range(5):
+            ProductFactory(price=1000 * (i + 1), rating=4, reviews_count=10 * i)
+
+    async def assertSameResponse(self, sync_url, async_url, params=None):
+        expected = await self.async_client.get(sync_url, params)
+        response = await self.async_client.get(async_url, params)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(
+            response.json(),
+            # Only the links differ, as they point to the view itself.
+            {
+                key: value.replace('/products/', '/async/products/')
+                if isinstance(value, str)
+                else value
+                for key, value in expected.json().items()
+            },
+        )
+        return response
+
+    async def test_list_matches_sync_view(self):
+        for params in (
+            {'page_size': 2, 'page': 2, 'ordering': '-price'},
+            {'pagination': 'offset', 'limit': 2, 'offset': 1},
+            {'pagination': 'cursor', 'page_size': 2, 'min_price': 2000},
+            {'fields': 'id,price', 'pagination': 'cursor', 'page_size': 2},
+        ):
+            with self.subTest(params=params):
+                await self.assertSameResponse(
+                    reverse('product-list-create'),
+                    reverse('async-product-list'),
+                    params,
+                )
+
+    async def test_list_cursor_pages(self):
+        url = reverse('async-product-list')
+        response = await self.async_client.get(
+            url, {'pagination': 'cursor', 'page_size': 2, 'ordering': 'price'}
+        )
+        first = response.json()
+        response = await self.async_client.get(first['next'])
+        second = response.json()
+        self.assertEqual(
+            [float(item['price']) for item in first['results'] + second['results']],
+            [1000, 2000, 3000, 4000],
+        )
+        self.assertIsNotNone(second['previous'])
+
+    async def test_list_invalid_page(self):
+        response = await self.async_client.get(
+            reverse('async-product-list'), {'page': 100}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIn('detail', response.json())
+
+    async def test_detail(self):
+        product = await Product.objects.afirst()
+        response = await self.assertSameResponse(
+            reverse('product-detail', args=[product.id]),
+            reverse('async-product-detail', args=[product.id]),
+        )
+        self.assertEqual(response.json()['id'], product.id)
+
+        response = await self.async_client.get(
+            reverse('async-product-detail', args=[999999])
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIn('detail', response.json())
+
+    async def test_analytics_summary(self):
+        response = await self.assertSameResponse(
+            reverse('analytics-summary'),
+            reverse('async-analytics-summary'),
+            {'min_price': 3000},
+        )
+        self.assertEqual(response.json()['count'], 3)
+
+    def test_responses_are_cached(self):
+        # The sync test client runs the async view too, as a WSGI server does.
+        url = reverse('async-product-list')
+        response = self.client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.client.get(url)
+        self.assertEqual(cached.content, response.content)
+        # A database cache runs queries of its own, but not on products.
+        table = connection.ops.quote_name(Product._meta.db_table)
+        self.assertFalse(any(table in query['sql'] for query in queries))
+
+        not_modified = self.client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_method_not_allowed(self):
+        response = await self.async_client.post(reverse('async-product-list'))
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    @override_settings(REQUEST_TIMING=True)
+    async def test_request_timing(self):
+        response = await self.async_client.get(reverse('async-product-list'))
+        metrics = {
+            metric.split(';', 1)[0] for metric in response['Server-Timing'].split(', ')
+        }
+        self.assertEqual(metrics, {'db', 'serialize', 'render', 'total'})
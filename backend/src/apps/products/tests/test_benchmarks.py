@@ -0,0 +1,61 @@
+from django.test import TestCase
+
+from apps.products.benchmarks import seed_products
+from apps.products.benchmarks.api import LatencyResult, benchmark_api
+from apps.products.benchmarks.ingestion import benchmark_ingestion, generate_pages
+from apps.products.models import Product
+from apps.products.services import ORDERING_FIELDS
+
+
+class SeedProductsTests(TestCase):
+    def test_is_reproducible(self):
+        seed_products(5)
+        first = list(Product.objects.order_by('wb_id').values_list('name', 'price'))
+        Product.objects.all().delete()
+        seed_products(3)
+        seed_products(2, start=3)
+        again = list(Product.objects.order_by('wb_id').values_list('name', 'price'))
+
+        self.assertEqual(first[:3], again[:3])
+        self.assertEqual(
+            list(Product.objects.order_by('wb_id').values_list('wb_id', flat=True)),
+            [1, 2, 3, 4, 5],
+        )
+
+
+class BenchmarkApiTests(TestCase):
+    def test_covers_filters_orderings_and_detail(self):
+        seed_products(20)
+        results = benchmark_api(requests=2, warmup=1)
+
+        names = [result.name for result in results]
+        self.assertIn('products_list[search]', names)
+        for ordering in ORDERING_FIELDS:
+            self.assertIn(f'products_list[ordering={ordering}]', names)
+        self.assertEqual(names[-1], 'products_detail')
+        self.assertTrue(all(len(result.latencies) == 2 for result in results))
+
+    def test_latency_result(self):
+        result = LatencyResult('x', [0.001 * i for i in range(1, 101)]).as_dict()
+        self.assertEqual(result['requests'], 100)
+        self.assertAlmostEqual(result['p50_ms'], 50.5)
+        self.assertAlmostEqual(result['p99_ms'], 99.01)
+        self.assertEqual(result['max_ms'], 100)
+
+
+class BenchmarkIngestionTests(TestCase):
+    def test_parses_saves_and_cleans_up(self):
+        results = benchmark_ingestion(generate_pages(30, per_page=10), chunk_size=20)
+
+        self.assertEqual(
+            [result.name for result in results],
+            [
+                'parse',
+                'parse+save_batch[create]',
+                'parse+save_batch[update]',
+                'parse+copy[create]',
+                'parse+copy[update]',
+            ],
+        )
+        self.assertTrue(all(result.rows == 30 for result in results))
+        self.assertFalse(Product.objects.exists())
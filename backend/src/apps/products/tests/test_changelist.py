@@ -0,0 +1,104 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.products.changelist import (
+    EstimatedCountPaginator,
+    estimate_table_rows,
+    get_range_edges,
+)
+from apps.products.models import Product
+from apps.products.tests.factories import ProductFactory
+
+
+class RangeEdgesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for price in (100, 200, 300, 400, 500):
+            ProductFactory(price=price, discounted_price=price)
+
+    def test_even_steps_without_statistics(self):
+        self.assertEqual(get_range_edges(Product, 'price', 4), [200, 300, 400])
+
+    def test_quantiles_from_statistics(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Product._meta.db_table}')
+        self.assertEqual(get_range_edges(Product, 'price', 5), [200, 300, 400, 500])
+
+    def test_cached(self):
+        get_range_edges(Product, 'price', 4)
+        with CaptureQueriesContext(connection) as queries:
+            get_range_edges(Product, 'price', 4)
+        # A database cache runs queries of its own, but not these.
+        table = connection.ops.quote_name(Product._meta.db_table)
+        for query in queries:
+            self.assertNotIn('pg_stats', query['sql'])
+            self.assertNotIn(table, query['sql'])
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        ProductFactory.create_batch(3, rating=4.5)
+        ProductFactory(rating=2)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Product._meta.db_table}')
+
+    def test_exact_below_threshold(self):
+        self.assertEqual(estimate_table_rows(Product), 4)
+        paginator = EstimatedCountPaginator(Product.objects.order_by('id'), 2)
+        self.assertEqual(paginator.count, 4)
+
+    def test_estimate_above_threshold(self):
+        products = Product.objects.order_by('id')
+        with mock.patch.object(EstimatedCountPaginator, 'threshold', 1):
+            paginator = EstimatedCountPaginator(products, 2)
+            with mock.patch(
+                'apps.products.changelist.estimate_table_rows', return_value=1000
+            ):
+                self.assertEqual(paginator.count, 1000)
+
+            filtered = EstimatedCountPaginator(products.filter(rating__gte=4), 2)
+            self.assertEqual(filtered.count, 3)
+
+    def test_filtered_count_falls_back_to_the_plan(self):
+        products = Product.objects.filter(rating__gte=4).order_by('id')
+        with (
+            mock.patch.object(EstimatedCountPaginator, 'threshold', 1),
+            mock.patch(
+                'django.db.models.QuerySet.count',
+                side_effect=OperationalError('canceling statement due to timeout'),
+            ),
+        ):
+            count = EstimatedCountPaginator(products, 2).count
+        self.assertGreater(count, 0)
+
+
+class ProductChangelistTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = get_user_model().objects.create_superuser('admin', 'a@a.com', 'pass')
+        self.client.force_login(user)
+        self.url = reverse('admin:products_product_changelist')
+        ProductFactory(rating=4.9, price=150, reviews_count=10)
+        ProductFactory(rating=3.5, price=900, reviews_count=500)
+
+    def test_range_filters(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, '4.8 and more')
+        self.assertContains(response, '?rating=4.8-')
+
+        response = self.client.get(self.url, {'rating': '4.8-', 'price': '100-200'})
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+        response = self.client.get(self.url, {'reviews_count': '-100'})
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_invalid_range(self):
+        response = self.client.get(self.url, {'price': 'abc'})
+        # The admin drops invalid lookups and redirects with ?e=1.
+        self.assertEqual(response.status_code, 302)
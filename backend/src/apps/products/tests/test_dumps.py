@@ -0,0 +1,130 @@
+import gzip
+import json
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from apps.products.dumps import copy_products, iter_dump_files, load_wb_dump
+from apps.products.models import Product, ProductSnapshot, QuerySummary
+from apps.products.tests.factories import ProductFactory
+
+
+def wb_item(wb_id, name='Product', basic=100000, total=80000):
+    return {
+        'id': wb_id,
+        'name': name,
+        'reviewRating': 4.5,
+        'feedbacks': 10,
+        'sizes': [{'price': {'basic': basic, 'total': total}}],
+    }
+
+
+def wb_page(*items):
+    return {'data': {'products': list(items)}}
+
+
+class LoadWbDumpTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.root = Path(self.directory.name)
+
+    def write(self, name, content, compress=False):
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        opener = gzip.open if compress else open
+        with opener(path, 'wt', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def test_reads_json_ndjson_and_gzip_trees(self):
+        self.write('a/page_1.json', json.dumps(wb_page(wb_item(1), wb_item(2))))
+        self.write(
+            'b/pages.ndjson.gz',
+            '\n'.join(json.dumps(wb_page(wb_item(i))) for i in (3, 4)) + '\n',
+            compress=True,
+        )
+        self.write('b/items.jsonl', json.dumps([wb_item(5), {'name': 'no id'}]))
+        self.write('notes.txt', 'not a dump')
+
+        self.assertEqual(len(list(iter_dump_files([self.root]))), 3)
+        progress = list(load_wb_dump([self.root], batch_size=2))[-1]
+
+        self.assertEqual(progress.pages_done, 4)
+        self.assertEqual(progress.parsed, 5)
+        self.assertEqual(progress.skipped, 1)
+        self.assertEqual(progress.created, 5)
+        product = Product.objects.get(wb_id=1)
+        self.assertEqual(product.price, Decimal('1000.00'))
+        self.assertEqual(product.discounted_price, Decimal('800.00'))
+        self.assertEqual(ProductSnapshot.objects.count(), 5)
+
+    def test_broken_files_are_reported(self):
+        self.write('good.json', json.dumps(wb_page(wb_item(1))))
+        self.write('broken.json', '{"data":')
+        progress = list(load_wb_dump([self.root]))[-1]
+        self.assertEqual(progress.created, 1)
+        self.assertEqual(progress.pages_failed, 1)
+        self.assertIn('broken.json', progress.errors[0])
+
+    def test_command(self):
+        self.write('page.json', json.dumps(wb_page(wb_item(1), wb_item(2))))
+        out = StringIO()
+        call_command('load_wb_dump', str(self.root), '--query=phones', stdout=out)
+        self.assertIn('Total products created: 2', out.getvalue())
+        self.assertEqual(QuerySummary.objects.get(query='phones').product_count, 2)
+
+    def test_command_reports_why_nothing_was_loaded(self):
+        self.write('broken.ndjson', '{"data":\n')
+        self.write('empty.json', json.dumps(wb_page({'name': 'No id'})))
+        with self.assertRaises(CommandError) as cm:
+            call_command('load_wb_dump', str(self.root), stdout=StringIO())
+        message = str(cm.exception)
+        self.assertIn('1 pages read, 1 failed, 1 items skipped', message)
+        self.assertIn('broken.ndjson', message)
+
+
+class CopyProductsTests(TestCase):
+    def test_upserts_by_wb_id(self):
+        existing = ProductFactory(wb_id=1, name='Old', search_query='old query')
+        created, updated = copy_products(
+            [
+                {**self.parsed(1), 'name': 'Stale'},
+                self.parsed(2),
+                {**self.parsed(1), 'name': 'New'},
+            ]
+        )
+
+        self.assertEqual((created, updated), (1, 1))
+        existing.refresh_from_db()
+        self.assertEqual(existing.name, 'New')
+        # Without a query, the stored one is kept.
+        self.assertEqual(existing.search_query, 'old query')
+        self.assertIsNone(Product.objects.get(wb_id=2).search_query)
+        self.assertEqual(existing.snapshots.count(), 1)
+
+    def test_moves_products_to_the_query(self):
+        ProductFactory(wb_id=1, search_query='old query')
+        ProductFactory(wb_id=2, search_query='old query')
+        copy_products([self.parsed(1)], search_query='new query')
+
+        self.assertEqual(Product.objects.get(wb_id=1).search_query, 'new query')
+        self.assertEqual(QuerySummary.objects.get(query='new query').product_count, 1)
+        self.assertEqual(QuerySummary.objects.get(query='old query').product_count, 1)
+
+    def test_empty(self):
+        self.assertEqual(copy_products([]), (0, 0))
+
+    def parsed(self, wb_id):
+        return {
+            'wb_id': wb_id,
+            'name': f'Product {wb_id}',
+            'price': 1000.5,
+            'discounted_price': 900,
+            'rating': 4.5,
+            'reviews_count': 10,
+        }
@@ -0,0 +1,195 @@
+import csv
+import json
+import os
+import tempfile
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.products.exports import (
+    PARQUET_AVAILABLE,
+    export_products,
+    export_snapshots,
+)
+from apps.products.models import Product, ProductSnapshot
+from apps.products.serializers import ProductSerializer
+from apps.products.tests.factories import ProductFactory
+
+if PARQUET_AVAILABLE:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+
+class ExportProductsTests(TestCase):
+    def setUp(self):
+        ProductFactory(name='Phone, "black"', price=500.5, rating=4.5)
+        ProductFactory(name='Laptop', price=1500, rating=3.0)
+        ProductFactory(name='Kettle', price=3000, rating=4.9)
+        self.products = Product.objects.order_by('price')
+
+    def test_csv(self):
+        content = ''.join(export_products(self.products, 'csv', chunk_size=2))
+        rows = list(csv.DictReader(StringIO(content)))
+        expected = ProductSerializer(self.products, many=True).data
+        self.assertEqual(list(rows[0]), list(expected[0]))
+        self.assertEqual(rows[0]['name'], 'Phone, "black"')
+        self.assertEqual(rows[0]['price'], '500.50')
+        self.assertEqual(rows[0]['wb_id'], '')
+        self.assertEqual([row['id'] for row in rows], [str(p['id']) for p in expected])
+
+    def test_ndjson_matches_api_representation(self):
+        content = ''.join(export_products(self.products, 'ndjson', chunk_size=2))
+        rows = [json.loads(line) for line in content.splitlines()]
+        expected = json.loads(
+            json.dumps(ProductSerializer(self.products, many=True).data)
+        )
+        self.assertEqual(rows, expected)
+
+    def test_empty_export(self):
+        content = ''.join(export_products(Product.objects.none(), 'csv'))
+        self.assertEqual(content.count('\n'), 1)
+        self.assertEqual(''.join(export_products(Product.objects.none(), 'ndjson')), '')
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            export_products(self.products, 'xml')
+
+    def test_command_to_stdout(self):
+        out = StringIO()
+        call_command(
+            'export_products', '--min-price=1000', '--ordering=-price', stdout=out
+        )
+        rows = list(csv.DictReader(StringIO(out.getvalue())))
+        self.assertEqual([row['name'] for row in rows], ['Kettle', 'Laptop'])
+
+    def test_command_to_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'products.ndjson')
+            call_command(
+                'export_products', '--format', 'ndjson', '-o', path, stderr=StringIO()
+            )
+            with open(path, encoding='utf-8') as file:
+                self.assertEqual(len(file.readlines()), 3)
+
+
+class ProductsExportAPIViewTests(APITestCase):
+    def setUp(self):
+        ProductFactory(name='Phone holder', price=500)
+        ProductFactory(name='Laptop stand', price=1500)
+        self.url = reverse('product-export')
+
+    def _content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_csv(self):
+        response = self.client.get(self.url, {'min_price': 1000})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(
+            response['Content-Disposition'], 'attachment; filename="products.csv"'
+        )
+        rows = list(csv.DictReader(StringIO(self._content(response))))
+        self.assertEqual([row['name'] for row in rows], ['Laptop stand'])
+
+    def test_export_ndjson_with_search(self):
+        response = self.client.get(
+            self.url, {'file_format': 'ndjson', 'search': 'phone'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual([row['name'] for row in rows], ['Phone holder'])
+
+    def test_export_ignores_accept_header(self):
+        response = self.client.get(self.url, HTTP_ACCEPT='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_export_unknown_format(self):
+        response = self.client.get(self.url, {'file_format': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('file_format', response.data)
+
+
+@skipUnless(PARQUET_AVAILABLE, 'pyarrow is not installed')
+class ParquetExportTests(TestCase):
+    def setUp(self):
+        self.phone = ProductFactory(name='Phone', price=500.5, discounted_price=450)
+        self.laptop = ProductFactory(name='Laptop', price=1500, discounted_price=1500)
+        self.kettle = ProductFactory(name='Kettle', price=3000, discounted_price=2000)
+        for product in (self.phone, self.laptop):
+            ProductSnapshot.objects.bulk_create(
+                [ProductSnapshot.from_product(product) for _ in range(2)]
+            )
+        self.products = Product.objects.order_by('price')
+
+    def _read(self, pieces):
+        return pq.ParquetFile(BytesIO(b''.join(pieces)))
+
+    def test_products_keep_types(self):
+        file = self._read(export_products(self.products, 'parquet', chunk_size=2))
+        self.assertEqual(file.metadata.num_row_groups, 2)
+        schema = file.schema_arrow
+        self.assertEqual(schema.field('price').type, pa.decimal128(12, 2))
+        self.assertEqual(schema.field('created_at').type, pa.timestamp('us', 'UTC'))
+        self.assertTrue(schema.field('wb_id').nullable)
+        self.assertFalse(schema.field('name').nullable)
+
+        rows = file.read().to_pylist()
+        self.assertEqual([row['name'] for row in rows], ['Phone', 'Laptop', 'Kettle'])
+        self.assertEqual(rows[0]['price'], Decimal('500.50'))
+        self.assertEqual(rows[0]['created_at'], self.phone.created_at)
+
+    def test_empty_export(self):
+        file = self._read(export_products(Product.objects.none(), 'parquet'))
+        self.assertEqual(file.metadata.num_rows, 0)
+
+    def test_snapshots_of_filtered_products(self):
+        products = self.products.filter(price__lt=1000)
+        table = self._read(export_snapshots(products)).read()
+        self.assertEqual(table.schema.field('product_id').type, pa.int64())
+        self.assertEqual(table.column('product_id').to_pylist(), [self.phone.id] * 2)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'products.parquet')
+            snapshots = os.path.join(directory, 'snapshots.parquet')
+            call_command(
+                'export_products',
+                '--format=parquet',
+                f'--output={output}',
+                f'--snapshots={snapshots}',
+                '--max-price=2000',
+                stderr=StringIO(),
+            )
+            self.assertEqual(pq.read_metadata(output).num_rows, 2)
+            self.assertEqual(pq.read_metadata(snapshots).num_rows, 4)
+
+    def test_views(self):
+        response = self.client.get(
+            reverse('product-export'), {'file_format': 'parquet', 'min_price': 1000}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/vnd.apache.parquet')
+        self.assertEqual(self._read(response.streaming_content).metadata.num_rows, 2)
+
+        response = self.client.get(
+            reverse('product-snapshot-export'), {'max_price': 1000}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._read(response.streaming_content).metadata.num_rows, 2)
+
+    @patch('apps.products.views.PARQUET_AVAILABLE', False)
+    def test_views_without_pyarrow(self):
+        response = self.client.get(
+            reverse('product-export'), {'file_format': 'parquet'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+        response = self.client.get(reverse('product-snapshot-export'))
+        self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
@@ -0,0 +1,195 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.products.models import ParseJob, Product
+from apps.products.services import (
+    PageResult,
+    WildberriesParser,
+    claim_next_parse_job,
+    run_parse_job,
+)
+
+
+def wb_item(wb_id):
+    return {
+        'id': wb_id,
+        'name': f'Product {wb_id}',
+        'sizes': [{'price': {'basic': 10000, 'total': 8000}}],
+        'reviewRating': 4.5,
+        'feedbacks': 10,
+    }
+
+
+def fake_pages(pages):
+    def fetch_pages(query, count, **kwargs):
+        for page, products in enumerate(pages[:count], start=1):
+            if isinstance(products, Exception):
+                yield PageResult(page, [], products)
+            else:
+                yield PageResult(page, products)
+
+    return fetch_pages
+
+
+class ParseJobServiceTests(TestCase):
+    def test_claim_next_parse_job_takes_oldest_pending(self):
+        ParseJob.objects.create(query='done', status=ParseJob.Status.SUCCEEDED)
+        first = ParseJob.objects.create(query='first')
+        ParseJob.objects.create(query='second')
+
+        job = claim_next_parse_job()
+
+        self.assertEqual(job, first)
+        self.assertEqual(job.status, ParseJob.Status.RUNNING)
+        self.assertIsNotNone(job.started_at)
+        self.assertEqual(claim_next_parse_job().query, 'second')
+        self.assertIsNone(claim_next_parse_job())
+
+    def test_claim_next_parse_job_takes_back_lost_jobs(self):
+        stale = timezone.now() - timedelta(hours=1)
+        lost = ParseJob.objects.create(
+            query='lost', status=ParseJob.Status.RUNNING, attempts=1
+        )
+        alive = ParseJob.objects.create(
+            query='alive', status=ParseJob.Status.RUNNING, attempts=1
+        )
+        crashing = ParseJob.objects.create(
+            query='crashing', status=ParseJob.Status.RUNNING, attempts=3
+        )
+        ParseJob.objects.filter(pk__in=[lost.pk, crashing.pk]).update(
+            started_at=stale, heartbeat_at=stale
+        )
+        ParseJob.objects.filter(pk=alive.pk).update(
+            started_at=stale, heartbeat_at=timezone.now()
+        )
+
+        job = claim_next_parse_job(lease_timeout=60, max_attempts=3)
+
+        self.assertEqual(job, lost)
+        self.assertEqual(job.status, ParseJob.Status.RUNNING)
+        self.assertEqual(job.attempts, 2)
+        self.assertGreater(job.heartbeat_at, stale)
+        alive.refresh_from_db()
+        self.assertEqual(alive.status, ParseJob.Status.RUNNING)
+        crashing.refresh_from_db()
+        self.assertEqual(crashing.status, ParseJob.Status.FAILED)
+        self.assertIn('stopped', crashing.error)
+        self.assertIsNotNone(crashing.finished_at)
+        self.assertIsNone(claim_next_parse_job(lease_timeout=60, max_attempts=3))
+
+    def test_run_parse_job_saves_products_and_progress(self):
+        job = ParseJob.objects.create(query='test', pages=3)
+        parser = WildberriesParser()
+        pages = [[wb_item(1), wb_item(2)], [wb_item(3)], []]
+
+        with patch.object(parser, 'fetch_pages', side_effect=fake_pages(pages)):
+            run_parse_job(job, parser)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ParseJob.Status.SUCCEEDED)
+        self.assertEqual(job.pages_done, 3)
+        self.assertEqual(job.products_created, 3)
+        self.assertEqual(job.progress, 100)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(Product.objects.filter(wb_id__in=[1, 2, 3]).count(), 3)
+
+    def test_run_parse_job_respects_limit(self):
+        job = ParseJob.objects.create(query='test', pages=2, limit=3)
+        parser = WildberriesParser()
+        pages = [[wb_item(1), wb_item(2)], [wb_item(3), wb_item(4)]]
+
+        with patch.object(parser, 'fetch_pages', side_effect=fake_pages(pages)):
+            run_parse_job(job, parser)
+
+        self.assertEqual(job.products_parsed, 3)
+        self.assertFalse(Product.objects.filter(wb_id=4).exists())
+
+    def test_run_parse_job_records_page_errors(self):
+        job = ParseJob.objects.create(query='test', pages=2)
+        parser = WildberriesParser()
+        pages = [ValueError('boom'), [wb_item(1)]]
+
+        with patch.object(parser, 'fetch_pages', side_effect=fake_pages(pages)):
+            run_parse_job(job, parser)
+
+        self.assertEqual(job.status, ParseJob.Status.SUCCEEDED)
+        self.assertIn('Failed to fetch page 1: boom', job.error)
+        self.assertEqual(job.products_created, 1)
+
+    def test_run_parse_job_marks_failures(self):
+        job = ParseJob.objects.create(query='test')
+        parser = WildberriesParser()
+
+        with patch.object(parser, 'save_batch', side_effect=RuntimeError('db down')):
+            with patch.object(
+                parser, 'fetch_pages', side_effect=fake_pages([[wb_item(1)]])
+            ):
+                run_parse_job(job, parser)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ParseJob.Status.FAILED)
+        self.assertIn('RuntimeError: db down', job.error)
+
+    @patch('apps.products.services.WildberriesParser.fetch_pages')
+    def test_run_parse_jobs_command_once(self, fetch_pages):
+        fetch_pages.side_effect = fake_pages([[wb_item(1)]])
+        job = ParseJob.objects.create(query='test')
+
+        out = StringIO()
+        call_command('run_parse_jobs', '--once', stdout=out)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ParseJob.Status.SUCCEEDED)
+        self.assertIn(f'Job #{job.id} succeeded', out.getvalue())
+
+    @patch('apps.products.services.WildberriesParser.close')
+    @patch('apps.products.services.WildberriesParser.save_batch')
+    @patch('apps.products.services.WildberriesParser.fetch_pages')
+    def test_parse_wb_products_command_closes_parser_on_error(
+        self, fetch_pages, save_batch, close
+    ):
+        fetch_pages.side_effect = fake_pages([[wb_item(1)]])
+        save_batch.side_effect = RuntimeError('db down')
+
+        with self.assertRaisesMessage(RuntimeError, 'db down'):
+            call_command('parse_wb_products', '--query=test', stdout=StringIO())
+        close.assert_called_once_with()
+
+
+class ParseWBAdminTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_superuser('admin', 'a@a.com', 'pass')
+        self.client.force_login(user)
+
+    def test_parse_wb_view_queues_job(self):
+        with patch('apps.products.services.WildberriesParser.fetch') as fetch:
+            response = self.client.post(
+                reverse('admin:parse-wb-products'),
+                {'query': 'phone', 'pages': 2, 'limit': 50},
+            )
+            fetch.assert_not_called()
+
+        job = ParseJob.objects.get()
+        self.assertRedirects(response, reverse('admin:parse-wb-status', args=[job.id]))
+        self.assertEqual(job.status, ParseJob.Status.PENDING)
+        self.assertEqual((job.query, job.pages, job.limit), ('phone', 2, 50))
+
+    def test_parse_wb_status_view_polls_until_finished(self):
+        job = ParseJob.objects.create(query='phone', pages=4, pages_done=1)
+        url = reverse('admin:parse-wb-status', args=[job.id])
+
+        response = self.client.get(url)
+        self.assertContains(response, 'http-equiv="refresh"')
+        self.assertContains(response, '1 / 4 page(s)')
+
+        job.status = ParseJob.Status.SUCCEEDED
+        job.save()
+        response = self.client.get(url)
+        self.assertNotContains(response, 'http-equiv="refresh"')
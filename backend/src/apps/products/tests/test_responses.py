@@ -0,0 +1,134 @@
+import gzip
+import json
+from datetime import UTC, datetime
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from apps.products.benchmarks.responses import benchmark_responses
+from apps.products.tests.factories import ProductFactory
+from config.middleware import choose_encoding, parse_accept_encoding
+from config.renderers import ORJSON_AVAILABLE, ORJSONRenderer
+
+
+class ORJSONRendererTests(TestCase):
+    def test_same_output_as_json_renderer(self):
+        data = {
+            'name': 'Чехол   "case"',
+            'price': Decimal('10.50'),
+            'created_at': datetime(2024, 5, 1, 12, 30, 0, 1500, tzinfo=UTC),
+            'naive': datetime(2024, 5, 1),
+            'ratings': [4.5, 5, None, True],
+            1: 'int key',
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_list_response(self):
+        cache.clear()
+        ProductFactory.create_batch(3)
+        url = reverse('product-list-create')
+        data = self.client.get(url).data
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_big_integers_fall_back_to_json_renderer(self):
+        data = {'big': 2**70}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    @skipUnless(ORJSON_AVAILABLE, 'orjson is not installed')
+    def test_float_formatting(self):
+        # Same values as JSONRenderer's 1e+16 and 1e-07, written differently.
+        data = {'exponents': [1e16, 1e-7]}
+        rendered = ORJSONRenderer().render(data)
+        self.assertEqual(rendered, b'{"exponents":[1e16,1e-7]}')
+        self.assertEqual(json.loads(rendered), json.loads(JSONRenderer().render(data)))
+        self.assertEqual(ORJSONRenderer().render(float('nan')), b'null')
+
+    def test_indent_falls_back_to_json_renderer(self):
+        rendered = ORJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+
+    def test_without_orjson(self):
+        with mock.patch('config.renderers.ORJSON_AVAILABLE', False):
+            self.assertEqual(ORJSONRenderer().render({'a': 1}), b'{"a":1}')
+
+
+class AcceptEncodingTests(TestCase):
+    def test_parse(self):
+        self.assertEqual(
+            parse_accept_encoding('gzip;q=0.8, BR, deflate;q=bad'),
+            {'gzip': 0.8, 'br': 1.0, 'deflate': 0.0},
+        )
+
+    def test_choose(self):
+        encodings = ('br', 'gzip')
+        self.assertEqual(choose_encoding('gzip, br', encodings), 'br')
+        self.assertEqual(choose_encoding('gzip, br;q=0.5', encodings), 'gzip')
+        self.assertEqual(choose_encoding('*;q=0.1', encodings), 'br')
+        self.assertEqual(choose_encoding('gzip;q=0, identity', encodings), None)
+        self.assertEqual(choose_encoding('', encodings), None)
+
+
+@override_settings(RESPONSE_COMPRESSION=True, COMPRESSION_MIN_SIZE=500)
+class CompressionMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        ProductFactory.create_batch(10)
+        self.url = reverse('product-list-create')
+
+    def test_gzip(self):
+        plain = self.client.get(self.url)
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+        response = self.client.get(self.url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    def test_small_responses_are_not_compressed(self):
+        url = reverse('product-detail', args=[ProductFactory().id])
+        response = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response)
+        self.assertNotIn('Accept-Encoding', response.get('Vary', ''))
+
+    def test_html_is_not_compressed(self):
+        # Pages with CSRF tokens must not be compressed (BREACH).
+        response = self.client.get(
+            reverse('admin:login'), headers={'Accept-Encoding': 'gzip'}
+        )
+        self.assertGreater(len(response.content), 500)
+        self.assertIn(b'csrfmiddlewaretoken', response.content)
+        self.assertNotIn('Content-Encoding', response)
+
+    @override_settings(RESPONSE_COMPRESSION=False)
+    def test_disabled(self):
+        response = self.client.get(self.url, headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response)
+
+
+class BenchmarkResponsesTests(TestCase):
+    def test_renderers_and_codings(self):
+        cache.clear()
+        ProductFactory.create_batch(20)
+        results = {result.name: result for result in benchmark_responses(requests=2)}
+
+        self.assertIn('render[json+identity]', results)
+        self.assertIn('render[json+gzip]', results)
+        self.assertIn('request[gzip]', results)
+        if ORJSON_AVAILABLE:
+            self.assertEqual(
+                results['render[orjson+identity]'].size,
+                results['render[json+identity]'].size,
+            )
+        self.assertLess(
+            results['render[json+gzip]'].size, results['render[json+identity]'].size
+        )
+        self.assertLess(
+            results['request[gzip]'].size, results['request[identity]'].size
+        )
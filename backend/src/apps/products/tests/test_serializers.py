@@ -0,0 +1,50 @@
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from apps.products.benchmarks.serialization import benchmark_serialization
+from apps.products.models import Product
+from apps.products.serializers import ProductRowSerializer, ProductSerializer
+from apps.products.tests.factories import ProductFactory
+
+
+class ProductRowSerializerTests(TestCase):
+    def setUp(self):
+        ProductFactory(wb_id=None, price=0.5, rating=0.0, reviews_count=0)
+        ProductFactory(wb_id=2**40, price=9999999999.99, rating=4.75)
+        ProductFactory.create_batch(5)
+
+    def _render_both(self):
+        products = Product.objects.order_by('id')
+        rows = products.values_list(*ProductRowSerializer.fields(), named=True)
+        return (
+            JSONRenderer().render(ProductSerializer(products, many=True).data),
+            JSONRenderer().render(ProductRowSerializer(rows, many=True).data),
+        )
+
+    def test_output_is_byte_identical(self):
+        expected, actual = self._render_both()
+        self.assertEqual(actual, expected)
+
+    def test_output_is_byte_identical_in_other_timezones(self):
+        for tz in ('Europe/Moscow', 'America/New_York'):
+            with self.subTest(tz=tz), timezone.override(tz):
+                expected, actual = self._render_both()
+                self.assertEqual(actual, expected)
+
+    @override_settings(REST_FRAMEWORK={'COERCE_DECIMAL_TO_STRING': False})
+    def test_output_matches_with_custom_settings(self):
+        expected, actual = self._render_both()
+        self.assertEqual(actual, expected)
+
+    def test_fields_follow_product_serializer(self):
+        self.assertEqual(
+            ProductRowSerializer.fields(), tuple(ProductSerializer().fields)
+        )
+
+    def test_benchmark_checks_output(self):
+        results = benchmark_serialization(Product.objects.count(), repeat=1)
+        self.assertEqual(
+            [result.name for result in results],
+            ['ProductSerializer', 'ProductRowSerializer'],
+        )
@@ -1,13 +1,24 @@
+import json
+import threading
+import time
+from datetime import UTC, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch
 
+import requests
 from django.http import QueryDict
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
-from apps.products.models import Product
+from apps.products.models import Product, ProductSnapshot, QuerySummary
 from apps.products.services import (
+    RateLimiter,
     WildberriesParser,
+    chunked,
     get_product_by_id,
+    get_product_history,
     get_products_with_filters,
+    refresh_query_summaries,
+    run_parse_pipeline,
 )
 from apps.products.tests.factories import ProductFactory
 
@@ -66,13 +77,14 @@ class ProductServiceTests(TestCase):
         with self.assertRaises(Http404):
             get_product_by_id(999999)
 
-    @patch('apps.products.services.requests.get')
+    @patch('apps.products.services.requests.Session.get')
     def test_wildberries_parser_fetch_and_parse(self, mock_get):
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = {
             'data': {
                 'products': [
                     {
+                        'id': 123456,
                         'name': 'Test Product',
                         'sizes': [{'price': {'basic': 10000, 'total': 8000}}],
                         'reviewRating': 4.7,
@@ -84,8 +96,10 @@ class ProductServiceTests(TestCase):
         parser = WildberriesParser()
         products = parser.fetch('test')
         self.assertEqual(len(products), 1)
+        self.assertEqual(parser.stats.requests, 1)
 
         parsed: dict = parser.parse(products[0])
+        self.assertEqual(parsed['wb_id'], 123456)
         self.assertEqual(parsed['name'], 'Test Product')
         self.assertEqual(parsed['price'], 100.0)
         self.assertEqual(parsed['discounted_price'], 80.0)
@@ -104,3 +118,432 @@ class ProductServiceTests(TestCase):
         created = parser.save(product_data)
         self.assertTrue(created)
         self.assertTrue(Product.objects.filter(name='Saved Product').exists())
+
+    def test_wildberries_parser_save_updates_by_wb_id(self):
+        parser = WildberriesParser()
+        product_data = {
+            'wb_id': 42,
+            'name': 'Saved Product',
+            'price': 100,
+            'discounted_price': 90,
+            'rating': 4.5,
+            'reviews_count': 10,
+        }
+        self.assertTrue(parser.save(product_data))
+        self.assertFalse(parser.save({**product_data, 'price': 120}))
+
+        product = Product.objects.get(wb_id=42)
+        self.assertEqual(product.price, 120)
+        self.assertEqual(Product.objects.filter(name='Saved Product').count(), 1)
+        self.assertEqual(
+            list(product.snapshots.order_by('id').values_list('price', flat=True)),
+            [100, 120],
+        )
+
+    def test_wildberries_parser_save_batch(self):
+        parser = WildberriesParser()
+        ProductFactory(wb_id=1, price=100)
+
+        def product_data(wb_id, price):
+            return {
+                'wb_id': wb_id,
+                'name': f'Product {wb_id}',
+                'price': price,
+                'discounted_price': price,
+                'rating': 4.0,
+                'reviews_count': 1,
+            }
+
+        # savepoint, select, upsert, snapshots, release
+        with self.assertNumQueries(5):
+            created, updated = parser.save_batch(
+                [
+                    product_data(1, 150),
+                    product_data(2, 200),
+                    product_data(3, 300),
+                    product_data(3, 350),
+                    None,
+                ]
+            )
+
+        self.assertEqual((created, updated), (2, 1))
+        self.assertEqual(Product.objects.get(wb_id=1).price, 150)
+        self.assertEqual(Product.objects.get(wb_id=3).price, 350)
+        self.assertEqual(Product.objects.filter(wb_id__in=[1, 2, 3]).count(), 3)
+        self.assertEqual(
+            sorted(ProductSnapshot.objects.values_list('product__wb_id', 'price')),
+            [(1, 150), (2, 200), (3, 350)],
+        )
+
+    def test_wildberries_parser_save_batch_empty(self):
+        parser = WildberriesParser()
+        with self.assertNumQueries(0):
+            self.assertEqual(parser.save_batch([None, {'name': 'No id'}]), (0, 0))
+
+
+class ProductSearchTests(TestCase):
+    def setUp(self):
+        self.phones = ProductFactory(name='Wireless phones case', price=300)
+        self.holder = ProductFactory(name='Phone holder', price=900)
+        self.laptop = ProductFactory(name='Laptop stand', price=2000)
+        self.kettle = ProductFactory(name='Electric kettle', price=1500)
+        self.chair = ProductFactory(name='Стул кухонный', price=2500)
+        self.knife = ProductFactory(name='Нож поварской', price=700)
+        self.table = ProductFactory(name='Стол кухонный', price=5000)
+
+    def _search(self, query_string):
+        return list(get_products_with_filters(QueryDict(query_string)))
+
+    def test_search_matches_word_forms(self):
+        products = self._search('search=phone')
+        self.assertCountEqual(products, [self.phones, self.holder])
+
+    def test_search_matches_russian_word_forms(self):
+        # Too short for trigrams: the word similarity of 'стулья' to 'стул'
+        # and of 'ножей' to 'нож' is below the 0.6 threshold, only the
+        # Russian stemmer matches them.
+        self.assertEqual(self._search('search=стулья'), [self.chair])
+        self.assertEqual(self._search('search=ножей'), [self.knife])
+        self.assertCountEqual(self._search('search=кухонных'), [self.chair, self.table])
+
+    def test_search_tolerates_typos(self):
+        self.assertEqual(self._search('search=laptp'), [self.laptop])
+
+    def test_search_orders_by_relevance(self):
+        products = self._search('search=phone holder')
+        self.assertEqual(products[0], self.holder)
+
+    def test_search_with_filters_and_ordering(self):
+        self.assertEqual(self._search('search=phone&min_price=500'), [self.holder])
+        self.assertEqual(
+            self._search('search=phone&ordering=-price'), [self.holder, self.phones]
+        )
+
+    def test_blank_search_is_ignored(self):
+        self.assertEqual(len(self._search('search=+')), 7)
+
+
+class QuerySummaryTests(TestCase):
+    def setUp(self):
+        self.parser = WildberriesParser()
+
+    def product_data(self, wb_id, price, discounted_price, rating):
+        return {
+            'wb_id': wb_id,
+            'name': f'Product {wb_id}',
+            'price': price,
+            'discounted_price': discounted_price,
+            'rating': rating,
+            'reviews_count': 10,
+        }
+
+    def test_save_batch_refreshes_query_summary(self):
+        self.parser.save_batch(
+            [
+                self.product_data(1, 100, 50, 4.5),
+                self.product_data(2, 300, 300, 5.0),
+                self.product_data(3, 200, 150, 0.5),
+            ],
+            search_query='phones',
+        )
+
+        summary = QuerySummary.objects.get(query='phones')
+        self.assertEqual(summary.product_count, 3)
+        self.assertEqual((summary.price_min, summary.price_max), (100, 300))
+        self.assertEqual(summary.price_avg, 200)
+        self.assertEqual(summary.reviews_total, 30)
+        self.assertEqual(summary.rating_distribution, [1, 0, 0, 0, 2])
+        self.assertEqual(summary.discounted_count, 2)
+        self.assertAlmostEqual(summary.discount_avg, 25)
+        self.assertAlmostEqual(summary.discount_max, 50)
+
+        self.parser.save_batch(
+            [self.product_data(1, 500, 500, 4.5)], search_query='phones'
+        )
+        summary.refresh_from_db()
+        self.assertEqual(summary.price_max, 500)
+        self.assertEqual(summary.discounted_count, 1)
+
+    def test_products_moving_to_another_query(self):
+        self.parser.save_batch(
+            [self.product_data(1, 100, 50, 4.5), self.product_data(2, 100, 50, 4.5)],
+            search_query='phones',
+        )
+        self.parser.save_batch(
+            [self.product_data(2, 100, 50, 4.5)], search_query='smartphones'
+        )
+
+        self.assertEqual(QuerySummary.objects.get(query='phones').product_count, 1)
+        self.assertEqual(QuerySummary.objects.get(query='smartphones').product_count, 1)
+
+        self.parser.save_batch(
+            [self.product_data(1, 100, 50, 4.5)], search_query='smartphones'
+        )
+        self.assertFalse(QuerySummary.objects.filter(query='phones').exists())
+
+    def test_save_batch_without_query_keeps_stored_query(self):
+        self.parser.save_batch(
+            [self.product_data(1, 100, 50, 4.5)], search_query='phones'
+        )
+        self.parser.save_batch([self.product_data(1, 120, 50, 4.5)])
+        self.assertEqual(Product.objects.get(wb_id=1).search_query, 'phones')
+
+    def test_refresh_query_summaries(self):
+        ProductFactory.create_batch(3, search_query='tv')
+        ProductFactory(search_query='radio')
+        summaries = refresh_query_summaries(['tv', 'radio', 'missing'])
+        self.assertEqual(
+            [(summary.query, summary.product_count) for summary in summaries],
+            [('radio', 1), ('tv', 3)],
+        )
+
+
+# Buckets are truncated in TIME_ZONE; the expected ones are UTC days.
+@override_settings(TIME_ZONE='UTC')
+class ProductHistoryTests(TestCase):
+    def setUp(self):
+        self.product = ProductFactory()
+        for captured_at, price, rating in (
+            (datetime(2026, 1, 1, 8, tzinfo=UTC), 100, 4.0),
+            (datetime(2026, 1, 1, 20, tzinfo=UTC), 200, 5.0),
+            (datetime(2026, 1, 2, 8, tzinfo=UTC), 300, 4.5),
+            (datetime(2026, 2, 1, 8, tzinfo=UTC), 400, 4.5),
+        ):
+            ProductSnapshot.objects.create(
+                product=self.product,
+                captured_at=captured_at,
+                price=price,
+                discounted_price=price,
+                rating=rating,
+                reviews_count=int(price),
+            )
+        ProductSnapshot.from_product(ProductFactory()).save()
+
+    def test_history_by_day(self):
+        history = list(get_product_history(self.product, 'day'))
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history[0]['bucket'], datetime(2026, 1, 1, tzinfo=UTC))
+        self.assertEqual(history[0]['price_min'], 100)
+        self.assertEqual(history[0]['price_max'], 200)
+        self.assertEqual(history[0]['price_avg'], 150)
+        self.assertEqual(history[0]['rating_avg'], 4.5)
+        self.assertEqual(history[0]['reviews_count'], 200)
+        self.assertEqual(history[0]['samples'], 2)
+
+    def test_history_by_month_and_range(self):
+        history = get_product_history(self.product, 'month')
+        self.assertEqual([point['samples'] for point in history], [3, 1])
+
+        history = get_product_history(
+            self.product,
+            'day',
+            date_from=datetime(2026, 1, 1, 12, tzinfo=UTC),
+            date_to=datetime(2026, 1, 31, tzinfo=UTC),
+        )
+        self.assertEqual([point['price_avg'] for point in history], [200, 300])
+
+    def test_history_unknown_bucket(self):
+        with self.assertRaises(ValueError):
+            get_product_history(self.product, 'year')
+
+
+class WildberriesParserHTTPTests(TestCase):
+    """
+    Run the parser against a local HTTP server to exercise the real
+    session, connection pool and retry machinery.
+    """
+
+    def setUp(self):
+        self.responses = []
+        self.connections = set()
+        test = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                test.connections.add(self.client_address)
+                status_code, headers, body = test.responses.pop(0)
+                self.send_response(status_code)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.parser = WildberriesParser(backoff_factor=0)
+        self.parser.API_URL = f'http://127.0.0.1:{self.server.server_port}/search'
+        self.addCleanup(self.parser.close)
+
+    def _ok(self, products):
+        body = json.dumps({'data': {'products': products}}).encode()
+        return 200, {'Content-Type': 'application/json'}, body
+
+    def test_fetch_retries_throttled_and_failed_responses(self):
+        self.responses = [
+            (429, {'Retry-After': '0'}, b''),
+            (503, {}, b''),
+            self._ok([{'id': 1}]),
+        ]
+        products = self.parser.fetch('test')
+
+        self.assertEqual(products, [{'id': 1}])
+        self.assertEqual(self.parser.stats.requests, 1)
+        self.assertEqual(self.parser.stats.retries, 2)
+        self.assertEqual(self.parser.stats.errors, 0)
+        self.assertGreater(self.parser.stats.bytes_received, 0)
+
+    def test_fetch_gives_up_after_max_retries(self):
+        self.responses = [(500, {}, b'')] * 4
+        with self.assertRaises(requests.HTTPError):
+            self.parser.fetch('test')
+
+        self.assertEqual(self.parser.stats.errors, 1)
+        self.assertEqual(self.parser.stats.retries, 3)
+
+    def test_fetch_reuses_connections(self):
+        self.responses = [self._ok([{'id': page}]) for page in range(3)]
+        for page in range(3):
+            self.parser.fetch('test', page=page)
+
+        self.assertEqual(len(self.connections), 1)
+
+
+class WildberriesParserFetchPagesTests(TestCase):
+    def test_fetch_pages_keeps_page_order(self):
+        def fetch(query, page=1, limit=100):
+            # Later pages finish first.
+            time.sleep((5 - page) * 0.01)
+            return [{'id': page}]
+
+        parser = WildberriesParser()
+        with patch.object(parser, 'fetch', side_effect=fetch):
+            results = list(parser.fetch_pages('test', 4, concurrency=4))
+
+        self.assertEqual([result.page for result in results], [1, 2, 3, 4])
+        self.assertEqual(results[0].products, [{'id': 1}])
+
+    def test_fetch_pages_reports_errors_per_page(self):
+        def fetch(query, page=1, limit=100):
+            if page == 2:
+                raise ValueError('boom')
+            return [{'id': page}]
+
+        parser = WildberriesParser()
+        with patch.object(parser, 'fetch', side_effect=fetch):
+            results = list(parser.fetch_pages('test', 3, concurrency=2))
+
+        self.assertIsNone(results[0].error)
+        self.assertIsInstance(results[1].error, ValueError)
+        self.assertEqual(results[1].products, [])
+        self.assertEqual(results[2].products, [{'id': 3}])
+
+    def test_fetch_pages_bounds_requests_in_flight(self):
+        parser = WildberriesParser()
+        with patch.object(parser, 'fetch', return_value=[]) as fetch:
+            results = parser.fetch_pages('test', 50, concurrency=3)
+            self.assertEqual(next(results).products, [])
+            results.close()
+
+        # The first page plus at most `concurrency` pages requested ahead.
+        self.assertLessEqual(fetch.call_count, 4)
+
+    def test_rate_limiter_spaces_calls(self):
+        limiter = RateLimiter(rate=50)
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.wait()
+        self.assertGreaterEqual(time.monotonic() - start, 4 / 50)
+
+    def test_rate_limiter_disabled(self):
+        limiter = RateLimiter()
+        start = time.monotonic()
+        for _ in range(100):
+            limiter.wait()
+        self.assertLess(time.monotonic() - start, 0.05)
+
+
+class ParsePipelineTests(TestCase):
+    def setUp(self):
+        self.parser = WildberriesParser()
+        self.fetched = []
+
+        def fetch(query, page=1, limit=100):
+            self.fetched.append(page)
+            if page > 3:
+                return []
+            return [
+                {'id': page * 100 + i, 'name': f'Product {i}', 'feedbacks': i}
+                for i in range(limit)
+            ]
+
+        patcher = patch.object(self.parser, 'fetch', side_effect=fetch)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_chunked(self):
+        self.assertEqual(list(chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(chunked([], 2)), [])
+
+    def test_pipeline_writes_in_chunks_and_stops_at_empty_page(self):
+        with patch.object(
+            self.parser, 'save_batch', wraps=self.parser.save_batch
+        ) as save_batch:
+            progress = list(
+                run_parse_pipeline(self.parser, 'test', 10, per_page=4, chunk_size=5)
+            )[-1]
+
+        self.assertEqual(
+            [len(call.args[0]) for call in save_batch.call_args_list], [5, 5, 2]
+        )
+        self.assertEqual((progress.parsed, progress.created), (12, 12))
+        self.assertEqual(progress.pages_done, 4)
+        self.assertEqual(self.fetched, [1, 2, 3, 4])
+        self.assertEqual(Product.objects.filter(search_query='test').count(), 12)
+        self.assertEqual(QuerySummary.objects.get(query='test').product_count, 12)
+
+    def test_pipeline_max_products_stops_fetching(self):
+        progress = list(
+            run_parse_pipeline(
+                self.parser, 'test', 10, per_page=4, max_products=6, chunk_size=100
+            )
+        )[-1]
+
+        self.assertEqual(progress.created, 6)
+        # Page 3 may already be in flight, but nothing after it is requested.
+        self.assertLessEqual(max(self.fetched), 3)
+
+    def test_pipeline_skips_unparseable_items(self):
+        self.parser.fetch.side_effect = lambda query, page=1, limit=100: (
+            [{'id': 1}, {'name': 'no id'}, {'id': 2, 'feedbacks': 'bad'}]
+            if page == 1
+            else []
+        )
+        with self.assertLogs('apps.products.services', 'WARNING') as logs:
+            progress = list(run_parse_pipeline(self.parser, 'test', 2))[-1]
+
+        self.assertEqual((progress.parsed, progress.skipped), (1, 2))
+        self.assertIn('Could not parse Wildberries item 2', logs.output[0])
+
+    def test_pipeline_holds_at_most_one_chunk(self):
+        held = []
+
+        def save_batch(chunk, search_query=None):
+            held.append(len(self.fetched))
+            return len(chunk), 0
+
+        with patch.object(self.parser, 'save_batch', side_effect=save_batch):
+            list(run_parse_pipeline(self.parser, 'test', 10, per_page=4, chunk_size=4))
+
+        # Writing chunk N, at most one page beyond page N has been fetched.
+        self.assertEqual(len(held), 3)
+        for chunk_number, pages_fetched in enumerate(held, start=1):
+            self.assertLessEqual(pages_fetched, chunk_number + 1)
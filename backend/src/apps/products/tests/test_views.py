@@ -1,12 +1,23 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.http import QueryDict
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from apps.products.models import Product, ProductSnapshot
+from apps.products.pagination import MAX_PAGE_SIZE
+from apps.products.services import WildberriesParser, get_products_with_filters
 from apps.products.tests.factories import ProductFactory
 
 
 class ProductsListAPIViewTests(APITestCase):
     def setUp(self):
+        cache.clear()
         self.product1 = ProductFactory(price=500, rating=4.5, reviews_count=100)
         self.product2 = ProductFactory(price=1500, rating=3.0, reviews_count=10)
         self.product3 = ProductFactory(price=3000, rating=4.9, reviews_count=500)
@@ -16,10 +27,11 @@ class ProductsListAPIViewTests(APITestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        self.assertIsInstance(response.data, list)
-        self.assertGreaterEqual(len(response.data), 3)
+        self.assertIsInstance(response.data['results'], list)
+        self.assertEqual(response.data['count'], 3)
+        self.assertGreaterEqual(len(response.data['results']), 3)
 
-        for item in response.data:
+        for item in response.data['results']:
             self.assertIn('id', item)
             self.assertIn('name', item)
             self.assertIn('price', item)
@@ -32,40 +44,128 @@ class ProductsListAPIViewTests(APITestCase):
         response = self.client.get(self.url, {'min_price': 1000})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        for item in response.data:
+        for item in response.data['results']:
             self.assertGreaterEqual(float(item['price']), 1000)
 
     def test_list_products_with_max_price_filter(self):
         response = self.client.get(self.url, {'max_price': 1000})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        for item in response.data:
+        for item in response.data['results']:
             self.assertLessEqual(float(item['price']), 1000)
 
     def test_list_products_with_min_rating_filter(self):
         response = self.client.get(self.url, {'min_rating': 4.8})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        for item in response.data:
+        for item in response.data['results']:
             self.assertGreaterEqual(float(item['rating']), 4.8)
 
     def test_list_products_with_min_reviews_filter(self):
         response = self.client.get(self.url, {'min_reviews': 50})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        for item in response.data:
+        for item in response.data['results']:
             self.assertGreaterEqual(int(item['reviews_count']), 50)
 
     def test_list_products_with_ordering(self):
         response = self.client.get(self.url, {'ordering': '-price'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        prices = [float(item['price']) for item in response.data]
+        prices = [float(item['price']) for item in response.data['results']]
         self.assertEqual(prices, sorted(prices, reverse=True))
 
+    def test_list_products_with_search(self):
+        ProductFactory(name='Phone holder')
+        response = self.client.get(self.url, {'search': 'phone holder'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['name'], 'Phone holder')
+
+    def test_list_products_page_number_pagination(self):
+        response = self.client.get(self.url, {'page': 2, 'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
+
+    def test_list_products_page_size_is_capped(self):
+        ProductFactory.create_batch(MAX_PAGE_SIZE)
+        response = self.client.get(self.url, {'page_size': MAX_PAGE_SIZE * 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(len(response.data['results']), MAX_PAGE_SIZE)
+
+    def test_list_products_limit_offset_pagination(self):
+        response = self.client.get(
+            self.url,
+            {'pagination': 'offset', 'limit': 1, 'offset': 1, 'ordering': 'price'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(
+            [item['id'] for item in response.data['results']], [self.product2.id]
+        )
+
+    def test_list_products_cursor_pagination(self):
+        response = self.client.get(self.url, {'pagination': 'cursor', 'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertNotIn('count', response.data)
+        ids = [item['id'] for item in response.data['results']]
+        self.assertEqual(len(ids), 2)
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        ids += [item['id'] for item in response.data['results']]
+        self.assertIsNone(response.data['next'])
+        self.assertCountEqual(
+            ids, [self.product1.id, self.product2.id, self.product3.id]
+        )
+
+    def test_list_products_with_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                self.url, {'fields': 'rating, price,id', 'ordering': 'price'}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(
+            response.data['results'][0],
+            {'id': self.product1.id, 'price': '500.00', 'rating': 4.5},
+        )
+        select = queries.captured_queries[-1]['sql']
+        self.assertNotIn('"name"', select)
+        self.assertNotIn('"created_at"', select)
+
+    def test_list_products_with_fields_cursor_pagination(self):
+        params = {
+            'fields': 'id',
+            'pagination': 'cursor',
+            'page_size': 2,
+            'ordering': '-reviews_count',
+        }
+        response = self.client.get(self.url, params)
+        self.assertEqual(
+            response.data['results'],
+            [{'id': self.product3.id}, {'id': self.product1.id}],
+        )
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.data['results'], [{'id': self.product2.id}])
+
+    def test_list_products_with_unknown_fields(self):
+        response = self.client.get(self.url, {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('secret', response.data['fields'][0])
+
 
 class ProductsDetailAPIViewTests(APITestCase):
     def setUp(self):
+        cache.clear()
         self.product = ProductFactory()
 
     def test_retrieve_product_success(self):
@@ -87,3 +187,230 @@ class ProductsDetailAPIViewTests(APITestCase):
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+# Buckets are truncated in TIME_ZONE; the expected ones are UTC days.
+@override_settings(TIME_ZONE='UTC')
+class ProductHistoryAPIViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.product = ProductFactory()
+        ProductSnapshot.objects.bulk_create(
+            ProductSnapshot(
+                product=self.product,
+                captured_at=f'2026-01-0{day}T12:00:00Z',
+                price=100 * day,
+                discounted_price=90 * day,
+                rating=4.0,
+                reviews_count=day,
+            )
+            for day in (1, 1, 2)
+        )
+        self.url = reverse('product-history', args=[self.product.id])
+
+    def test_history(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['product_id'], self.product.id)
+        self.assertEqual(response.data['bucket'], 'day')
+        self.assertEqual(
+            [
+                (point['bucket'], point['price_avg'], point['samples'])
+                for point in response.data['results']
+            ],
+            [
+                ('2026-01-01T00:00:00Z', '100.00', 2),
+                ('2026-01-02T00:00:00Z', '200.00', 1),
+            ],
+        )
+
+    def test_history_with_params(self):
+        response = self.client.get(
+            self.url, {'bucket': 'month', 'date_from': '2026-01-02T00:00:00Z'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['samples'], 1)
+
+    def test_history_invalid_params(self):
+        for params in (
+            {'bucket': 'year'},
+            {'date_from': 'yesterday'},
+            {'date_from': '2026-02-01T00:00:00Z', 'date_to': '2026-01-01T00:00:00Z'},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_history_product_not_found(self):
+        response = self.client.get(reverse('product-history', args=[999999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ProductsCursorPaginationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        # Duplicate sort values make sure ties are broken on id.
+        ProductFactory.create_batch(4, price=1000, rating=4.0, reviews_count=10)
+        ProductFactory.create_batch(7)
+        self.url = reverse('product-list-create')
+
+    def _walk(self, params):
+        ids = []
+        response = self.client.get(
+            self.url, {'pagination': 'cursor', 'page_size': 3, **params}
+        )
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [item['id'] for item in response.data['results']]
+            if response.data['next'] is None:
+                return ids, response
+            response = self.client.get(response.data['next'])
+
+    def test_cursor_pagination_matches_every_ordering(self):
+        for ordering, order_by in (
+            ('price', ('price', 'id')),
+            ('-price', ('-price', '-id')),
+            ('rating', ('rating', 'id')),
+            ('-rating', ('-rating', '-id')),
+            ('reviews_count', ('reviews_count', 'id')),
+            ('-reviews_count', ('-reviews_count', '-id')),
+            ('name', ('name', 'id')),
+            ('-name', ('-name', '-id')),
+            ('', ('-created_at', '-id')),
+        ):
+            with self.subTest(ordering=ordering):
+                ids, _ = self._walk({'ordering': ordering})
+                expected = Product.objects.order_by(*order_by)
+                self.assertEqual(ids, list(expected.values_list('id', flat=True)))
+
+    def test_cursor_pagination_previous_links(self):
+        forward, response = self._walk({'ordering': 'price'})
+        last_page_size = len(response.data['results'])
+
+        backward = []
+        while response.data['previous'] is not None:
+            response = self.client.get(response.data['previous'])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            backward = [item['id'] for item in response.data['results']] + backward
+
+        self.assertEqual(backward, forward[: len(forward) - last_page_size])
+
+    def test_cursor_pagination_with_filters(self):
+        ids, _ = self._walk({'min_price': 1000, 'ordering': '-rating'})
+        self.assertEqual(
+            ids,
+            list(
+                get_products_with_filters(QueryDict('min_price=1000'))
+                .order_by('-rating', '-id')
+                .values_list('id', flat=True)
+            ),
+        )
+
+    def test_cursor_pagination_with_search(self):
+        ProductFactory.create_batch(3, name='Phone holder')
+        ProductFactory.create_batch(3, name='Wireless phones case')
+        ids, _ = self._walk({'search': 'phone'})
+        self.assertEqual(
+            ids,
+            list(
+                get_products_with_filters(QueryDict('search=phone'))
+                .order_by('-search_rank', '-id')
+                .values_list('id', flat=True)
+            ),
+        )
+        self.assertGreaterEqual(len(ids), 6)
+
+    def test_cursor_pagination_invalid_cursor(self):
+        response = self.client.get(
+            self.url, {'pagination': 'cursor', 'cursor': 'not-a-cursor'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_pagination_rejects_cursor_from_other_ordering(self):
+        response = self.client.get(
+            self.url, {'pagination': 'cursor', 'page_size': 3, 'ordering': 'price'}
+        )
+        next_url = response.data['next'].replace('ordering=price', 'ordering=-price')
+        response = self.client.get(next_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+# A database cache would add its own queries to the counts.
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+)
+class ProductsResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.product = ProductFactory(wb_id=1, price=1000)
+        self.url = reverse('product-list-create')
+
+    def test_repeated_request_is_served_from_cache(self):
+        response = self.client.get(f'{self.url}?ordering=price&page_size=10')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(f'{self.url}?page_size=10&ordering=price')
+        self.assertEqual(cached.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached.data, response.data)
+        self.assertEqual(cached['ETag'], response['ETag'])
+
+    def test_conditional_requests(self):
+        response = self.client.get(self.url)
+        self.assertIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='W/"other"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_if_modified_since_alone_is_not_trusted(self):
+        with mock.patch('apps.products.cache._new_version', return_value='1000.100000'):
+            last_modified = self.client.get(self.url)['Last-Modified']
+
+        # A write within the same second keeps the Last-Modified date.
+        with (
+            mock.patch('apps.products.cache._new_version', return_value='1000.900000'),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            ProductFactory()
+
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Last-Modified'], last_modified)
+        self.assertEqual(response.data['count'], 2)
+
+    def test_products_write_invalidates_cache(self):
+        url = reverse('product-detail', args=[self.product.id])
+        response = self.client.get(url)
+        self.assertEqual(float(response.data['price']), 1000)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            WildberriesParser().save_batch(
+                [
+                    {
+                        'wb_id': 1,
+                        'name': self.product.name,
+                        'price': 900,
+                        'discounted_price': 800,
+                        'rating': 4.5,
+                        'reviews_count': 10,
+                    }
+                ]
+            )
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(float(response.data['price']), 900)
+
+    def test_error_responses_are_not_cached(self):
+        url = reverse('product-detail', args=[999999])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductFactory(id=999999)
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
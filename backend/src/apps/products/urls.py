@@ -1,6 +1,26 @@
 from django.urls import path
 
-from apps.products.views import ProductsDetailAPIView, ProductsListAPIView
+from apps.products.async_views import (
+    AnalyticsSummaryAsyncView,
+    ProductsDetailAsyncView,
+    ProductsListAsyncView,
+)
+from apps.products.views import (
+    AnalyticsAPIView,
+    AnalyticsSummaryAPIView,
+    DiscountsAPIView,
+    PriceHistogramAPIView,
+    PricePercentilesAPIView,
+    ProductHistoryAPIView,
+    ProductsDetailAPIView,
+    ProductsExportAPIView,
+    ProductsListAPIView,
+    ProductSnapshotsExportAPIView,
+    QuerySummaryDetailAPIView,
+    QuerySummaryListAPIView,
+    RatingHistogramAPIView,
+    RatingReviewsMatrixAPIView,
+)
 
 urlpatterns = [
     path(
@@ -8,9 +28,84 @@ urlpatterns = [
         ProductsListAPIView.as_view(),
         name='product-list-create',
     ),
+    path(
+        'products/export/',
+        ProductsExportAPIView.as_view(),
+        name='product-export',
+    ),
+    path(
+        'products/export/snapshots/',
+        ProductSnapshotsExportAPIView.as_view(),
+        name='product-snapshot-export',
+    ),
     path(
         'products/<int:id>/',
         ProductsDetailAPIView.as_view(),
         name='product-detail',
     ),
+    path(
+        'products/<int:id>/history/',
+        ProductHistoryAPIView.as_view(),
+        name='product-history',
+    ),
+    path(
+        'analytics/',
+        AnalyticsAPIView.as_view(),
+        name='analytics',
+    ),
+    path(
+        'analytics/summary/',
+        AnalyticsSummaryAPIView.as_view(),
+        name='analytics-summary',
+    ),
+    path(
+        'analytics/price-histogram/',
+        PriceHistogramAPIView.as_view(),
+        name='analytics-price-histogram',
+    ),
+    path(
+        'analytics/rating-histogram/',
+        RatingHistogramAPIView.as_view(),
+        name='analytics-rating-histogram',
+    ),
+    path(
+        'analytics/price-percentiles/',
+        PricePercentilesAPIView.as_view(),
+        name='analytics-price-percentiles',
+    ),
+    path(
+        'analytics/discounts/',
+        DiscountsAPIView.as_view(),
+        name='analytics-discounts',
+    ),
+    path(
+        'analytics/rating-reviews/',
+        RatingReviewsMatrixAPIView.as_view(),
+        name='analytics-rating-reviews',
+    ),
+    path(
+        'analytics/queries/',
+        QuerySummaryListAPIView.as_view(),
+        name='analytics-query-summaries',
+    ),
+    path(
+        'analytics/queries/<str:query>/',
+        QuerySummaryDetailAPIView.as_view(),
+        name='analytics-query-summary',
+    ),
+    path(
+        'async/products/',
+        ProductsListAsyncView.as_view(),
+        name='async-product-list',
+    ),
+    path(
+        'async/products/<int:id>/',
+        ProductsDetailAsyncView.as_view(),
+        name='async-product-detail',
+    ),
+    path(
+        'async/analytics/summary/',
+        AnalyticsSummaryAsyncView.as_view(),
+        name='async-analytics-summary',
+    ),
 ]
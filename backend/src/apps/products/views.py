@@ -1,11 +1,103 @@
+from django.http import StreamingHttpResponse
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView, Request
 
-from apps.products.serializers import ProductSerializer
-from apps.products.services import get_product_by_id, get_products_with_filters
+from apps.monitoring.timing import timed
+from apps.products.analytics import (
+    DEFAULT_PERCENTILES,
+    MAX_RATING,
+    get_analytics,
+    get_discounts,
+    get_histogram,
+    get_percentiles,
+    get_rating_reviews_matrix,
+    get_summary,
+)
+from apps.products.cache import cache_products_response
+from apps.products.exports import (
+    DEFAULT_EXPORT_FORMAT,
+    EXPORT_CONTENT_TYPES,
+    EXPORT_FORMATS,
+    PARQUET_AVAILABLE,
+    export_products,
+    export_snapshots,
+)
+from apps.products.pagination import MAX_PAGE_SIZE, get_paginator
+from apps.products.serializers import (
+    AnalyticsQuerySerializer,
+    AnalyticsSerializer,
+    AnalyticsSummarySerializer,
+    DiscountStatsSerializer,
+    HistogramBinSerializer,
+    PaginatedProductSerializer,
+    PercentileSerializer,
+    ProductHistoryQuerySerializer,
+    ProductHistorySerializer,
+    ProductRowSerializer,
+    ProductSerializer,
+    QuerySummarySerializer,
+    RatingReviewsMatrixSerializer,
+    get_product_rows,
+    parse_product_fields,
+)
+from apps.products.services import (
+    get_product_by_id,
+    get_product_history,
+    get_products_with_filters,
+    get_query_summaries,
+    get_query_summary,
+)
+
+PRODUCT_FILTER_PARAMETERS = [
+    openapi.Parameter(
+        'search',
+        openapi.IN_QUERY,
+        description=(
+            'Search product names: full-text (stemmed) or fuzzy by trigrams. '
+            'Results are ordered by relevance unless ordering is given.'
+        ),
+        type=openapi.TYPE_STRING,
+    ),
+    openapi.Parameter(
+        'min_price',
+        openapi.IN_QUERY,
+        description='Minimum price',
+        type=openapi.TYPE_NUMBER,
+    ),
+    openapi.Parameter(
+        'max_price',
+        openapi.IN_QUERY,
+        description='Maximum price',
+        type=openapi.TYPE_NUMBER,
+    ),
+    openapi.Parameter(
+        'min_rating',
+        openapi.IN_QUERY,
+        description='Minimum rating',
+        type=openapi.TYPE_NUMBER,
+    ),
+    openapi.Parameter(
+        'min_reviews',
+        openapi.IN_QUERY,
+        description='Minimum number of reviews',
+        type=openapi.TYPE_INTEGER,
+    ),
+]
+
+PRODUCT_ORDERING_PARAMETER = openapi.Parameter(
+    'ordering',
+    openapi.IN_QUERY,
+    description=(
+        'Comma-separated list of fields to order by. '
+        'Allowed: price, -price, rating, -rating, reviews_count, '
+        '-reviews_count, name, -name'
+    ),
+    type=openapi.TYPE_STRING,
+)
 
 
 class ProductsListAPIView(APIView):
@@ -16,52 +108,185 @@ class ProductsListAPIView(APIView):
         operation_description='Get a list of products with optional filtering by price,'
         ' rating, and reviews count.',
         manual_parameters=[
+            *PRODUCT_FILTER_PARAMETERS,
+            PRODUCT_ORDERING_PARAMETER,
             openapi.Parameter(
-                'min_price',
+                'fields',
                 openapi.IN_QUERY,
-                description='Minimum price',
-                type=openapi.TYPE_NUMBER,
+                description=(
+                    'Comma-separated list of fields to return, e.g. '
+                    'id,price,rating. Only these columns are fetched. '
+                    'Default: all fields.'
+                ),
+                type=openapi.TYPE_STRING,
             ),
             openapi.Parameter(
-                'max_price',
+                'pagination',
                 openapi.IN_QUERY,
-                description='Maximum price',
-                type=openapi.TYPE_NUMBER,
+                description=(
+                    'Pagination mode: page (default), offset or cursor. '
+                    'Page mode uses page/page_size, offset mode uses '
+                    'limit/offset, cursor mode uses cursor/page_size.'
+                ),
+                type=openapi.TYPE_STRING,
+                enum=['page', 'offset', 'cursor'],
             ),
             openapi.Parameter(
-                'min_rating',
+                'page',
                 openapi.IN_QUERY,
-                description='Minimum rating',
-                type=openapi.TYPE_NUMBER,
+                description='Page number (page mode)',
+                type=openapi.TYPE_INTEGER,
             ),
             openapi.Parameter(
-                'min_reviews',
+                'page_size',
                 openapi.IN_QUERY,
-                description='Minimum number of reviews',
+                description=(
+                    'Number of products per page (page and cursor modes, '
+                    f'max {MAX_PAGE_SIZE})'
+                ),
                 type=openapi.TYPE_INTEGER,
             ),
             openapi.Parameter(
-                'ordering',
+                'limit',
                 openapi.IN_QUERY,
                 description=(
-                    'Comma-separated list of fields to order by. '
-                    'Allowed: price, -price, rating, -rating, reviews_count, '
-                    '-reviews_count, name, -name'
+                    f'Number of products to return (offset mode, max {MAX_PAGE_SIZE})'
                 ),
+                type=openapi.TYPE_INTEGER,
+            ),
+            openapi.Parameter(
+                'offset',
+                openapi.IN_QUERY,
+                description='Number of products to skip (offset mode)',
+                type=openapi.TYPE_INTEGER,
+            ),
+            openapi.Parameter(
+                'cursor',
+                openapi.IN_QUERY,
+                description='Opaque cursor from next/previous links (cursor mode)',
                 type=openapi.TYPE_STRING,
             ),
         ],
         responses={
             status.HTTP_200_OK: openapi.Response(
                 description='Successfully retrieved paginated list of products',
-                schema=serializer_class(many=True),
+                schema=PaginatedProductSerializer(),
+            ),
+            status.HTTP_400_BAD_REQUEST: openapi.Response(
+                description='Unknown fields',
             ),
         },
     )
+    @cache_products_response
     def get(self, request: Request):
+        fields = parse_product_fields(request.query_params.get('fields'))
         products = get_products_with_filters(request.query_params)
-        serializer = self.serializer_class(products, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        products = get_product_rows(products, fields)
+        paginator = get_paginator(request.query_params.get('pagination'))
+        page = paginator.paginate_queryset(products, request, view=self)
+        with timed('serialize'):
+            data = ProductRowSerializer(page, many=True, fields=fields).data
+        return paginator.get_paginated_response(data)
+
+
+class ExportAPIView(APIView):
+    """
+    Base of the views that stream files instead of rendering data.
+    """
+
+    def perform_content_negotiation(self, request, force=False):
+        # The export bypasses the renderers, so an `Accept: text/csv` header
+        # must not fail negotiation; errors fall back to the default renderer.
+        return super().perform_content_negotiation(request, force=True)
+
+    def get_file_response(self, pieces, name: str, file_format: str):
+        response = StreamingHttpResponse(
+            pieces, content_type=EXPORT_CONTENT_TYPES[file_format]
+        )
+        response['Content-Disposition'] = f'attachment; filename="{name}.{file_format}"'
+        return response
+
+    def get_parquet_unavailable_response(self):
+        return Response(
+            {'detail': 'Parquet exports require the pyarrow package.'},
+            status=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+
+
+class ProductsExportAPIView(ExportAPIView):
+    @swagger_auto_schema(
+        operation_summary='Export products',
+        operation_description='Stream all products matching the filters as a CSV '
+        '(with a header row), NDJSON or Parquet file. Rows are read with a '
+        'server-side cursor, so exports of any size use constant memory. Parquet '
+        'columns keep the decimal and timestamp types.',
+        manual_parameters=[
+            *PRODUCT_FILTER_PARAMETERS,
+            PRODUCT_ORDERING_PARAMETER,
+            openapi.Parameter(
+                'file_format',
+                openapi.IN_QUERY,
+                description='Export file format',
+                type=openapi.TYPE_STRING,
+                enum=list(EXPORT_FORMATS),
+                default=DEFAULT_EXPORT_FORMAT,
+            ),
+        ],
+        produces=list(EXPORT_CONTENT_TYPES.values()),
+        responses={
+            status.HTTP_200_OK: openapi.Response(
+                description='Streamed export file',
+                schema=openapi.Schema(type=openapi.TYPE_FILE),
+            ),
+            status.HTTP_400_BAD_REQUEST: openapi.Response(
+                description='Unknown file format',
+            ),
+            status.HTTP_501_NOT_IMPLEMENTED: openapi.Response(
+                description='Parquet requested, but pyarrow is not installed',
+            ),
+        },
+    )
+    def get(self, request: Request):
+        file_format = request.query_params.get('file_format', DEFAULT_EXPORT_FORMAT)
+        if file_format not in EXPORT_FORMATS:
+            raise ValidationError(
+                {'file_format': [f'Expected one of: {", ".join(EXPORT_FORMATS)}.']}
+            )
+        if file_format == 'parquet' and not PARQUET_AVAILABLE:
+            return self.get_parquet_unavailable_response()
+
+        products = get_products_with_filters(request.query_params)
+        return self.get_file_response(
+            export_products(products, file_format), 'products', file_format
+        )
+
+
+class ProductSnapshotsExportAPIView(ExportAPIView):
+    @swagger_auto_schema(
+        operation_summary='Export product snapshots',
+        operation_description='Stream the history snapshots of all products '
+        'matching the filters as a Parquet file, ordered by product and capture '
+        'time.',
+        manual_parameters=PRODUCT_FILTER_PARAMETERS,
+        produces=[EXPORT_CONTENT_TYPES['parquet']],
+        responses={
+            status.HTTP_200_OK: openapi.Response(
+                description='Streamed Parquet file',
+                schema=openapi.Schema(type=openapi.TYPE_FILE),
+            ),
+            status.HTTP_501_NOT_IMPLEMENTED: openapi.Response(
+                description='pyarrow is not installed',
+            ),
+        },
+    )
+    def get(self, request: Request):
+        if not PARQUET_AVAILABLE:
+            return self.get_parquet_unavailable_response()
+
+        products = get_products_with_filters(request.query_params)
+        return self.get_file_response(
+            export_snapshots(products), 'snapshots', 'parquet'
+        )
 
 
 class ProductsDetailAPIView(APIView):
@@ -86,7 +311,272 @@ class ProductsDetailAPIView(APIView):
             ),
         },
     )
+    @cache_products_response
     def get(self, _: Request, id: int):
         product = get_product_by_id(id)
         serializer = self.serializer_class(product)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class ProductHistoryAPIView(APIView):
+    serializer_class = ProductHistorySerializer
+
+    @swagger_auto_schema(
+        operation_summary='Product price history',
+        operation_description='Get the price and rating series of a product,'
+        ' aggregated into fixed time buckets.',
+        query_serializer=ProductHistoryQuerySerializer,
+        responses={
+            status.HTTP_200_OK: openapi.Response(
+                description='Successfully retrieved product history',
+                schema=serializer_class(),
+            ),
+            status.HTTP_400_BAD_REQUEST: openapi.Response(
+                description='Invalid query parameters',
+            ),
+            status.HTTP_404_NOT_FOUND: openapi.Response(
+                description='Product not found',
+            ),
+        },
+    )
+    @cache_products_response
+    def get(self, request: Request, id: int):
+        query = ProductHistoryQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        product = get_product_by_id(id)
+        history = get_product_history(product, **query.validated_data)
+        serializer = self.serializer_class(
+            {
+                'product_id': product.id,
+                'bucket': query.validated_data['bucket'],
+                'results': history,
+            }
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+def _get_analytics_params(request: Request):
+    """
+    Get the filtered products and the validated analytics parameters.
+    """
+    query = AnalyticsQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    params = query.validated_data
+    params.setdefault('percentiles', DEFAULT_PERCENTILES)
+    return get_products_with_filters(request.query_params), params
+
+
+ANALYTICS_RESPONSES = {
+    status.HTTP_400_BAD_REQUEST: openapi.Response(
+        description='Invalid query parameters',
+    ),
+}
+
+
+class AnalyticsAPIView(APIView):
+    serializer_class = AnalyticsSerializer
+
+    @swagger_auto_schema(
+        operation_summary='Products analytics',
+        operation_description='Get the summary, price and rating histograms, price'
+        ' percentiles, discount statistics and the rating × reviews matrix of the'
+        ' filtered products in one response.',
+        manual_parameters=PRODUCT_FILTER_PARAMETERS,
+        query_serializer=AnalyticsQuerySerializer,
+        responses={
+            status.HTTP_200_OK: openapi.Response(
+                description='Successfully computed analytics',
+                schema=serializer_class(),
+            ),
+            **ANALYTICS_RESPONSES,
+        },
+    )
+    @cache_products_response
+    def get(self, request: Request):
+        products, params = _get_analytics_params(request)
+        serializer = self.serializer_class(get_analytics(products, **params))
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class AnalyticsSummaryAPIView(APIView):
+    serializer_class = AnalyticsSummarySerializer
+
+    @swagger_auto_schema(
+        operation_summary='Products summary',
+        operation_description='Get the number of products, average rating, total'
+        ' reviews and average discount of the filtered products.',
+        manual_parameters=PRODUCT_FILTER_PARAMETERS,
+        responses={
+            status.HTTP_200_OK: openapi.Response(
+                description='Successfully computed summary',
+                schema=serializer_class(),
+            ),
+        },
+    )
+    @cache_products_response
+    def get(self, request: Request):
+        products = get_products_with_filters(request.query_params)
+        serializer = self.serializer_class(get_summary(products))
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class PriceHistogramAPIView(APIView):
+    serializer_class = HistogramBinSerializer
+
+    @swagger_auto_schema(
+        operation_summary='Price histogram',
+        operation_description='Count the filtered products in equal-width price'
+        ' buckets between the lowest and the highest price.',
+        manual_parameters=PRODUCT_FILTER_PARAMETERS,
+        query_serializer=AnalyticsQuerySerializer,
+        responses={
+            status.HTTP_200_OK: openapi.Response(
+                description='Successfully computed histogram',
+                schema=serializer_class(many=True),
+            ),
+            **ANALYTICS_RESPONSES,
+        },
+    )
+    @cache_products_response
+    def get(self, request: Request):
+        products, params = _get_analytics_params(request)
+        histogram = get_histogram(products, params['field'], params['bins'])
+        serializer = self.serializer_class(histogram, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class RatingHistogramAPIView(APIView):
+    serializer_class = HistogramBinSerializer
+
+    @swagger_auto_schema(
+        operation_summary='Rating histogram',
+        operation_description='Count the filtered products in equal-width rating'
+        ' buckets between 0 and 5.',
+        manual_parameters=PRODUCT_FILTER_PARAMETERS,
+        query_serializer=AnalyticsQuerySerializer,
+        responses={
+            status.HTTP_200_OK: openapi.Response(
+                description='Successfully computed histogram',
+                schema=serializer_class(many=True),
+            ),
+            **ANALYTICS_RESPONSES,
+        },
+    )
+    @cache_products_response
+    def get(self, request: Request):
+        products, params = _get_analytics_params(request)
+        histogram = get_histogram(products, 'rating', params['bins'], 0, MAX_RATING)
+        serializer = self.serializer_class(histogram, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class PricePercentilesAPIView(APIView):
+    serializer_class = PercentileSerializer
+
+    @swagger_auto_schema(
+        operation_summary='Price percentiles',
+        operation_description='Get interpolated price percentiles of the filtered'
+        ' products.',
+        manual_parameters=PRODUCT_FILTER_PARAMETERS,
+        query_serializer=AnalyticsQuerySerializer,
+        responses={
+            status.HTTP_200_OK: openapi.Response(
+                description='Successfully computed percentiles',
+                schema=serializer_class(many=True),
+            ),
+            **ANALYTICS_RESPONSES,
+        },
+    )
+    @cache_products_response
+    def get(self, request: Request):
+        products, params = _get_analytics_params(request)
+        percentiles = get_percentiles(products, params['field'], params['percentiles'])
+        serializer = self.serializer_class(percentiles, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class DiscountsAPIView(APIView):
+    serializer_class = DiscountStatsSerializer
+
+    @swagger_auto_schema(
+        operation_summary='Discount statistics',
+        operation_description='Get the discount depth (price vs discounted price)'
+        ' of the filtered products, overall and per rating.',
+        manual_parameters=PRODUCT_FILTER_PARAMETERS,
+        responses={
+            status.HTTP_200_OK: openapi.Response(
+                description='Successfully computed discount statistics',
+                schema=serializer_class(),
+            ),
+        },
+    )
+    @cache_products_response
+    def get(self, request: Request):
+        products = get_products_with_filters(request.query_params)
+        serializer = self.serializer_class(get_discounts(products))
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class RatingReviewsMatrixAPIView(APIView):
+    serializer_class = RatingReviewsMatrixSerializer
+
+    @swagger_auto_schema(
+        operation_summary='Rating × reviews matrix',
+        operation_description='Count the filtered products per rating bucket and'
+        ' reviews count bucket (0, 1-9, 10-99, ...).',
+        manual_parameters=PRODUCT_FILTER_PARAMETERS,
+        responses={
+            status.HTTP_200_OK: openapi.Response(
+                description='Successfully computed matrix',
+                schema=serializer_class(),
+            ),
+        },
+    )
+    @cache_products_response
+    def get(self, request: Request):
+        products = get_products_with_filters(request.query_params)
+        serializer = self.serializer_class(get_rating_reviews_matrix(products))
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class QuerySummaryListAPIView(APIView):
+    serializer_class = QuerySummarySerializer
+
+    @swagger_auto_schema(
+        operation_summary='List search query summaries',
+        operation_description='Get the precomputed summaries of all crawled'
+        ' search queries.',
+        responses={
+            status.HTTP_200_OK: openapi.Response(
+                description='Successfully retrieved summaries',
+                schema=serializer_class(many=True),
+            ),
+        },
+    )
+    @cache_products_response
+    def get(self, request: Request):
+        serializer = self.serializer_class(get_query_summaries(), many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class QuerySummaryDetailAPIView(APIView):
+    serializer_class = QuerySummarySerializer
+
+    @swagger_auto_schema(
+        operation_summary='Retrieve search query summary',
+        operation_description='Get the precomputed summary of the products found'
+        ' by a search query.',
+        responses={
+            status.HTTP_200_OK: openapi.Response(
+                description='Successfully retrieved summary',
+                schema=serializer_class(),
+            ),
+            status.HTTP_404_NOT_FOUND: openapi.Response(
+                description='No summary for the query',
+            ),
+        },
+    )
+    @cache_products_response
+    def get(self, request: Request, query: str):
+        serializer = self.serializer_class(get_query_summary(query))
+        return Response(serializer.data, status=status.HTTP_200_OK)
@@ -0,0 +1,128 @@
+"""
+Content-negotiated compression of responses.
+
+`CompressionMiddleware` compresses JSON responses of at least
+`COMPRESSION_MIN_SIZE` bytes with the best coding the client accepts:
+Brotli (with the optional `brotli` package) or gzip. Smaller responses are
+not worth the CPU time, and streamed responses are left alone.
+
+Only the API's JSON is compressed. HTML pages (the admin, the browsable
+API) carry CSRF tokens, and compressing secrets next to text an attacker
+can inject into the page lets them guess the secrets from the response
+sizes (BREACH). JSON responses carry no secrets.
+"""
+
+import gzip
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BROTLI_AVAILABLE = brotli is not None
+
+# Fast levels: responses are compressed on every request, not once.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+COMPRESSORS = {
+    'gzip': lambda content: gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0),
+}
+if BROTLI_AVAILABLE:
+    COMPRESSORS['br'] = lambda content: brotli.compress(content, quality=BROTLI_QUALITY)
+# In order of preference, for clients that accept several equally.
+ENCODINGS = tuple(encoding for encoding in ('br', 'gzip') if encoding in COMPRESSORS)
+
+COMPRESSIBLE_MEDIA_TYPES = ('application/json',)
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """
+    Parse an `Accept-Encoding` header into the quality of every coding.
+
+    Example:
+        >>> parse_accept_encoding('gzip;q=0.8, br')
+        {'gzip': 0.8, 'br': 1.0}
+    """
+    codings = {}
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[coding] = quality
+    return codings
+
+
+def choose_encoding(header: str, encodings: tuple = ENCODINGS) -> str | None:
+    """
+    Choose the coding of a response from the request's `Accept-Encoding`.
+
+    Args:
+        header (str): The `Accept-Encoding` header.
+        encodings (tuple): Supported codings, preferred first.
+
+    Returns:
+        str | None: The accepted coding with the highest quality (the
+            preferred one among equals), or None to send the response as is.
+    """
+    codings = parse_accept_encoding(header)
+    chosen, chosen_quality = None, 0.0
+    for encoding in encodings:
+        quality = codings.get(encoding, codings.get('*', 0.0))
+        if quality > chosen_quality:
+            chosen, chosen_quality = encoding, quality
+    return chosen
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress JSON responses with Brotli or gzip, as negotiated with the
+    client.
+
+    Enabled with the `RESPONSE_COMPRESSION` setting.
+    """
+
+    def __init__(self, get_response):
+        if not settings.RESPONSE_COMPRESSION:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        media_type = response.get('Content-Type', '').partition(';')[0]
+        if media_type.strip().lower() not in COMPRESSIBLE_MEDIA_TYPES:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+        compressed = COMPRESSORS[encoding](response.content)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # The compressed bytes differ from the ones a strong ETag stands for.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        return response
@@ -0,0 +1,59 @@
+"""
+Faster JSON rendering for the API.
+
+`ORJSONRenderer` is a drop-in replacement for DRF's `JSONRenderer` that
+encodes with the optional `orjson` package, several times faster than the
+stdlib `json` module. Its output is the same JSON as `JSONRenderer`'s:
+compact, unescaped unicode (but for the U+2028 and U+2029 line separators),
+`Z` for UTC datetimes, and anything orjson does not know (decimals, lazy
+strings, querysets...) converted by DRF's encoder. Without orjson, when
+indented or ASCII-only output is asked for, or when orjson cannot encode
+the data (integers beyond 64 bits), it renders with `JSONRenderer`.
+
+Floats are not always written the same way, though they parse to the same
+values: orjson writes exponents without a sign or padding (`1e16`, `1e-7`
+instead of `1e+16`, `1e-07`), and NaN and infinities as `null`, where
+`JSONRenderer` refuses them.
+"""
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_AVAILABLE = orjson is not None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    `JSONRenderer` that encodes with orjson when it is installed.
+    """
+
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        if (
+            not ORJSON_AVAILABLE
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context)
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder.default,
+                option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped by JSONRenderer too, as they end lines in JavaScript.
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9', b'\\u2029'
+        )
@@ -1,7 +1,10 @@
 from config.settings.auth import *
 from config.settings.base import *
+from config.settings.cache import *
+from config.settings.compression import *
 from config.settings.database import *
 from config.settings.docs import *
 from config.settings.logging import *
+from config.settings.monitoring import *
 from config.settings.rest_framework import *
 from config.settings.security import *
@@ -22,7 +22,9 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # Project apps
+    'apps.monitoring',
     'apps.products',
     # Third-party apps
     'drf_yasg',
@@ -31,6 +33,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'apps.monitoring.middleware.MetricsMiddleware',
+    'apps.monitoring.middleware.RequestTimingMiddleware',
+    'config.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -0,0 +1,19 @@
+"""
+Cache settings for wb-analytics project.
+"""
+
+import os
+
+# Local memory by default. Set DJANGO_CACHE_BACKEND to a shared backend
+# (database, file-based on a shared volume, ...) when the API, the parse
+# worker and management commands run in different processes, so that
+# product writes invalidate the API cache everywhere.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', 'wb-analytics'),
+        'TIMEOUT': int(os.getenv('DJANGO_CACHE_TIMEOUT', 300)),
+    }
+}
@@ -0,0 +1,13 @@
+"""
+Response compression settings for wb-analytics project.
+"""
+
+import os
+
+# Compress JSON responses with Brotli (needs the brotli package) or gzip, as
+# accepted by the client. HTML pages, which carry CSRF tokens, never are.
+RESPONSE_COMPRESSION = bool(int(os.getenv('DJANGO_RESPONSE_COMPRESSION', 1)))
+
+# Smaller responses are sent as is: compressing them costs more CPU time
+# than the bytes it saves.
+COMPRESSION_MIN_SIZE = int(os.getenv('DJANGO_COMPRESSION_MIN_SIZE', 1024))
@@ -3,6 +3,9 @@ Database settings for wb-analytics project.
 """
 
 import os
+from importlib.util import find_spec
+
+from django.core.exceptions import ImproperlyConfigured
 
 DATABASES = {
     'default': {
@@ -12,5 +15,31 @@ DATABASES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DOCKER_POSTGRES_HOST'),
         'PORT': os.getenv('DOCKER_POSTGRES_PORT'),
+        # Keep connections open between requests for this many seconds
+        # instead of reconnecting on every request (0 closes them).
+        'CONN_MAX_AGE': int(os.getenv('POSTGRES_CONN_MAX_AGE', 60)),
+        # Check a reused connection before a request uses it, so a restarted
+        # database does not fail the first request of every worker.
+        'CONN_HEALTH_CHECKS': bool(int(os.getenv('POSTGRES_CONN_HEALTH_CHECKS', 1))),
+        'OPTIONS': {},
     }
 }
+
+# Connection pool of each process (psycopg 3 with psycopg_pool only). Useful
+# with threaded workers; see DEV_GUIDE.md for sizing.
+if bool(int(os.getenv('POSTGRES_POOL', 0))):
+    # With psycopg2 Django would only fail on the first query.
+    if find_spec('psycopg') is None or find_spec('psycopg_pool') is None:
+        raise ImproperlyConfigured(
+            'POSTGRES_POOL=1 requires psycopg 3 with its pool '
+            '(the psycopg[pool] package) instead of psycopg2. Install it or '
+            'set POSTGRES_POOL=0.'
+        )
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('POSTGRES_POOL_MIN_SIZE', 1)),
+        'max_size': int(os.getenv('POSTGRES_POOL_MAX_SIZE', 4)),
+        # Seconds a request waits for a free connection before failing.
+        'timeout': float(os.getenv('POSTGRES_POOL_TIMEOUT', 10)),
+    }
+    # Pooled connections are returned to the pool after every request.
+    DATABASES['default']['CONN_MAX_AGE'] = 0
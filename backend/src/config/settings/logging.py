@@ -29,6 +29,11 @@ if bool(int(os.getenv('DJANGO_LOGGING', 0))):
                 'handlers': ['console'],
                 'propagate': True,
                 'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO'),
-            }
+            },
+            'apps': {
+                'handlers': ['console'],
+                'propagate': False,
+                'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO'),
+            },
         },
     }
@@ -0,0 +1,22 @@
+"""
+Monitoring settings for wb-analytics project.
+"""
+
+import os
+
+# Server-Timing headers and a log line with the query count, database,
+# serialization and render time of every request.
+REQUEST_TIMING = bool(int(os.getenv('DJANGO_REQUEST_TIMING', 0)))
+
+# Queries taking at least this many milliseconds are logged with their SQL.
+SLOW_QUERY_MS = float(os.getenv('DJANGO_SLOW_QUERY_MS', 100))
+
+# Prometheus metrics served at /metrics. Every process adds its observations
+# to the shared totals in the database at most every
+# DJANGO_METRICS_FLUSH_INTERVAL seconds.
+METRICS_ENABLED = bool(int(os.getenv('DJANGO_METRICS', 1)))
+METRICS_FLUSH_INTERVAL = float(os.getenv('DJANGO_METRICS_FLUSH_INTERVAL', 10))
+
+# If set, scrapes must send `Authorization: Bearer <token>`. Without a token,
+# /metrics is only served with DEBUG on.
+METRICS_TOKEN = os.getenv('DJANGO_METRICS_TOKEN', '')
@@ -2,8 +2,19 @@
 Rest framework settings for wb-analytics project.
 """
 
+import os
+
 from config.settings.base import DEBUG
 
+# orjson-backed renderer with the same JSON as DRF's JSONRenderer (floats
+# may be written differently, see config/renderers.py); it falls back to the
+# stdlib encoder when orjson is not installed.
+JSON_RENDERER = (
+    'config.renderers.ORJSONRenderer'
+    if bool(int(os.getenv('DJANGO_ORJSON_RENDERER', 1)))
+    else 'rest_framework.renderers.JSONRenderer'
+)
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
@@ -13,9 +24,11 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': [
+        JSON_RENDERER,
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 if not DEBUG:
-    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
-        'rest_framework.renderers.JSONRenderer'
-    ]
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [JSON_RENDERER]
@@ -10,4 +10,5 @@ API_V1_URL_PREFIX = 'v1/'
 urlpatterns = [
     path('admin/', admin.site.urls),
     path(API_V1_URL_PREFIX, include(v1_urls)),
+    path('', include('apps.monitoring.urls')),
 ]
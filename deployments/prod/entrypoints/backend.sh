@@ -1,6 +1,7 @@
 #!/bin/sh
 
 poetry run python src/manage.py migrate
+poetry run python src/manage.py createcachetable
 poetry run python src/manage.py collectstatic --no-input
 
 exec "$@"
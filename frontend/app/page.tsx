@@ -1,7 +1,7 @@
 'use client'
 
-import { useState, useEffect, useMemo, useCallback } from 'react'
-import { Product, ProductFilters } from '@/types/product'
+import { useState, useEffect, useRef, useCallback } from 'react'
+import { AnalyticsSummary, Product, ProductFilters } from '@/types/product'
 import { ProductsAPI } from '@/lib/api'
 import { ProductTable } from '@/components/ProductTable'
 import { ProductFilters as ProductFiltersComponent } from '@/components/ProductFilters'
@@ -9,91 +9,88 @@ import { ProductCharts } from '@/components/ProductCharts'
 import { Card, CardContent } from '@/components/ui/card'
 import { Skeleton } from '@/components/ui/skeleton'
 import { Alert, AlertDescription } from '@/components/ui/alert'
-import { BarChart3, TrendingUp, Star, Package, AlertCircle, RefreshCw } from 'lucide-react'
+import {
+  BarChart3,
+  TrendingUp,
+  Star,
+  Package,
+  AlertCircle,
+  RefreshCw,
+  ChevronLeft,
+  ChevronRight
+} from 'lucide-react'
 import { Button } from '@/components/ui/button'
 
+// Filter changes (e.g. dragging the price slider) are sent once they settle.
+const FILTERS_DELAY_MS = 300
+
 export default function Home() {
   const [products, setProducts] = useState<Product[]>([])
-  const [filteredProducts, setFilteredProducts] = useState<Product[]>([])
+  const [nextPage, setNextPage] = useState<string | null>(null)
+  const [previousPage, setPreviousPage] = useState<string | null>(null)
+  const [summary, setSummary] = useState<AnalyticsSummary | null>(null)
+  const [priceRange, setPriceRange] = useState({ min: 0, max: 100000 })
   const [loading, setLoading] = useState(true)
+  const [fetching, setFetching] = useState(false)
   const [error, setError] = useState<string | null>(null)
   const [filters, setFilters] = useState<ProductFilters>({})
+  // Responses of superseded requests are dropped.
+  const requestId = useRef(0)
 
-  const priceRange = useMemo(() => {
-    if (products.length === 0) return { min: 0, max: 100000 }
-
-    const prices = products.map(p => parseFloat(p.discounted_price))
-    return {
-      min: Math.floor(Math.min(...prices) / 100) * 100,
-      max: Math.ceil(Math.max(...prices) / 100) * 100
-    }
-  }, [products])
-
-  const stats = useMemo(() => {
-    const avgRating =
-      filteredProducts.length > 0
-        ? filteredProducts.reduce((sum, p) => sum + p.rating, 0) / filteredProducts.length
-        : 0
-
-    const totalReviews = filteredProducts.reduce((sum, p) => sum + p.reviews_count, 0)
-
-    const avgDiscount =
-      filteredProducts.length > 0
-        ? filteredProducts.reduce((sum, p) => {
-            const original = parseFloat(p.price)
-            const discounted = parseFloat(p.discounted_price)
-            return sum + ((original - discounted) / original) * 100
-          }, 0) / filteredProducts.length
-        : 0
-
-    return {
-      totalProducts: filteredProducts.length,
-      avgRating: avgRating.toFixed(1),
-      totalReviews,
-      avgDiscount: avgDiscount.toFixed(1)
-    }
-  }, [filteredProducts])
+  const stats = {
+    totalProducts: summary?.count ?? 0,
+    avgRating: (summary?.avg_rating ?? 0).toFixed(1),
+    totalReviews: summary?.total_reviews ?? 0,
+    avgDiscount: (summary?.avg_discount ?? 0).toFixed(1)
+  }
 
-  useEffect(() => {
-    loadProducts()
-  }, [])
+  const loadPage = useCallback(
+    async (pageUrl: string | null = null) => {
+      const id = ++requestId.current
+      try {
+        setFetching(true)
+        setError(null)
+        // Pages of the same filters share the summary.
+        const [page, newSummary] = await Promise.all([
+          ProductsAPI.getProducts(filters, pageUrl),
+          pageUrl ? null : ProductsAPI.getAnalyticsSummary(filters)
+        ])
+        if (id !== requestId.current) return
+        setProducts(page.results)
+        setNextPage(page.next)
+        setPreviousPage(page.previous)
+        if (newSummary) setSummary(newSummary)
+      } catch (err) {
+        if (id !== requestId.current) return
+        setError('Не удалось загрузить товары. Попробуйте еще раз.')
+        console.error('Error loading products:', err)
+      } finally {
+        if (id === requestId.current) {
+          setFetching(false)
+          setLoading(false)
+        }
+      }
+    },
+    [filters]
+  )
 
-  const applyFilters = useCallback(() => {
-    let filtered = [...products]
-
-    if (filters.min_price !== undefined) {
-      filtered = filtered.filter(p => parseFloat(p.discounted_price) >= filters.min_price!)
-    }
-    if (filters.max_price !== undefined) {
-      filtered = filtered.filter(p => parseFloat(p.discounted_price) <= filters.max_price!)
-    }
-    if (filters.min_rating !== undefined && filters.min_rating > 0) {
-      filtered = filtered.filter(p => p.rating >= filters.min_rating!)
-    }
-    if (filters.min_reviews !== undefined && filters.min_reviews > 0) {
-      filtered = filtered.filter(p => p.reviews_count >= filters.min_reviews!)
-    }
-
-    setFilteredProducts(filtered)
-  }, [products, filters])
+  useEffect(() => {
+    const timeout = setTimeout(() => loadPage(), FILTERS_DELAY_MS)
+    return () => clearTimeout(timeout)
+  }, [loadPage])
 
   useEffect(() => {
-    applyFilters()
-  }, [applyFilters])
-
-  const loadProducts = async () => {
-    try {
-      setLoading(true)
-      setError(null)
-      const data = await ProductsAPI.getProducts()
-      setProducts(data)
-    } catch (err) {
-      setError('Не удалось загрузить товары. Попробуйте еще раз.')
-      console.error('Error loading products:', err)
-    } finally {
-      setLoading(false)
-    }
-  }
+    ProductsAPI.getPricePercentiles({}, { field: 'price', percentiles: '0,1' })
+      .then(([low, high]) => {
+        if (low?.value != null && high?.value != null) {
+          setPriceRange({
+            min: Math.floor(low.value / 100) * 100,
+            max: Math.ceil(high.value / 100) * 100
+          })
+        }
+      })
+      .catch(err => console.error('Error loading price range:', err))
+  }, [])
 
   const handleSort = (field: string, direction: 'asc' | 'desc') => {
     const orderingValue = direction === 'desc' ? `-${field}` : field
@@ -101,7 +98,7 @@ export default function Home() {
   }
 
   const handleFiltersChange = (newFilters: ProductFilters) => {
-    setFilters(newFilters)
+    setFilters(prev => ({ ...newFilters, ordering: prev.ordering }))
   }
 
   if (loading) {
@@ -150,7 +147,7 @@ export default function Home() {
             <AlertCircle className="h-4 w-4" />
             <AlertDescription className="flex items-center justify-between">
               {error}
-              <Button variant="outline" size="sm" onClick={loadProducts} className="ml-3">
+              <Button variant="outline" size="sm" onClick={() => loadPage()} className="ml-3">
                 <RefreshCw className="h-4 w-4 mr-1" />
                 Повторить
               </Button>
@@ -229,7 +226,7 @@ export default function Home() {
         </div>
 
         {/* Charts - Moved to top */}
-        <ProductCharts products={filteredProducts} />
+        <ProductCharts products={products} />
 
         {/* Main Content */}
         <div className="grid grid-cols-1 lg:grid-cols-4 gap-6">
@@ -242,8 +239,28 @@ export default function Home() {
           </div>
 
           {/* Products Table */}
-          <div className="lg:col-span-3">
-            <ProductTable products={filteredProducts} onSort={handleSort} />
+          <div className="lg:col-span-3 space-y-4">
+            <ProductTable products={products} onSort={handleSort} />
+            <div className="flex justify-end gap-2">
+              <Button
+                variant="outline"
+                size="sm"
+                disabled={!previousPage || fetching}
+                onClick={() => loadPage(previousPage)}
+              >
+                <ChevronLeft className="h-4 w-4 mr-1" />
+                Назад
+              </Button>
+              <Button
+                variant="outline"
+                size="sm"
+                disabled={!nextPage || fetching}
+                onClick={() => loadPage(nextPage)}
+              >
+                Вперед
+                <ChevronRight className="h-4 w-4 ml-1" />
+              </Button>
+            </div>
           </div>
         </div>
       </div>
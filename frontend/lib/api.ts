@@ -1,18 +1,147 @@
-import { Product, ProductFilters } from '@/types/product'
+import {
+  Analytics,
+  AnalyticsParams,
+  AnalyticsSummary,
+  ExportFormat,
+  PaginatedResponse,
+  PricePercentile,
+  Product,
+  ProductFilters,
+  ProductHistory,
+  ProductHistoryParams,
+  QuerySummary
+} from '@/types/product'
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://api.localhost/v3'
+const PAGE_SIZE = 100
 
 export class ProductsAPI {
-  static async getProducts(filters: ProductFilters = {}): Promise<Product[]> {
-    const params = new URLSearchParams()
+  static async getProducts(
+    filters: ProductFilters = {},
+    pageUrl: string | null = null
+  ): Promise<PaginatedResponse<Product>> {
+    // The `next` and `previous` links of a page keep its filters.
+    let url = pageUrl
+    if (!url) {
+      const params = new URLSearchParams({
+        pagination: 'cursor',
+        page_size: PAGE_SIZE.toString()
+      })
+      Object.entries(filters).forEach(([key, value]) => {
+        if (value !== undefined && value !== null && value !== '') {
+          params.append(key, value.toString())
+        }
+      })
+      url = `${API_BASE_URL}/products/?${params.toString()}`
+    }
 
+    try {
+      const response = await fetch(url)
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`)
+      }
+      return await response.json()
+    } catch (error) {
+      console.error('Failed to fetch products:', error)
+      throw error
+    }
+  }
+
+  static async getProduct(id: number): Promise<Product> {
+    const url = `${API_BASE_URL}/products/${id}/`
+
+    try {
+      const response = await fetch(url)
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`)
+      }
+      return await response.json()
+    } catch (error) {
+      console.error('Failed to fetch product:', error)
+      throw error
+    }
+  }
+
+  static async getProductHistory(
+    id: number,
+    params: ProductHistoryParams = {}
+  ): Promise<ProductHistory> {
+    const query = new URLSearchParams()
+    Object.entries(params).forEach(([key, value]) => {
+      if (value) {
+        query.append(key, value)
+      }
+    })
+    const url = `${API_BASE_URL}/products/${id}/history/?${query.toString()}`
+
+    try {
+      const response = await fetch(url)
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`)
+      }
+      return await response.json()
+    } catch (error) {
+      console.error('Failed to fetch product history:', error)
+      throw error
+    }
+  }
+
+  static async getAnalytics(
+    filters: ProductFilters = {},
+    params: AnalyticsParams = {}
+  ): Promise<Analytics> {
+    const query = new URLSearchParams()
+    Object.entries({ ...filters, ...params }).forEach(([key, value]) => {
+      if (value !== undefined && value !== null && value !== '' && key !== 'ordering') {
+        query.append(key, value.toString())
+      }
+    })
+    const url = `${API_BASE_URL}/analytics/?${query.toString()}`
+
+    try {
+      const response = await fetch(url)
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`)
+      }
+      return await response.json()
+    } catch (error) {
+      console.error('Failed to fetch analytics:', error)
+      throw error
+    }
+  }
+
+  static async getAnalyticsSummary(filters: ProductFilters = {}): Promise<AnalyticsSummary> {
+    const query = new URLSearchParams()
     Object.entries(filters).forEach(([key, value]) => {
-      if (value !== undefined && value !== null && value !== '') {
-        params.append(key, value.toString())
+      if (value !== undefined && value !== null && value !== '' && key !== 'ordering') {
+        query.append(key, value.toString())
       }
     })
+    const url = `${API_BASE_URL}/analytics/summary/?${query.toString()}`
+
+    try {
+      const response = await fetch(url)
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`)
+      }
+      return await response.json()
+    } catch (error) {
+      console.error('Failed to fetch analytics summary:', error)
+      throw error
+    }
+  }
 
-    const url = `${API_BASE_URL}/products/${params.toString() ? `?${params.toString()}` : ''}`
+  static async getPricePercentiles(
+    filters: ProductFilters = {},
+    params: AnalyticsParams = {}
+  ): Promise<PricePercentile[]> {
+    const query = new URLSearchParams()
+    Object.entries({ ...filters, ...params }).forEach(([key, value]) => {
+      if (value !== undefined && value !== null && value !== '' && key !== 'ordering') {
+        query.append(key, value.toString())
+      }
+    })
+    const url = `${API_BASE_URL}/analytics/price-percentiles/?${query.toString()}`
 
     try {
       const response = await fetch(url)
@@ -21,13 +150,13 @@ export class ProductsAPI {
       }
       return await response.json()
     } catch (error) {
-      console.error('Failed to fetch products:', error)
-      return []
+      console.error('Failed to fetch price percentiles:', error)
+      throw error
     }
   }
 
-  static async getProduct(id: number): Promise<Product> {
-    const url = `${API_BASE_URL}/products/${id}/`
+  static async getQuerySummary(query: string): Promise<QuerySummary> {
+    const url = `${API_BASE_URL}/analytics/queries/${encodeURIComponent(query)}/`
 
     try {
       const response = await fetch(url)
@@ -36,8 +165,18 @@ export class ProductsAPI {
       }
       return await response.json()
     } catch (error) {
-      console.error('Failed to fetch product:', error)
+      console.error('Failed to fetch query summary:', error)
       throw error
     }
   }
+
+  static getExportUrl(filters: ProductFilters = {}, fileFormat: ExportFormat = 'csv'): string {
+    const query = new URLSearchParams({ file_format: fileFormat })
+    Object.entries(filters).forEach(([key, value]) => {
+      if (value !== undefined && value !== null && value !== '') {
+        query.append(key, value.toString())
+      }
+    })
+    return `${API_BASE_URL}/products/export/?${query.toString()}`
+  }
 }
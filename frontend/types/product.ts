@@ -1,14 +1,49 @@
 export interface Product {
   id: number
+  wb_id: number | null
   name: string
   price: string
   discounted_price: string
   rating: number
   reviews_count: number
+  search_query: string | null
   created_at: string
 }
 
+export interface PaginatedResponse<T> {
+  count?: number
+  next: string | null
+  previous: string | null
+  results: T[]
+}
+
+export type HistoryBucket = 'hour' | 'day' | 'week' | 'month'
+
+export interface ProductHistoryPoint {
+  bucket: string
+  price_min: string
+  price_max: string
+  price_avg: string
+  discounted_price_avg: string
+  rating_avg: number
+  reviews_count: number
+  samples: number
+}
+
+export interface ProductHistory {
+  product_id: number
+  bucket: HistoryBucket
+  results: ProductHistoryPoint[]
+}
+
+export interface ProductHistoryParams {
+  bucket?: HistoryBucket
+  date_from?: string
+  date_to?: string
+}
+
 export interface ProductFilters {
+  search?: string
   min_price?: number
   max_price?: number
   min_rating?: number
@@ -16,6 +51,8 @@ export interface ProductFilters {
   ordering?: string
 }
 
+export type ExportFormat = 'csv' | 'ndjson' | 'parquet'
+
 export interface PriceDistribution {
   range: string
   count: number
@@ -25,3 +62,61 @@ export interface DiscountRatingData {
   rating: number
   discount: number
 }
+
+export interface HistogramBin {
+  min: number
+  max: number
+  count: number
+}
+
+export interface AnalyticsSummary {
+  count: number
+  avg_rating: number | null
+  total_reviews: number
+  avg_discount: number | null
+}
+
+export interface PricePercentile {
+  percentile: number
+  value: number | null
+}
+
+export interface Analytics {
+  summary: AnalyticsSummary
+  price_histogram: HistogramBin[]
+  rating_histogram: HistogramBin[]
+  price_percentiles: PricePercentile[]
+  discounts: {
+    avg_discount: number | null
+    max_discount: number | null
+    discounted_share: number | null
+    by_rating: { rating: number; avg_discount: number; count: number }[]
+  }
+  rating_reviews: {
+    rating_buckets: { min: number; max: number }[]
+    reviews_buckets: { min: number; max: number | null }[]
+    counts: number[][]
+  }
+}
+
+export interface AnalyticsParams {
+  field?: 'price' | 'discounted_price'
+  bins?: number
+  percentiles?: string
+}
+
+export interface QuerySummary {
+  query: string
+  product_count: number
+  price_min: string | null
+  price_max: string | null
+  price_avg: string | null
+  discounted_price_avg: string | null
+  rating_avg: number | null
+  rating_distribution: number[]
+  reviews_total: number
+  discount_avg: number | null
+  discount_max: number | null
+  discounted_count: number
+  updated_at: string
+}